@@ -14,9 +14,20 @@ START = 0  # index corresponding the start of a values range
 END = 1  # index corresponding the end of a values range
 MIN = 0  # min value of a domain
 MAX = 1  # max value of a domain
+BITS_LOW = 2  # low word of the bitset of a domain, when the domains are backed by bitsets
+BITS_HIGH = 3  # high word of the bitset of a domain, when the domains are backed by bitsets
+BITS_BASE = 4  # value of the first bit of the bitset of a domain of a propagator
+BITSET_SIZE = 64  # number of values of a domain that are backed by its bitset
+HOLE = 2  # event of the removal of a value, MIN and MAX are the events of the changes of the bounds
 PROP_INCONSISTENCY = 0  # returned by a propagator when inconsistent
 PROP_CONSISTENCY = 1  # returned by a propagator when consistent
 PROP_ENTAILMENT = 2  # returned by a propagator when entailed
 PROBLEM_INCONSISTENT = 0  # returned when the filtering of a problem detects an inconsistency
 PROBLEM_FILTERED = 1  # returned when the filtering of a problem has been completed
 PROBLEM_SOLVED = 2  # returned when a problem is solved
+SEARCH_IN_PROGRESS = 0  # the status of a search that has not explored the whole search space yet
+SEARCH_COMPLETE = 1  # the status of a search that has explored the whole search space
+SEARCH_INTERRUPTED = 2  # the status of a search that has been interrupted because a limit has been reached
+OPTIMIZATION_LINEAR = 0  # the objective is tightened by one unit after each solution
+OPTIMIZATION_DICHOTOMIC = 1  # the objective is bisected
+OPTIMIZATION_HYBRID = 2  # the objective is bisected until a probe is too slow, then it is tightened linearly
@@ -0,0 +1,144 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import numpy as np
+from numba import njit  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import BITS_BASE, BITS_HIGH, BITS_LOW, BITSET_SIZE, MAX, MIN
+
+# A domain backed by a bitset is the set of the values between its bounds whose bits are set,
+# the values that are BITSET_SIZE or more above the base of the bitset are always in the bitset.
+# The domains of the propagators only have bitsets in domain consistency mode:
+# they then have the columns MIN, MAX, BITS_LOW, BITS_HIGH and BITS_BASE, otherwise they are intervals.
+
+
+@njit(cache=True)
+def has_bitsets(domains: NDArray) -> bool:
+    """
+    Returns true iff the domains of a propagator are backed by bitsets.
+    :param domains: the domains
+    :return: a boolean
+    """
+    return domains.shape[1] > BITS_BASE
+
+
+@njit(cache=True)
+def get_bitset(domains: NDArray, idx: int) -> int:
+    """
+    Returns the bitset of a domain as a 64 bits integer.
+    :param domains: the domains
+    :param idx: the index of the domain
+    :return: the bitset
+    """
+    return int((np.int64(domains[idx, BITS_HIGH]) << 32) | (np.int64(domains[idx, BITS_LOW]) & 0xFFFFFFFF))
+
+
+@njit(cache=True)
+def set_bitset(domains: NDArray, idx: int, bitset: int) -> None:
+    """
+    Sets the bitset of a domain, its words are stored as signed 32 bits integers.
+    :param domains: the domains
+    :param idx: the index of the domain
+    :param bitset: the bitset as a 64 bits integer
+    """
+    domains[idx, BITS_LOW] = ((bitset & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+    domains[idx, BITS_HIGH] = bitset >> 32
+
+
+@njit(cache=True)
+def get_next_value(domains: NDArray, idx: int, base: int, value: int) -> int:
+    """
+    Returns the smallest value of the bitset of a domain that is greater than or equal to a value.
+    :param domains: the domains
+    :param idx: the index of the domain
+    :param base: the value of the first bit of the bitset
+    :param value: the value
+    :return: the next value, it may be greater than the max of the domain
+    """
+    bitset = get_bitset(domains, idx)
+    bit = value - base
+    while 0 <= bit < BITSET_SIZE and (bitset >> bit) & 1 == 0:
+        bit += 1
+    return base + bit
+
+
+@njit(cache=True)
+def get_previous_value(domains: NDArray, idx: int, base: int, value: int) -> int:
+    """
+    Returns the greatest value of the bitset of a domain that is less than or equal to a value.
+    :param domains: the domains
+    :param idx: the index of the domain
+    :param base: the value of the first bit of the bitset
+    :param value: the value
+    :return: the previous value, it may be less than the min of the domain
+    """
+    bitset = get_bitset(domains, idx)
+    bit = value - base
+    while 0 <= bit < BITSET_SIZE and (bitset >> bit) & 1 == 0:
+        bit -= 1
+    return base + bit
+
+
+@njit(cache=True)
+def normalize_domain(domains: NDArray, idx: int, base: int) -> bool:
+    """
+    Moves the bounds of a domain to values of its bitset.
+    :param domains: the domains
+    :param idx: the index of the domain
+    :param base: the value of the first bit of the bitset
+    :return: false iff the domain is empty
+    """
+    domains[idx, MIN] = get_next_value(domains, idx, base, domains[idx, MIN])
+    domains[idx, MAX] = get_previous_value(domains, idx, base, domains[idx, MAX])
+    return domains[idx, MIN] <= domains[idx, MAX]
+
+
+@njit(cache=True)
+def has_value(domains: NDArray, idx: int, value: int) -> bool:
+    """
+    Returns true iff a value belongs to the domain of a variable of a propagator.
+    :param domains: the domains of the propagator
+    :param idx: the index of the variable
+    :param value: the value
+    :return: a boolean
+    """
+    if value < domains[idx, MIN] or value > domains[idx, MAX]:
+        return False
+    if not has_bitsets(domains):
+        return True
+    bit = value - domains[idx, BITS_BASE]
+    return not 0 <= bit < BITSET_SIZE or (get_bitset(domains, idx) >> bit) & 1 == 1
+
+
+@njit(cache=True)
+def remove_value(domains: NDArray, idx: int, value: int) -> bool:
+    """
+    Removes a value from the domain of a variable of a propagator.
+    Without bitsets, only the bounds of a domain can be removed.
+    :param domains: the domains of the propagator
+    :param idx: the index of the variable
+    :param value: the value
+    :return: false iff the domain becomes empty
+    """
+    if value < domains[idx, MIN] or value > domains[idx, MAX]:
+        return True
+    if has_bitsets(domains):
+        base = domains[idx, BITS_BASE]
+        if 0 <= value - base < BITSET_SIZE:
+            set_bitset(domains, idx, get_bitset(domains, idx) & ~(np.int64(1) << (value - base)))
+            return normalize_domain(domains, idx, base)
+    if value == domains[idx, MIN]:
+        domains[idx, MIN] = value + 1
+    elif value == domains[idx, MAX]:
+        domains[idx, MAX] = value - 1
+    return domains[idx, MIN] <= domains[idx, MAX]
@@ -16,6 +16,7 @@ from rich import print
 
 from nucs.examples.queens.queens_problem import QueensProblem
 from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.multiprocessing_solver import MultiprocessingSolver
 from nucs.statistics import get_statistics
 
 # Run with the following command (the second run is much faster because the code has been compiled):
@@ -23,8 +24,9 @@ from nucs.statistics import get_statistics
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-n", type=int, default=10)
+    parser.add_argument("--processes", type=int, default=1)
     args = parser.parse_args()
     problem = QueensProblem(args.n)
-    solver = BacktrackSolver(problem)
+    solver = BacktrackSolver(problem) if args.processes == 1 else MultiprocessingSolver(problem, args.processes)
     solver.solve_all()
     print(get_statistics(solver.statistics))
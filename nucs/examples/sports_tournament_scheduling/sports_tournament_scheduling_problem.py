@@ -13,7 +13,7 @@
 from typing import List
 
 from nucs.problems.problem import Problem
-from nucs.propagators.propagators import ALG_ALLDIFFERENT, ALG_EXACTLY_EQ, ALG_GCC, ALG_RELATION
+from nucs.propagators.propagators import ALG_ALLDIFFERENT, ALG_COMPACT_TABLE, ALG_EXACTLY_EQ, ALG_GCC
 
 
 class SportsTournamentSchedulingProblem(Problem):
@@ -92,7 +92,7 @@ class SportsTournamentSchedulingProblem(Problem):
             [
                 (
                     [self.team_var_index(p, w, 0), self.team_var_index(p, w, 1), self.match_var_index(p, w)],
-                    ALG_RELATION,
+                    ALG_COMPACT_TABLE,
                     plays,
                 )
                 for p in range(0, self.period_nb)
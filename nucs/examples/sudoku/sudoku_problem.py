@@ -10,11 +10,22 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-from typing import List
+from typing import List, Tuple
 
-from nucs.problems.latin_square_problem import LatinSquareProblem
+from nucs.problems.latin_square_problem import LatinSquareProblem, latin_square_shr_domains
 from nucs.propagators.propagators import ALG_ALLDIFFERENT
 
+SUDOKU_COLORS = list(range(1, 10))
+
+
+def sudoku_shr_domains(givens: List[List[int]]) -> List[Tuple[int, int]]:
+    """
+    Returns the domains of the cells of a sudoku, they are the initial shared domains of a SudokuProblem.
+    :param givens: the givens per rows then per columns
+    :return: the list of the domains
+    """
+    return latin_square_shr_domains(SUDOKU_COLORS, givens)
+
 
 class SudokuProblem(LatinSquareProblem):
     """
@@ -26,7 +37,7 @@ class SudokuProblem(LatinSquareProblem):
         Inits the problem.
         :param givens: the givens per rows then per columns
         """
-        super().__init__(list(range(1, 10)), givens)
+        super().__init__(SUDOKU_COLORS, givens)
         for i in range(3):
             for j in range(3):
                 offset = i * 27 + j * 3
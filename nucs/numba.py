@@ -11,9 +11,11 @@
 # Copyright 2024 - Yan Georget
 ###############################################################################
 import os
+from typing import Any
 
 from numba import types  # type: ignore
 from numba.core import cgutils
+from numba.core.dispatcher import Dispatcher
 from numba.experimental.function_type import _get_wrapper_address
 from numba.extending import intrinsic
 
@@ -41,4 +43,17 @@ def build_function_address_list(fcts, signature):  # type: ignore
     return [_get_wrapper_address(fct, signature) for fct in fcts]
 
 
+def build_function_address(fct, signature):  # type: ignore
+    return _get_wrapper_address(fct, signature)
+
+
+def is_njit_function(fct: Any) -> bool:
+    """
+    Returns true iff a function has been compiled with njit.
+    :param fct: the function
+    :return: a boolean
+    """
+    return isinstance(fct, Dispatcher)
+
+
 NUMBA_DISABLE_JIT = os.getenv("NUMBA_DISABLE_JIT")
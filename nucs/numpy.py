@@ -16,10 +16,22 @@ import numpy as np
 from numpy.typing import NDArray
 
 
-def new_shr_domains_by_values(domains: List[Union[int, Tuple[int, int]]]) -> NDArray:
-    return np.array(
+def new_shr_domains_by_values(domains: List[Union[int, Tuple[int, int]]], bitsets: bool = False) -> NDArray:
+    shr_domains = np.array(
         [(domain, domain) if isinstance(domain, int) else domain for domain in domains], dtype=np.int32, order="F"
     )
+    if bitsets:  # the two words of the bitsets have all their bits set
+        return np.asfortranarray(np.hstack((shr_domains, np.full((len(shr_domains), 2), -1, dtype=np.int32))))
+    return shr_domains
+
+
+def new_shr_domains_bases(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_bitset_domains_by_values(domains: List[Union[int, Tuple[int, int]]]) -> NDArray:
+    shr_domains = new_shr_domains_by_values(domains, True)  # the first bits of the bitsets are the mins
+    return np.asfortranarray(np.hstack((shr_domains, shr_domains[:, :1])))
 
 
 def new_dom_indices_by_values(dom_indices: List[int]) -> NDArray:
@@ -38,6 +50,14 @@ def new_dom_offsets(n: int) -> NDArray:
     return np.empty(n, dtype=np.int32)
 
 
+def new_solution(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_instances_by_values(shr_domains_list: List[List[Tuple[int, int]]]) -> NDArray:
+    return np.array(shr_domains_list, dtype=np.int32).reshape((len(shr_domains_list), -1, 2))
+
+
 def new_parameters_by_values(data: List[int]) -> NDArray:
     return np.array(data, dtype=np.int32)
 
@@ -46,11 +66,11 @@ def new_parameters(n: int) -> NDArray:
     return np.empty(n, dtype=np.int32)
 
 
-def new_triggers(n: int, init_value: bool) -> NDArray:
+def new_triggers(n: int, init_value: bool, holes: bool = False) -> NDArray:
     if init_value:
-        return np.ones((n, 2), dtype=bool)
+        return np.ones((n, 3 if holes else 2), dtype=bool)
     else:
-        return np.zeros((n, 2), dtype=bool)
+        return np.zeros((n, 3 if holes else 2), dtype=bool)
 
 
 def new_triggered_propagators(n: int) -> NDArray:
@@ -65,9 +85,105 @@ def new_bounds(n: int) -> NDArray:
     return np.zeros((n, 2), dtype=np.uint16)
 
 
-def new_shr_domains_propagators(n: int, m: int) -> NDArray:
-    return np.zeros((n, 2, m), dtype=bool)
+def new_shr_domains_propagators(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_shr_domains_propagators_bounds(n: int) -> NDArray:
+    return np.zeros((n, 3, 2), dtype=np.int32)
 
 
 def new_algorithms(n: int) -> NDArray:
     return np.empty(n, dtype=np.uint8)
+
+
+def new_trail(n: int) -> NDArray:
+    return np.empty((n, 4), dtype=np.int32)
+
+
+def new_entailment_trail(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_shr_domains_stamps(n: int, column_nb: int) -> NDArray:
+    return np.zeros((n, column_nb), dtype=np.int32)
+
+
+def new_trail_tops() -> NDArray:
+    return np.zeros(4, dtype=np.int64)
+
+
+def new_cp_tops(n: int) -> NDArray:
+    return np.empty((n, 4), dtype=np.int64)
+
+
+def new_state_bounds(n: int) -> NDArray:
+    return np.zeros((n, 2), dtype=np.int32)
+
+
+def new_stateful_propagators_by_values(stateful_propagators: List[int]) -> NDArray:
+    return np.array(stateful_propagators, dtype=np.int32)
+
+
+def new_states(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_props_states_stamps(n: int) -> NDArray:
+    return np.zeros(n, dtype=np.int32)
+
+
+def new_state_trail(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_cp_shr_domains(n: int) -> NDArray:
+    return np.empty((n, 2), dtype=np.int32)
+
+
+def new_stack_shr_domains(depth: int, n: int, column_nb: int) -> NDArray:
+    return np.empty((depth, n, column_nb), dtype=np.int32)
+
+
+def new_stack_not_entailed_propagators(depth: int, n: int) -> NDArray:
+    return np.empty((depth, n), dtype=np.bool_)
+
+
+def new_stack_states(depth: int, n: int) -> NDArray:
+    return np.empty((depth, n), dtype=np.int32)
+
+
+def new_queue(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_queue_tops(n: int) -> NDArray:
+    return np.zeros((n, 2), dtype=np.int64)
+
+
+def new_props_buckets(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_workspace(n: int) -> NDArray:
+    return np.empty(n, dtype=np.int32)
+
+
+def new_prop_domains(n: int) -> NDArray:
+    return np.empty((n, 5), dtype=np.int32, order="F")
+
+
+def new_propagators_weights(n: int) -> NDArray:
+    return np.ones(n, dtype=np.int64)
+
+
+def new_shr_domains_adjacent_propagators_bounds(n: int) -> NDArray:
+    return np.zeros((n, 2), dtype=np.int32)
+
+
+def new_shr_domains_activities(n: int) -> NDArray:
+    return np.zeros(n, dtype=np.float64)
+
+
+def new_shr_domains_impacts(n: int) -> NDArray:
+    return np.zeros(n, dtype=np.float64)
@@ -10,7 +10,7 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from nucs.problems.problem import Problem
 from nucs.propagators.propagators import ALG_ALLDIFFERENT, ALG_ELEMENT_LIC
@@ -20,6 +20,18 @@ M_ROW = 1  # the row model
 M_COLUMN = 2  # the column model
 
 
+def latin_square_shr_domains(colors: List[int], givens: Optional[List[List[int]]] = None) -> List[Tuple[int, int]]:
+    """
+    Returns the domains of the cells of a latin square.
+    :colors: the possible values for the cells
+    :givens: initial values for the cells, any value different from the possible colors is used as a wildcard
+    :return: the list of the domains
+    """
+    if givens is None:
+        return [(colors[0], colors[-1])] * len(colors) ** 2
+    return [(colors[0], colors[-1]) if given not in colors else (given, given) for line in givens for given in line]
+
+
 class LatinSquareProblem(Problem):
     """
     A simple model for latin squares.
@@ -35,15 +47,7 @@ class LatinSquareProblem(Problem):
         """
         self.colors = colors
         self.n = len(colors)
-        if givens is None:
-            shr_domains = [(colors[0], colors[-1])] * self.n**2
-        else:
-            shr_domains = [
-                (colors[0], colors[-1]) if given not in self.colors else (given, given)
-                for line in givens
-                for given in line
-            ]
-        super().__init__(shr_domains)
+        super().__init__(latin_square_shr_domains(colors, givens))
         self.add_propagators([(self.row(i), ALG_ALLDIFFERENT, []) for i in range(self.n)])
         self.add_propagators([(self.column(j), ALG_ALLDIFFERENT, []) for j in range(self.n)])
 
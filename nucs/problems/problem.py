@@ -17,7 +17,8 @@ from numba import njit  # type: ignore
 from numba.typed import List
 from numpy.typing import NDArray
 
-from nucs.constants import END, MAX, MIN, START
+from nucs.constants import BITSET_SIZE, END, MAX, MIN, START
+from nucs.domains import get_next_value, get_previous_value
 from nucs.numpy import (
     new_algorithms,
     new_bounds,
@@ -25,14 +26,42 @@ from nucs.numpy import (
     new_dom_indices_by_values,
     new_dom_offsets,
     new_dom_offsets_by_values,
+    new_entailment_trail,
     new_not_entailed_propagators,
     new_parameters,
+    new_prop_domains,
+    new_propagators_weights,
+    new_props_buckets,
+    new_props_states_stamps,
+    new_queue,
+    new_queue_tops,
+    new_shr_domains_activities,
+    new_shr_domains_adjacent_propagators_bounds,
+    new_shr_domains_bases,
     new_shr_domains_by_values,
+    new_shr_domains_impacts,
     new_shr_domains_propagators,
+    new_shr_domains_propagators_bounds,
+    new_shr_domains_stamps,
+    new_state_bounds,
+    new_state_trail,
+    new_stateful_propagators_by_values,
+    new_states,
+    new_trail,
+    new_trail_tops,
     new_triggered_propagators,
+    new_workspace,
 )
-from nucs.propagators.propagators import GET_COMPLEXITY_FCTS, GET_TRIGGERS_FCTS
-from nucs.statistics import STATS_PROBLEM_PROPAGATOR_NB, STATS_PROBLEM_VARIABLE_NB
+from nucs.problems.propagator_queue import get_buckets, trigger_propagators
+from nucs.problems.trail import trail_bound
+from nucs.propagators.propagators import (
+    COMPUTE_DOMAINS_FCTS,
+    GET_COMPLEXITY_FCTS,
+    GET_TRIGGERS_FCTS,
+    INIT_PARAMETERS_FCTS,
+    get_workspace_size,
+)
+from nucs.statistics import STATS_PROBLEM_PROPAGATOR_NB, STATS_PROBLEM_VARIABLE_NB, init_profile
 
 
 class Problem:
@@ -64,6 +93,13 @@ class Problem:
         self.propagators: List[Tuple[List[int], int, List[int]]] = []
         self.propagator_nb = 0
         self.ready = False  # the problem is not yet ready to be used, init_problem() must be called
+        self.trailing = False  # when true, the changes of the shared domains are recorded on a trail
+        self.bitsets = False  # when true, the shared domains are backed by bitsets and can have holes
+        self.shr_domains_bases: Optional[NDArray] = None
+        self.profiling = False  # when true, the calls to the propagators are profiled per algorithm
+        self.propagator_profiling = False  # when true, the calls to the propagators are also profiled per propagator
+        self.algorithms_profile: Optional[NDArray] = None
+        self.propagators_profile: Optional[NDArray] = None
 
     def add_variable(
         self, shr_domain: Union[int, Tuple[int, int]], dom_index: Optional[int] = None, dom_offset: Optional[int] = None
@@ -125,7 +161,15 @@ class Problem:
         """
         # Variable and domain initialization
         self.variable_nb = len(self.dom_indices_lst)
-        self.shr_domains_arr = new_shr_domains_by_values(self.shr_domains_lst)
+        self.shr_domains_arr = new_shr_domains_by_values(self.shr_domains_lst, self.bitsets)
+        if self.bitsets:
+            # The first bit of the bitset of a shared domain is its initial min,
+            # the bitsets of the domains with too many values are below them: these domains remain intervals.
+            shr_domains_ranges = self.shr_domains_arr[:, MAX] - self.shr_domains_arr[:, MIN]
+            self.shr_domains_bases = new_shr_domains_bases(len(self.shr_domains_lst))
+            self.shr_domains_bases[:] = self.shr_domains_arr[:, MIN] - np.where(
+                shr_domains_ranges < BITSET_SIZE, 0, BITSET_SIZE
+            )
         self.dom_indices_arr = new_dom_indices_by_values(self.dom_indices_lst)
         self.dom_offsets_arr = new_dom_offsets_by_values(self.dom_offsets_lst)
         # Sort the propagators based on their estimated amortized complexities.
@@ -133,9 +177,23 @@ class Problem:
         # Propagator initialization
         self.propagator_nb = len(self.propagators)
         # This is where the triggered propagators will be stored,
-        # propagators will be computed in the order of their increasing indices.
+        # this is also the membership bitmap of the propagator queue.
         # This is empty at the end of a filter.
         self.triggered_propagators = new_triggered_propagators(self.propagator_nb)
+        # The propagator queue is made of FIFO buckets, one per complexity class,
+        # the cheap propagators are computed first.
+        # Since the propagators are sorted, the propagators of a bucket have consecutive indices.
+        buckets = get_buckets([GET_COMPLEXITY_FCTS[prop[1]](len(prop[0]), prop[2]) for prop in self.propagators])
+        bucket_nb = buckets[-1] + 1 if self.propagator_nb > 0 else 0
+        self.props_buckets = new_props_buckets(self.propagator_nb)
+        self.props_buckets[:] = buckets
+        self.queue = new_queue(self.propagator_nb)
+        self.queue_bounds = new_bounds(max(1, bucket_nb))
+        for prop_idx, bucket in enumerate(buckets):
+            if prop_idx == 0 or buckets[prop_idx - 1] != bucket:
+                self.queue_bounds[bucket, START] = prop_idx
+            self.queue_bounds[bucket, END] = prop_idx + 1
+        self.queue_tops = new_queue_tops(bucket_nb)
         # This is where the entailed propagators will be stored
         # This is reset in the case of braktrack
         self.not_entailed_propagators = new_not_entailed_propagators(self.propagator_nb)
@@ -144,13 +202,26 @@ class Problem:
         self.var_bounds = new_bounds(max(1, self.propagator_nb))  # some redundancy here
         self.param_bounds = new_bounds(max(1, self.propagator_nb))  # some redundancy here
         self.var_bounds[0, START] = self.param_bounds[0, START] = 0
+        # Some propagators compile their parameters, eg into bitsets, once and for all.
+        # The compiled parameters may end with a backtrackable state.
+        props_parameters = [
+            (
+                INIT_PARAMETERS_FCTS[prop[1]](len(prop[0]), prop[2])  # type: ignore
+                if INIT_PARAMETERS_FCTS[prop[1]] is not None
+                else (prop[2], 0)
+            )
+            for prop in self.propagators
+        ]
+        self.state_bounds = new_state_bounds(max(1, self.propagator_nb))
         for prop_idx, prop in enumerate(self.propagators):
             self.algorithms[prop_idx] = prop[1]
             if prop_idx > 0:
                 self.var_bounds[prop_idx, START] = self.var_bounds[prop_idx - 1, END]
                 self.param_bounds[prop_idx, START] = self.param_bounds[prop_idx - 1, END]
             self.var_bounds[prop_idx, END] = self.var_bounds[prop_idx, START] + len(prop[0])
-            self.param_bounds[prop_idx, END] = self.param_bounds[prop_idx, START] + len(prop[2])
+            self.param_bounds[prop_idx, END] = self.param_bounds[prop_idx, START] + len(props_parameters[prop_idx][0])
+            self.state_bounds[prop_idx, START] = self.param_bounds[prop_idx, END] - props_parameters[prop_idx][1]
+            self.state_bounds[prop_idx, END] = self.param_bounds[prop_idx, END]
         # Bounds have been computed and can now be used. The global arrays are the following:
         self.props_dom_indices = new_dom_indices(self.var_bounds[-1, END])
         self.props_dom_offsets = new_dom_offsets(self.var_bounds[-1, END])
@@ -163,25 +234,111 @@ class Problem:
             self.props_dom_offsets[self.var_bounds[prop_idx, START] : self.var_bounds[prop_idx, END]] = (
                 self.dom_offsets_arr[prop_vars]
             )  # this is cached for faster access
-            self.props_parameters[self.param_bounds[prop_idx, START] : self.param_bounds[prop_idx, END]] = prop[2]
+            self.props_parameters[self.param_bounds[prop_idx, START] : self.param_bounds[prop_idx, END]] = (
+                props_parameters[prop_idx][0]
+            )
         self.props_dom_offsets = self.props_dom_offsets.reshape((-1, 1))
-        self.shr_domains_propagators = new_shr_domains_propagators(len(self.shr_domains_lst), self.propagator_nb)
+        # The propagators do not allocate memory, they use buffers sized from the largest propagator.
+        self.prop_domains = new_prop_domains(max([len(prop[0]) for prop in self.propagators], default=0))
+        self.workspace = new_workspace(
+            max([get_workspace_size(len(prop[0]), len(prop[2])) for prop in self.propagators], default=0)
+        )
+        # For each event (MIN, MAX or HOLE) of each shared domain, the propagators to trigger are stored
+        # in a sparse (CSR) format: they are stored contiguously in a global array and their bounds in another array.
+        watchers = [[[], [], []] for _ in range(len(self.shr_domains_lst))]  # type: ignore
         for prop_idx, prop in enumerate(self.propagators):
             triggers = GET_TRIGGERS_FCTS[prop[1]](len(prop[0]), prop[2])
             for prop_var_idx, prop_var in enumerate(prop[0]):
-                self.shr_domains_propagators[self.dom_indices_arr[prop_var], :, prop_idx] = triggers[prop_var_idx, :]
+                for bound in range(triggers.shape[1]):
+                    bound_watchers = watchers[self.dom_indices_arr[prop_var]][bound]
+                    if triggers[prop_var_idx, bound] and (len(bound_watchers) == 0 or bound_watchers[-1] != prop_idx):
+                        bound_watchers.append(prop_idx)
+        self.shr_domains_propagators_bounds = new_shr_domains_propagators_bounds(len(self.shr_domains_lst))
+        self.shr_domains_propagators = new_shr_domains_propagators(
+            sum(len(bound_watchers) for dom_watchers in watchers for bound_watchers in dom_watchers)
+        )
+        top = 0
+        for dom_idx, dom_watchers in enumerate(watchers):
+            for bound, bound_watchers in enumerate(dom_watchers):
+                self.shr_domains_propagators_bounds[dom_idx, bound, START] = top
+                self.shr_domains_propagators[top : top + len(bound_watchers)] = bound_watchers
+                top += len(bound_watchers)
+                self.shr_domains_propagators_bounds[dom_idx, bound, END] = top
+        # For each shared domain, all the propagators involving it are also stored in a sparse (CSR) format.
+        adjacent_propagators = [[] for _ in range(len(self.shr_domains_lst))]  # type: ignore
+        for prop_idx, prop in enumerate(self.propagators):
+            for prop_var in prop[0]:
+                dom_adjacent_propagators = adjacent_propagators[self.dom_indices_arr[prop_var]]
+                if len(dom_adjacent_propagators) == 0 or dom_adjacent_propagators[-1] != prop_idx:
+                    dom_adjacent_propagators.append(prop_idx)
+        self.shr_domains_adjacent_propagators_bounds = new_shr_domains_adjacent_propagators_bounds(
+            len(self.shr_domains_lst)
+        )
+        self.shr_domains_adjacent_propagators = new_shr_domains_propagators(
+            sum(len(dom_adjacent_propagators) for dom_adjacent_propagators in adjacent_propagators)
+        )
+        top = 0
+        for dom_idx, dom_adjacent_propagators in enumerate(adjacent_propagators):
+            self.shr_domains_adjacent_propagators_bounds[dom_idx, START] = top
+            self.shr_domains_adjacent_propagators[top : top + len(dom_adjacent_propagators)] = dom_adjacent_propagators
+            top += len(dom_adjacent_propagators)
+            self.shr_domains_adjacent_propagators_bounds[dom_idx, END] = top
+        # The weight of a propagator is incremented each time it fails, the weights are kept on backtrack and reset.
+        self.propagators_weights = new_propagators_weights(self.propagator_nb)
+        # The activity of a shared domain is incremented each time it is reduced by a propagator,
+        # its impact is updated by the solver each time it is chosen.
+        self.shr_domains_activities = new_shr_domains_activities(len(self.shr_domains_lst))
+        self.shr_domains_impacts = new_shr_domains_impacts(len(self.shr_domains_lst))
+        # The trail is only used in trailing mode, it records the changes of the bounds (and bitsets)
+        # of the shared domains and the entailments of the propagators so that they can be undone on backtrack.
+        self.shr_domains_stamps = new_shr_domains_stamps(len(self.shr_domains_lst), self.shr_domains_arr.shape[1])
+        self.trail = new_trail(self.shr_domains_arr.size)
+        self.entailment_trail = new_entailment_trail(self.propagator_nb)
+        self.trail_tops = new_trail_tops()
+        # The states of the propagators are saved with the choice points, their initial values are kept for resets.
+        self.stateful_propagators = new_stateful_propagators_by_values(
+            [prop_idx for prop_idx in range(self.propagator_nb) if props_parameters[prop_idx][1] > 0]
+        )
+        self.initial_states = new_states(sum(props_parameters[prop_idx][1] for prop_idx in self.stateful_propagators))
+        save_states(self.props_parameters, self.state_bounds, self.stateful_propagators, self.initial_states)
+        self.props_states_stamps = new_props_states_stamps(self.propagator_nb)
+        self.state_trail_width = len(self.initial_states) + 2 * len(self.stateful_propagators)
+        self.state_trail = new_state_trail(self.state_trail_width)
+        # The profiles are None when profiling is disabled, the consistency algorithm is then compiled without them.
+        if self.profiling or self.propagator_profiling:
+            self.algorithms_profile = init_profile(len(COMPUTE_DOMAINS_FCTS))
+        if self.propagator_profiling:
+            self.propagators_profile = init_profile(self.propagator_nb)
         if statistics is not None:
             statistics[STATS_PROBLEM_PROPAGATOR_NB] = self.propagator_nb
             statistics[STATS_PROBLEM_VARIABLE_NB] = self.variable_nb
 
-    def reset(self, choice_point: Optional[Tuple[NDArray, NDArray]] = None) -> None:
+    def reset(self, choice_point: Optional[Tuple[NDArray, NDArray]] = None, states: Optional[NDArray] = None) -> None:
+        """
+        Resets the problem to its initial domains or to the domains of a choice point.
+        The states of the propagators are reset to the given states or to their initial values:
+        the states of an ancestor of a choice point remain valid for this choice point.
+        :param choice_point: the optional shared domains and not entailed propagators of a choice point
+        :param states: the optional states of the propagators
+        """
         if choice_point is None:
-            self.shr_domains_arr = new_shr_domains_by_values(self.shr_domains_lst)
+            self.shr_domains_arr = new_shr_domains_by_values(self.shr_domains_lst, self.bitsets)
             self.not_entailed_propagators.fill(True)
             self.triggered_propagators.fill(True)
+            self.shr_domains_stamps.fill(0)
+            self.trail_tops.fill(0)
+            self.props_states_stamps.fill(0)
         else:
-            self.shr_domains_arr, self.not_entailed_propagators = choice_point
+            shr_domains, not_entailed_propagators = choice_point
+            np.copyto(self.shr_domains_arr, shr_domains)
+            np.copyto(self.not_entailed_propagators, not_entailed_propagators)
             np.copyto(self.triggered_propagators, self.not_entailed_propagators)
+        restore_states(
+            self.props_parameters,
+            self.state_bounds,
+            self.stateful_propagators,
+            self.initial_states if states is None else states,
+        )
 
     def get_min_value(self, var_idx: int) -> int:
         """
@@ -205,7 +362,10 @@ class Problem:
         :param var_idx: the index of the variable
         :param min_value: the minimal value
         """
-        self.shr_domains_arr[self.dom_indices_arr[var_idx], MIN] = min_value - self.dom_offsets_arr[var_idx]
+        dom_idx = self.dom_indices_arr[var_idx]
+        if self.trailing:
+            self.trail_and_trigger(dom_idx, MIN)
+        self.shr_domains_arr[dom_idx, MIN] = min_value - self.dom_offsets_arr[var_idx]
 
     def set_max_value(self, var_idx: int, max_value: int) -> None:
         """
@@ -213,7 +373,27 @@ class Problem:
         :param var_idx: the index of the variable
         :param min_value: the maximal value
         """
-        self.shr_domains_arr[self.dom_indices_arr[var_idx], MAX] = max_value - self.dom_offsets_arr[var_idx]
+        dom_idx = self.dom_indices_arr[var_idx]
+        if self.trailing:
+            self.trail_and_trigger(dom_idx, MAX)
+        self.shr_domains_arr[dom_idx, MAX] = max_value - self.dom_offsets_arr[var_idx]
+
+    def trail_and_trigger(self, dom_idx: int, bound: int) -> None:
+        """
+        Records a bound of a shared domain on the trail and triggers the propagators watching it.
+        In trailing mode, the propagators are not all triggered on backtrack,
+        so a bound changed outside of the consistency algorithm needs to trigger its propagators.
+        :param dom_idx: the index of the shared domain
+        :param bound: the bound
+        """
+        trail_bound(self.shr_domains_arr, self.shr_domains_stamps, self.trail, self.trail_tops, dom_idx, bound)
+        trigger_propagators(
+            self.triggered_propagators,
+            self.shr_domains_propagators,
+            self.shr_domains_propagators_bounds,
+            dom_idx,
+            bound,
+        )
 
     def __str__(self) -> str:
         return f"domains={self.shr_domains_arr}, indices={self.dom_indices_arr}, offsets={self.dom_offsets_arr}"
@@ -225,4 +405,94 @@ def is_solved(shr_domains: NDArray) -> bool:
     Returns true iff the problem is solved.
     :return: a boolean
     """
-    return bool(np.all(np.equal(shr_domains[:, MIN], shr_domains[:, MAX])))
+    for dom_idx in range(len(shr_domains)):
+        if shr_domains[dom_idx, MIN] != shr_domains[dom_idx, MAX]:
+            return False
+    return True
+
+
+@njit(cache=True)
+def normalize_shr_domains(
+    shr_domains: NDArray,
+    shr_domains_bases: NDArray,
+    triggered_propagators: NDArray,
+    shr_domains_propagators: NDArray,
+    shr_domains_propagators_bounds: NDArray,
+    trailing: bool,
+    shr_domains_stamps: NDArray,
+    trail: NDArray,
+    trail_tops: NDArray,
+) -> bool:
+    """
+    Moves the bounds of the shared domains backed by bitsets to values of their bitsets.
+    This is needed when the bounds have been changed outside of the consistency algorithm, eg by a choice.
+    The propagators watching the moved bounds are triggered.
+    :param shr_domains: the shared domains
+    :param shr_domains_bases: the values of the first bits of the bitsets of the shared domains
+    :param triggered_propagators: the triggered propagators
+    :param shr_domains_propagators: the propagators watching the events of the shared domains
+    :param shr_domains_propagators_bounds: the bounds of the propagators watching each event of each shared domain
+    :param trailing: if true, the moved bounds are recorded on the trail
+    :param shr_domains_stamps: the depths at which the bounds of the shared domains have been recorded
+    :param trail: the trail
+    :param trail_tops: the trail tops
+    :return: false iff a shared domain is empty
+    """
+    for dom_idx in range(len(shr_domains)):
+        base = shr_domains_bases[dom_idx]
+        if shr_domains[dom_idx, MIN] - base >= BITSET_SIZE:  # this shared domain is an interval
+            continue
+        for bound in range(2):
+            value = shr_domains[dom_idx, bound]
+            if bound == MIN:
+                value = get_next_value(shr_domains, dom_idx, base, value)
+            else:
+                value = get_previous_value(shr_domains, dom_idx, base, value)
+            if shr_domains[dom_idx, bound] != value:
+                if trailing:
+                    trail_bound(shr_domains, shr_domains_stamps, trail, trail_tops, dom_idx, bound)
+                shr_domains[dom_idx, bound] = value
+                trigger_propagators(
+                    triggered_propagators, shr_domains_propagators, shr_domains_propagators_bounds, dom_idx, bound
+                )
+        if shr_domains[dom_idx, MIN] > shr_domains[dom_idx, MAX]:
+            return False
+    return True
+
+
+@njit(cache=True)
+def save_states(
+    props_parameters: NDArray, state_bounds: NDArray, stateful_propagators: NDArray, states: NDArray
+) -> None:
+    """
+    Copies the states of the stateful propagators to a flat array.
+    :param props_parameters: the parameters of the propagators, the states are stored after the parameters
+    :param state_bounds: the bounds of the states of the propagators
+    :param stateful_propagators: the indices of the stateful propagators
+    :param states: the flat array of the states
+    """
+    top = 0
+    for prop_idx in stateful_propagators:
+        state_start = state_bounds[prop_idx, START]
+        state_size = state_bounds[prop_idx, END] - state_start
+        states[top : top + state_size] = props_parameters[state_start : state_start + state_size]
+        top += state_size
+
+
+@njit(cache=True)
+def restore_states(
+    props_parameters: NDArray, state_bounds: NDArray, stateful_propagators: NDArray, states: NDArray
+) -> None:
+    """
+    Copies the states of the stateful propagators back from a flat array.
+    :param props_parameters: the parameters of the propagators, the states are stored after the parameters
+    :param state_bounds: the bounds of the states of the propagators
+    :param stateful_propagators: the indices of the stateful propagators
+    :param states: the flat array of the states
+    """
+    top = 0
+    for prop_idx in stateful_propagators:
+        state_start = state_bounds[prop_idx, START]
+        state_size = state_bounds[prop_idx, END] - state_start
+        props_parameters[state_start : state_start + state_size] = states[top : top + state_size]
+        top += state_size
@@ -0,0 +1,180 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import math
+from typing import List
+
+from numba import njit  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import END, START
+
+# The items of the queue tops array, for each bucket.
+QUEUE_HEAD = 0  # the position of the first propagator of the bucket relatively to the start of the bucket
+QUEUE_SIZE = 1  # the number of propagators in the bucket
+
+
+def get_complexity_class(complexity: float) -> int:
+    """
+    Returns the complexity class of a propagator, the propagators of a same class share a bucket of the queue.
+    :param complexity: the estimated amortized complexity of the propagator
+    :return: the complexity class
+    """
+    return int(math.log2(1 + complexity))
+
+
+def get_buckets(complexities: List[float]) -> List[int]:
+    """
+    Returns the bucket of each propagator given the sorted complexities of the propagators.
+    :param complexities: the sorted complexities of the propagators
+    :return: the list of buckets, the buckets are numbered from 0 and are non-decreasing
+    """
+    buckets = []
+    bucket = -1
+    complexity_class = -1
+    for complexity in complexities:
+        if get_complexity_class(complexity) != complexity_class:
+            complexity_class = get_complexity_class(complexity)
+            bucket += 1
+        buckets.append(bucket)
+    return buckets
+
+
+@njit(cache=True)
+def push_propagator(
+    queue: NDArray, queue_bounds: NDArray, queue_tops: NDArray, props_buckets: NDArray, prop_idx: int
+) -> None:
+    """
+    Pushes a propagator at the end of the bucket corresponding to its complexity class.
+    The propagator must not already be in the queue.
+    :param queue: the queue, the propagators of a bucket are stored in a ring buffer
+    :param queue_bounds: the bounds of the buckets in the queue
+    :param queue_tops: the heads and the sizes of the buckets
+    :param props_buckets: the buckets of the propagators
+    :param prop_idx: the index of the propagator
+    """
+    bucket = props_buckets[prop_idx]
+    bucket_start = queue_bounds[bucket, START]
+    bucket_capacity = queue_bounds[bucket, END] - bucket_start
+    size = queue_tops[bucket, QUEUE_SIZE]
+    queue[bucket_start + (queue_tops[bucket, QUEUE_HEAD] + size) % bucket_capacity] = prop_idx
+    queue_tops[bucket, QUEUE_SIZE] = size + 1
+
+
+@njit(cache=True)
+def trigger_propagator(
+    queue: NDArray,
+    queue_bounds: NDArray,
+    queue_tops: NDArray,
+    props_buckets: NDArray,
+    triggered_propagators: NDArray,
+    prop_idx: int,
+) -> None:
+    """
+    Triggers a propagator, the triggered propagators are used as the membership bitmap of the queue.
+    :param queue: the queue
+    :param queue_bounds: the bounds of the buckets in the queue
+    :param queue_tops: the heads and the sizes of the buckets
+    :param props_buckets: the buckets of the propagators
+    :param triggered_propagators: the triggered propagators
+    :param prop_idx: the index of the propagator
+    """
+    if not triggered_propagators[prop_idx]:
+        triggered_propagators[prop_idx] = True
+        push_propagator(queue, queue_bounds, queue_tops, props_buckets, prop_idx)
+
+
+@njit(cache=True)
+def trigger_propagators(
+    triggered_propagators: NDArray,
+    shr_domains_propagators: NDArray,
+    shr_domains_propagators_bounds: NDArray,
+    dom_idx: int,
+    bound: int,
+) -> None:
+    """
+    Marks as triggered the propagators watching a bound of a shared domain, outside of the queue.
+    :param triggered_propagators: the triggered propagators
+    :param shr_domains_propagators: the propagators watching the bounds of the shared domains
+    :param shr_domains_propagators_bounds: the bounds of the propagators watching each bound of each shared domain
+    :param dom_idx: the index of the shared domain
+    :param bound: the bound of the shared domain (MIN or MAX) or HOLE when a value has been removed
+    """
+    for idx in range(
+        shr_domains_propagators_bounds[dom_idx, bound, START], shr_domains_propagators_bounds[dom_idx, bound, END]
+    ):
+        triggered_propagators[shr_domains_propagators[idx]] = True
+
+
+@njit(cache=True)
+def init_queue(
+    queue: NDArray,
+    queue_bounds: NDArray,
+    queue_tops: NDArray,
+    props_buckets: NDArray,
+    triggered_propagators: NDArray,
+    not_entailed_propagators: NDArray,
+) -> None:
+    """
+    Fills the queue with the triggered propagators that are not entailed, in the order of their indices.
+    :param queue: the queue
+    :param queue_bounds: the bounds of the buckets in the queue
+    :param queue_tops: the heads and the sizes of the buckets
+    :param props_buckets: the buckets of the propagators
+    :param triggered_propagators: the triggered propagators
+    :param not_entailed_propagators: the propagators that are not entailed
+    """
+    queue_tops.fill(0)
+    for prop_idx in range(len(triggered_propagators)):
+        if triggered_propagators[prop_idx] and not_entailed_propagators[prop_idx]:
+            push_propagator(queue, queue_bounds, queue_tops, props_buckets, prop_idx)
+
+
+@njit(cache=True)
+def pop_propagator(
+    queue: NDArray,
+    queue_bounds: NDArray,
+    queue_tops: NDArray,
+    triggered_propagators: NDArray,
+    not_entailed_propagators: NDArray,
+    previous_prop_idx: int,
+) -> int:
+    """
+    Pops the first propagator of the first non-empty bucket, entailed propagators are discarded.
+    The previous propagator is not popped again right away: it is left in the queue,
+    at the end of its bucket if there are other propagators in its bucket.
+    :param queue: the queue
+    :param queue_bounds: the bounds of the buckets in the queue
+    :param queue_tops: the heads and the sizes of the buckets
+    :param triggered_propagators: the triggered propagators
+    :param not_entailed_propagators: the propagators that are not entailed
+    :param previous_prop_idx: the index of the previous propagator
+    :return: the index of the propagator or -1 if there is no propagator to pop
+    """
+    for bucket in range(len(queue_tops)):
+        bucket_start = queue_bounds[bucket, START]
+        bucket_capacity = queue_bounds[bucket, END] - bucket_start
+        while queue_tops[bucket, QUEUE_SIZE] > 0:
+            head = queue_tops[bucket, QUEUE_HEAD]
+            prop_idx = queue[bucket_start + head]
+            if prop_idx == previous_prop_idx:
+                if queue_tops[bucket, QUEUE_SIZE] == 1:
+                    break
+                queue[bucket_start + (head + queue_tops[bucket, QUEUE_SIZE]) % bucket_capacity] = prop_idx
+            queue_tops[bucket, QUEUE_HEAD] = (head + 1) % bucket_capacity
+            if prop_idx == previous_prop_idx:
+                continue
+            queue_tops[bucket, QUEUE_SIZE] -= 1
+            triggered_propagators[prop_idx] = False
+            if not_entailed_propagators[prop_idx]:
+                return prop_idx
+    return -1
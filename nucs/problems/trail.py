@@ -0,0 +1,308 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from typing import Tuple
+
+import numpy as np
+from numba import njit  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import END, START
+from nucs.problems.propagator_queue import trigger_propagators
+
+# The columns of the trail, each row of the trail records the previous state of a bound of a shared domain.
+# When the shared domains are backed by bitsets, the words of their bitsets are recorded like their bounds.
+TRAIL_DOM_IDX = 0  # the index of the shared domain
+TRAIL_BOUND = 1  # the bound of the shared domain (MIN or MAX) or the word of its bitset (BITS_LOW or BITS_HIGH)
+TRAIL_VALUE = 2  # the previous value of the bound
+TRAIL_STAMP = 3  # the previous stamp of the bound
+TRAIL_WIDTH = 4
+
+# The items of the trail tops array.
+DOMAINS_TOP = 0  # the top of the domains trail
+ENTAILMENTS_TOP = 1  # the top of the entailments trail
+TRAIL_DEPTH = 2  # the current depth of the search, this is also the stamp of the bounds recorded at this depth
+STATES_TOP = 3  # the top of the states trail
+
+# The columns of the trail choice points: the trail tops when the choice point is pushed and the chosen shared domain.
+CP_DOM_IDX = 2
+
+
+@njit(cache=True)
+def trail_bound(
+    shr_domains: NDArray, shr_domains_stamps: NDArray, trail: NDArray, trail_tops: NDArray, dom_idx: int, bound: int
+) -> None:
+    """
+    Records the value of a bound of a shared domain before it is updated.
+    A bound is recorded at most once per depth, the trail thus grows by at most one row per column of the shared
+    domains per depth.
+    Nothing is recorded at depth 0 since there is nothing to backtrack to.
+    :param shr_domains: the shared domains
+    :param shr_domains_stamps: the depths at which the bounds of the shared domains have been recorded
+    :param trail: the trail
+    :param trail_tops: the trail tops
+    :param dom_idx: the index of the shared domain
+    :param bound: the bound of the shared domain (MIN or MAX) or the word of its bitset (BITS_LOW or BITS_HIGH)
+    """
+    depth = trail_tops[TRAIL_DEPTH]
+    if shr_domains_stamps[dom_idx, bound] < depth:
+        top = trail_tops[DOMAINS_TOP]
+        trail[top, TRAIL_DOM_IDX] = dom_idx
+        trail[top, TRAIL_BOUND] = bound
+        trail[top, TRAIL_VALUE] = shr_domains[dom_idx, bound]
+        trail[top, TRAIL_STAMP] = shr_domains_stamps[dom_idx, bound]
+        trail_tops[DOMAINS_TOP] = top + 1
+        shr_domains_stamps[dom_idx, bound] = depth
+
+
+@njit(cache=True)
+def trail_entailment(entailment_trail: NDArray, trail_tops: NDArray, prop_idx: int) -> None:
+    """
+    Records the entailment of a propagator.
+    A propagator is entailed at most once on a branch, the entailment trail never exceeds the number of propagators.
+    :param entailment_trail: the entailment trail
+    :param trail_tops: the trail tops
+    :param prop_idx: the index of the propagator
+    """
+    if trail_tops[TRAIL_DEPTH] > 0:
+        top = trail_tops[ENTAILMENTS_TOP]
+        entailment_trail[top] = prop_idx
+        trail_tops[ENTAILMENTS_TOP] = top + 1
+
+
+@njit(cache=True)
+def trail_state(
+    props_parameters: NDArray,
+    state_bounds: NDArray,
+    props_states_stamps: NDArray,
+    state_trail: NDArray,
+    trail_tops: NDArray,
+    prop_idx: int,
+) -> None:
+    """
+    Records the state of a propagator before it is computed.
+    A state is recorded at most once per depth, followed by the index of the propagator and its previous stamp.
+    Nothing is recorded at depth 0 since there is nothing to backtrack to.
+    :param props_parameters: the parameters of the propagators, the states are stored after the parameters
+    :param state_bounds: the bounds of the states of the propagators
+    :param props_states_stamps: the depths at which the states of the propagators have been recorded
+    :param state_trail: the states trail
+    :param trail_tops: the trail tops
+    :param prop_idx: the index of the propagator
+    """
+    depth = trail_tops[TRAIL_DEPTH]
+    if props_states_stamps[prop_idx] < depth:
+        top = trail_tops[STATES_TOP]
+        for idx in range(state_bounds[prop_idx, START], state_bounds[prop_idx, END]):
+            state_trail[top] = props_parameters[idx]
+            top += 1
+        state_trail[top] = prop_idx
+        state_trail[top + 1] = props_states_stamps[prop_idx]
+        trail_tops[STATES_TOP] = top + 2
+        props_states_stamps[prop_idx] = depth
+
+
+@njit(cache=True)
+def undo_trail(
+    shr_domains: NDArray,
+    shr_domains_stamps: NDArray,
+    trail: NDArray,
+    not_entailed_propagators: NDArray,
+    entailment_trail: NDArray,
+    props_parameters: NDArray,
+    state_bounds: NDArray,
+    props_states_stamps: NDArray,
+    state_trail: NDArray,
+    trail_tops: NDArray,
+    domains_top: int,
+    entailments_top: int,
+    states_top: int,
+) -> None:
+    """
+    Undoes the changes recorded on the trails since the given tops.
+    :param shr_domains: the shared domains
+    :param shr_domains_stamps: the depths at which the bounds of the shared domains have been recorded
+    :param trail: the trail
+    :param not_entailed_propagators: the propagators that are not entailed
+    :param entailment_trail: the entailment trail
+    :param props_parameters: the parameters of the propagators, the states are stored after the parameters
+    :param state_bounds: the bounds of the states of the propagators
+    :param props_states_stamps: the depths at which the states of the propagators have been recorded
+    :param state_trail: the states trail
+    :param trail_tops: the trail tops
+    :param domains_top: the top of the domains trail to be restored
+    :param entailments_top: the top of the entailments trail to be restored
+    :param states_top: the top of the states trail to be restored
+    """
+    for top in range(trail_tops[DOMAINS_TOP] - 1, domains_top - 1, -1):
+        dom_idx = trail[top, TRAIL_DOM_IDX]
+        bound = trail[top, TRAIL_BOUND]
+        shr_domains[dom_idx, bound] = trail[top, TRAIL_VALUE]
+        shr_domains_stamps[dom_idx, bound] = trail[top, TRAIL_STAMP]
+    trail_tops[DOMAINS_TOP] = domains_top
+    for top in range(trail_tops[ENTAILMENTS_TOP] - 1, entailments_top - 1, -1):
+        not_entailed_propagators[entailment_trail[top]] = True
+    trail_tops[ENTAILMENTS_TOP] = entailments_top
+    top = trail_tops[STATES_TOP]
+    while top > states_top:
+        prop_idx = state_trail[top - 2]
+        props_states_stamps[prop_idx] = state_trail[top - 1]
+        top -= 2 + state_bounds[prop_idx, END] - state_bounds[prop_idx, START]
+        for idx in range(state_bounds[prop_idx, START], state_bounds[prop_idx, END]):
+            props_parameters[idx] = state_trail[top + idx - state_bounds[prop_idx, START]]
+    trail_tops[STATES_TOP] = states_top
+
+
+@njit(cache=True)
+def ensure_trail_capacity(trail: NDArray, trail_tops: NDArray, bound_nb: int) -> NDArray:
+    """
+    Makes sure that the trail can record all the bounds of the shared domains at a new depth.
+    The trail grows geometrically.
+    :param trail: the trail
+    :param trail_tops: the trail tops
+    :param bound_nb: the number of bounds and words of bitsets of the shared domains
+    :return: the trail or a larger copy of it
+    """
+    capacity = trail_tops[DOMAINS_TOP] + bound_nb
+    if capacity <= len(trail):
+        return trail
+    larger_trail = np.empty((max(capacity, 2 * len(trail)), TRAIL_WIDTH), dtype=np.int32)
+    larger_trail[: len(trail)] = trail
+    return larger_trail
+
+
+@njit(cache=True)
+def ensure_state_trail_capacity(state_trail: NDArray, trail_tops: NDArray, state_trail_width: int) -> NDArray:
+    """
+    Makes sure that the states trail can record all the states of the propagators at a new depth.
+    The states trail grows geometrically.
+    :param state_trail: the states trail
+    :param trail_tops: the trail tops
+    :param state_trail_width: the size of the states of the propagators plus two integers per stateful propagator
+    :return: the states trail or a larger copy of it
+    """
+    capacity = trail_tops[STATES_TOP] + state_trail_width
+    if capacity <= len(state_trail):
+        return state_trail
+    larger_state_trail = np.empty(max(capacity, 2 * len(state_trail)), dtype=np.int32)
+    larger_state_trail[: len(state_trail)] = state_trail
+    return larger_state_trail
+
+
+@njit(cache=True)
+def ensure_choice_points_capacity(cp_tops: NDArray, cp_shr_domains: NDArray, depth: int) -> Tuple[NDArray, NDArray]:
+    """
+    Makes sure that a new trail choice point can be pushed at a given depth.
+    The choice points grow geometrically.
+    :param cp_tops: the trail tops and the chosen shared domains of the choice points
+    :param cp_shr_domains: the alternative shared domains of the choice points
+    :param depth: the current depth
+    :return: the choice points or larger copies of them
+    """
+    if depth < len(cp_tops):
+        return cp_tops, cp_shr_domains
+    capacity = 2 * len(cp_tops)
+    larger_cp_tops = np.empty((capacity, cp_tops.shape[1]), dtype=np.int64)
+    larger_cp_tops[:depth] = cp_tops[:depth]
+    larger_cp_shr_domains = np.empty((capacity, 2), dtype=np.int32)
+    larger_cp_shr_domains[:depth] = cp_shr_domains[:depth]
+    return larger_cp_tops, larger_cp_shr_domains
+
+
+@njit(cache=True)
+def push_trail_choice_point(
+    shr_domains: NDArray,
+    shr_domains_stamps: NDArray,
+    trail: NDArray,
+    trail_tops: NDArray,
+    cp_tops: NDArray,
+    cp_shr_domains: NDArray,
+    dom_idx: int,
+) -> int:
+    """
+    Pushes a new choice point made of the trail tops and of a copy of the chosen shared domain.
+    The chosen shared domain is recorded on the trail since it is going to be reduced.
+    The copy is meant to be reduced to the alternative shared domain by a dom heuristic.
+    :param shr_domains: the shared domains
+    :param shr_domains_stamps: the depths at which the bounds of the shared domains have been recorded
+    :param trail: the trail
+    :param trail_tops: the trail tops
+    :param cp_tops: the trail tops and the chosen shared domains of the choice points
+    :param cp_shr_domains: the alternative shared domains of the choice points
+    :param dom_idx: the index of the chosen shared domain
+    :return: the index of the choice point
+    """
+    cp_idx = trail_tops[TRAIL_DEPTH]
+    trail_tops[TRAIL_DEPTH] = cp_idx + 1
+    cp_tops[cp_idx, DOMAINS_TOP] = trail_tops[DOMAINS_TOP]
+    cp_tops[cp_idx, ENTAILMENTS_TOP] = trail_tops[ENTAILMENTS_TOP]
+    cp_tops[cp_idx, CP_DOM_IDX] = dom_idx
+    cp_tops[cp_idx, STATES_TOP] = trail_tops[STATES_TOP]
+    for bound in range(2):
+        trail_bound(shr_domains, shr_domains_stamps, trail, trail_tops, dom_idx, bound)
+        cp_shr_domains[cp_idx, bound] = shr_domains[dom_idx, bound]
+    return cp_idx
+
+
+@njit(cache=True)
+def backtrack_trail(
+    shr_domains: NDArray,
+    shr_domains_stamps: NDArray,
+    trail: NDArray,
+    not_entailed_propagators: NDArray,
+    entailment_trail: NDArray,
+    props_parameters: NDArray,
+    state_bounds: NDArray,
+    props_states_stamps: NDArray,
+    state_trail: NDArray,
+    trail_tops: NDArray,
+    triggered_propagators: NDArray,
+    shr_domains_propagators: NDArray,
+    shr_domains_propagators_bounds: NDArray,
+    cp_tops: NDArray,
+    cp_shr_domains: NDArray,
+) -> bool:
+    """
+    Pops the last trail choice point, undoes the changes recorded since it was pushed and applies its alternative.
+    Only the propagators watching the bounds of the alternative shared domain are triggered.
+    :return: true iff it is possible to backtrack
+    """
+    cp_idx = trail_tops[TRAIL_DEPTH] - 1
+    if cp_idx < 0:
+        return False
+    undo_trail(
+        shr_domains,
+        shr_domains_stamps,
+        trail,
+        not_entailed_propagators,
+        entailment_trail,
+        props_parameters,
+        state_bounds,
+        props_states_stamps,
+        state_trail,
+        trail_tops,
+        cp_tops[cp_idx, DOMAINS_TOP],
+        cp_tops[cp_idx, ENTAILMENTS_TOP],
+        cp_tops[cp_idx, STATES_TOP],
+    )
+    trail_tops[TRAIL_DEPTH] = cp_idx
+    triggered_propagators.fill(False)
+    dom_idx = cp_tops[cp_idx, CP_DOM_IDX]
+    for bound in range(2):
+        value = cp_shr_domains[cp_idx, bound]
+        if shr_domains[dom_idx, bound] != value:
+            trail_bound(shr_domains, shr_domains_stamps, trail, trail_tops, dom_idx, bound)
+            shr_domains[dom_idx, bound] = value
+            trigger_propagators(
+                triggered_propagators, shr_domains_propagators, shr_domains_propagators_bounds, dom_idx, bound
+            )
+    return True
@@ -10,12 +10,14 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
+from typing import Tuple
+
 import numpy as np
 from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_INCONSISTENCY
-from nucs.numpy import new_triggers
+from nucs.numpy import new_parameters, new_triggers
 
 
 def get_complexity_affine_eq(n: int, parameters: NDArray) -> float:
@@ -38,44 +40,99 @@ def get_triggers_affine_eq(n: int, parameters: NDArray) -> NDArray:
     return new_triggers(n, True)
 
 
+# The state of an affine propagator is made of the cached sums of the contributions of the variables,
+# followed by the bounds of the variables when these sums were last updated.
+# A cached sum is stored as two integers: its high part and its 30 low bits.
+AFFINE_SUM_MIN = 0
+AFFINE_SUM_MAX = 2
+AFFINE_LAST_BOUNDS = 4
+AFFINE_LOW_BITS = 30
+
+
+def init_parameters_affine_eq(n: int, parameters: NDArray) -> Tuple[NDArray, int]:
+    """
+    Appends the state to the parameters, the sums and the last bounds are initially null.
+    Since the sums are updated from any change of the bounds, the state is valid for any domains.
+    This is also used by the affine_geq and affine_leq propagators.
+    :param n: the number of variables
+    :param parameters: the parameters
+    :return: the compiled parameters and the size of the state
+    """
+    state_size = AFFINE_LAST_BOUNDS + 2 * n
+    compiled_parameters = new_parameters(len(parameters) + state_size)
+    compiled_parameters[: len(parameters)] = parameters
+    compiled_parameters[len(parameters) :] = 0
+    return compiled_parameters, state_size
+
+
+@njit(cache=True)
+def update_domain_sums(domains: NDArray, parameters: NDArray) -> Tuple[int, int]:
+    """
+    Updates the cached sums from the variables whose bounds have changed since the last update.
+    :param domains: the domains of the variables
+    :param parameters: the compiled parameters
+    :return: the minimal and the maximal values of Sigma_i a_i * x_i
+    """
+    n = len(domains)
+    state = n + 1
+    last_bounds = state + AFFINE_LAST_BOUNDS
+    sum_min = get_sum(parameters, state + AFFINE_SUM_MIN)
+    sum_max = get_sum(parameters, state + AFFINE_SUM_MAX)
+    for i in range(n):
+        min_delta = domains[i, MIN] - parameters[last_bounds + 2 * i]
+        max_delta = domains[i, MAX] - parameters[last_bounds + 2 * i + 1]
+        if min_delta != 0 or max_delta != 0:
+            c = parameters[i]
+            if c > 0:
+                sum_min += c * min_delta
+                sum_max += c * max_delta
+            else:
+                sum_min += c * max_delta
+                sum_max += c * min_delta
+            parameters[last_bounds + 2 * i] = domains[i, MIN]
+            parameters[last_bounds + 2 * i + 1] = domains[i, MAX]
+    set_sum(parameters, state + AFFINE_SUM_MIN, sum_min)
+    set_sum(parameters, state + AFFINE_SUM_MAX, sum_max)
+    return sum_min, sum_max
+
+
 @njit(cache=True)
-def compute_domain_sum_min(domains: NDArray, parameters: NDArray) -> int:
-    domain_sum_min = parameters[-1]
-    for i, c in enumerate(parameters[:-1]):
-        domain_sum_min -= c * (domains[i, MAX] if c > 0 else domains[i, MIN])
-    return domain_sum_min
+def get_sum(parameters: NDArray, idx: int) -> int:
+    return (np.int64(parameters[idx]) << AFFINE_LOW_BITS) + parameters[idx + 1]
 
 
 @njit(cache=True)
-def compute_domain_sum_max(domains: NDArray, parameters: NDArray) -> int:
-    domain_sum_max = parameters[-1]
-    for i, c in enumerate(parameters[:-1]):
-        domain_sum_max -= c * (domains[i, MIN] if c > 0 else domains[i, MAX])
-    return domain_sum_max
+def set_sum(parameters: NDArray, idx: int, value: int) -> None:
+    parameters[idx] = value >> AFFINE_LOW_BITS
+    parameters[idx + 1] = value & ((1 << AFFINE_LOW_BITS) - 1)
 
 
 @njit(cache=True)
-def compute_domains_affine_eq(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_affine_eq(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements Sigma_i a_i * x_i = a_{n-1}.
+    The sums are updated incrementally and a variable is only reduced when its contribution exceeds the slack.
     :param domains: the domains of the variables, x is an alias for domains
-    :param parameters: the parameters of the propagator, a is an alias for parameters
+    :param parameters: the parameters compiled by init_parameters_affine_eq, a is an alias for parameters
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
-    domain_sum_min = compute_domain_sum_min(domains, parameters)
-    domain_sum_max = compute_domain_sum_max(domains, parameters)
-    new_domains = np.copy(domains)
-    for i, c in enumerate(parameters[:-1]):
-        if c != 0:
+    n = len(domains)
+    sum_min, sum_max = update_domain_sums(domains, parameters)
+    domain_sum_min = parameters[n] - sum_max
+    domain_sum_max = parameters[n] - sum_min
+    slack = min(domain_sum_max, -domain_sum_min)
+    for i in range(n):
+        c = parameters[i]
+        if c != 0 and abs(c) * (domains[i, MAX] - domains[i, MIN]) > slack:
             if c > 0:
                 new_min = domains[i, MAX] - (domain_sum_min // -c)
                 new_max = domains[i, MIN] + (domain_sum_max // c)
             else:
                 new_min = domains[i, MAX] - (-domain_sum_max // c)
                 new_max = domains[i, MIN] + (-domain_sum_min // -c)
-            new_domains[i, MIN] = max(domains[i, MIN], new_min)
-            new_domains[i, MAX] = min(domains[i, MAX], new_max)
-            if new_domains[i, MIN] > new_domains[i, MAX]:
+            domains[i, MIN] = max(domains[i, MIN], new_min)
+            domains[i, MAX] = min(domains[i, MAX], new_max)
+            if domains[i, MIN] > domains[i, MAX]:
                 return PROP_INCONSISTENCY
-    domains[:] = new_domains[:]  # numba does not support copyto
     return PROP_CONSISTENCY
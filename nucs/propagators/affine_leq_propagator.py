@@ -10,13 +10,12 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-import numpy as np
 from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
 from nucs.numpy import new_triggers
-from nucs.propagators.affine_eq_propagator import compute_domain_sum_max, compute_domain_sum_min
+from nucs.propagators.affine_eq_propagator import update_domain_sums
 
 
 def get_complexity_affine_leq(n: int, parameters: NDArray) -> float:
@@ -44,26 +43,29 @@ def get_triggers_affine_leq(n: int, parameters: NDArray) -> NDArray:
 
 
 @njit(cache=True)
-def compute_domains_affine_leq(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_affine_leq(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements Sigma_i a_i * x_i <= a_{n-1}.
+    The sums are updated incrementally and a variable is only reduced when its contribution exceeds the slack.
     :param domains: the domains of the variables, x is an alias for domains
-    :param parameters: the parameters of the propagator, a is an alias for parameters
+    :param parameters: the parameters compiled by init_parameters_affine_eq, a is an alias for parameters
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
-    if compute_domain_sum_min(domains, parameters) >= 0:
+    n = len(domains)
+    sum_min, sum_max = update_domain_sums(domains, parameters)
+    if parameters[n] - sum_max >= 0:
         return PROP_ENTAILMENT
-    domain_sum_max = compute_domain_sum_max(domains, parameters)
-    new_domains = np.copy(domains)
-    for i, c in enumerate(parameters[:-1]):
-        if c != 0:
+    domain_sum_max = parameters[n] - sum_min
+    for i in range(n):
+        c = parameters[i]
+        if c != 0 and abs(c) * (domains[i, MAX] - domains[i, MIN]) > domain_sum_max:
             if c > 0:
                 new_max = domains[i, MIN] + (domain_sum_max // c)
-                new_domains[i, MAX] = min(domains[i, MAX], new_max)
+                domains[i, MAX] = min(domains[i, MAX], new_max)
             else:
                 new_min = domains[i, MAX] - (-domain_sum_max // c)
-                new_domains[i, MIN] = max(domains[i, MIN], new_min)
-            if new_domains[i, MIN] > new_domains[i, MAX]:
+                domains[i, MIN] = max(domains[i, MIN], new_min)
+            if domains[i, MIN] > domains[i, MAX]:
                 return PROP_INCONSISTENCY
-    domains[:] = new_domains[:]  # numba does not support copyto
     return PROP_CONSISTENCY
@@ -0,0 +1,299 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from typing import Tuple
+
+from numba import njit  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_INCONSISTENCY
+from nucs.domains import has_bitsets, has_value, remove_value
+from nucs.numpy import new_parameters, new_triggers
+from nucs.propagators.alldifferent_propagator import compute_domains_alldifferent
+
+# The state of the propagator is the last matching: for each variable, the value it is matched to.
+# The nodes of the value graph are the variables, then the values and finally a sink:
+# an edge goes from a variable to its matched value, from a value to any other variable whose domain contains it,
+# from a matched value to the sink and from the sink to a free value.
+
+
+def get_complexity_alldifferent_matching(n: int, parameters: NDArray) -> float:
+    """
+    Returns the time complexity of the propagator as a float.
+    :param n: the number of variables
+    :param parameters: the parameters, unused here
+    :return: a float
+    """
+    return 4 * n * n
+
+
+def get_triggers_alldifferent_matching(n: int, parameters: NDArray) -> NDArray:
+    """
+    This propagator is triggered whenever there is a change in the domain of a variable, including a removed value.
+    :param n: the number of variables
+    :param parameters: the parameters, unused here
+    :return: an array of triggers
+    """
+    return new_triggers(n, True, True)
+
+
+def init_parameters_alldifferent_matching(n: int, parameters: NDArray) -> Tuple[NDArray, int]:
+    """
+    Appends the state to the parameters, the matching is initially arbitrary since it is checked before being used.
+    :param n: the number of variables
+    :param parameters: the parameters, unused here
+    :return: the compiled parameters and the size of the state
+    """
+    compiled_parameters = new_parameters(n)
+    compiled_parameters[:] = 0
+    return compiled_parameters, n
+
+
+@njit(cache=True)
+def augment(
+    domains: NDArray,
+    min_value: int,
+    root: int,
+    matching: NDArray,
+    value_match: NDArray,
+    visited: NDArray,
+    stamp: int,
+    path_vars: NDArray,
+    path_values: NDArray,
+) -> bool:
+    """
+    Matches a free variable by searching an augmenting path with a depth first search.
+    :param domains: the domains of the variables
+    :param min_value: the minimal value of the domains
+    :param root: the free variable
+    :param matching: the values matched to the variables
+    :param value_match: the variables matched to the values, -1 for a free value
+    :param visited: the stamps of the visited values
+    :param stamp: the stamp of this search
+    :param path_vars: the variables of the current path
+    :param path_values: the values of the current path
+    :return: false iff the variable cannot be matched
+    """
+    depth = 0
+    path_vars[0] = root
+    path_values[0] = domains[root, MIN] - 1
+    while depth >= 0:
+        var_idx = path_vars[depth]
+        value = path_values[depth] + 1
+        while value <= domains[var_idx, MAX] and (
+            visited[value - min_value] == stamp or not has_value(domains, var_idx, value)
+        ):
+            value += 1
+        if value > domains[var_idx, MAX]:
+            depth -= 1
+            continue
+        path_values[depth] = value
+        visited[value - min_value] = stamp
+        other_var_idx = value_match[value - min_value]
+        if other_var_idx < 0:
+            for path_idx in range(depth + 1):
+                matching[path_vars[path_idx]] = path_values[path_idx]
+                value_match[path_values[path_idx] - min_value] = path_vars[path_idx]
+            return True
+        depth += 1
+        path_vars[depth] = other_var_idx
+        path_values[depth] = domains[other_var_idx, MIN] - 1
+    return False
+
+
+@njit(cache=True)
+def next_successor(
+    domains: NDArray, min_value: int, matching: NDArray, value_match: NDArray, iterators: NDArray, node: int
+) -> int:
+    """
+    Returns the next successor of a node of the value graph.
+    :param domains: the domains of the variables
+    :param min_value: the minimal value of the domains
+    :param matching: the values matched to the variables
+    :param value_match: the variables matched to the values, -1 for a free value
+    :param iterators: the positions of the iterations over the successors of the nodes
+    :param node: the node
+    :return: the successor or -1 if there is none left
+    """
+    n = len(matching)
+    m = len(value_match)
+    position = iterators[node]
+    if node < n:
+        iterators[node] = 1
+        return n + matching[node] - min_value if position == 0 else -1
+    if node < n + m:
+        value_idx = node - n
+        while position < n:
+            var_idx = position
+            position += 1
+            if value_match[value_idx] != var_idx and has_value(domains, var_idx, min_value + value_idx):
+                iterators[node] = position
+                return var_idx
+        iterators[node] = n + 1
+        return n + m if position == n and value_match[value_idx] >= 0 else -1
+    while position < m:
+        value_idx = position
+        position += 1
+        if value_match[value_idx] < 0:
+            iterators[node] = position
+            return n + value_idx
+    iterators[node] = position
+    return -1
+
+
+@njit(cache=True)
+def compute_components(
+    domains: NDArray,
+    min_value: int,
+    matching: NDArray,
+    value_match: NDArray,
+    orders: NDArray,
+    lows: NDArray,
+    components: NDArray,
+    stack: NDArray,
+    calls: NDArray,
+    iterators: NDArray,
+) -> None:
+    """
+    Computes the strongly connected components of the value graph with an iterative version of Tarjan's algorithm.
+    :param domains: the domains of the variables
+    :param min_value: the minimal value of the domains
+    :param matching: the values matched to the variables
+    :param value_match: the variables matched to the values, -1 for a free value
+    :param orders: the visit orders of the nodes
+    :param lows: the smallest visit orders reachable from the nodes
+    :param components: the array where the components of the nodes are stored
+    :param stack: the stack of the nodes whose component is unknown
+    :param calls: the stack of the recursive calls
+    :param iterators: the positions of the iterations over the successors of the nodes
+    """
+    orders.fill(0)
+    components.fill(-1)
+    iterators.fill(0)
+    order = top = component = 0
+    for root in range(len(orders)):
+        if orders[root] > 0:
+            continue
+        order += 1
+        orders[root] = lows[root] = order
+        stack[top] = root
+        top += 1
+        depth = 0
+        calls[0] = root
+        while depth >= 0:
+            node = calls[depth]
+            successor = next_successor(domains, min_value, matching, value_match, iterators, node)
+            if successor >= 0:
+                if orders[successor] == 0:
+                    order += 1
+                    orders[successor] = lows[successor] = order
+                    stack[top] = successor
+                    top += 1
+                    depth += 1
+                    calls[depth] = successor
+                elif components[successor] < 0:  # the successor is on the stack
+                    lows[node] = min(lows[node], orders[successor])
+                continue
+            if lows[node] == orders[node]:
+                while True:
+                    top -= 1
+                    components[stack[top]] = component
+                    if stack[top] == node:
+                        break
+                component += 1
+            depth -= 1
+            if depth >= 0:
+                lows[calls[depth]] = min(lows[calls[depth]], lows[node])
+
+
+@njit(cache=True)
+def compute_domains_alldifferent_matching(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
+    """
+    Enforces that x_i <> x_j when i<>j.
+    Adapted from "A filtering algorithm for constraints of difference in CSPs":
+    the last matching is repaired, then a value is removed from a domain
+    if the edge between the variable and the value belongs to no maximum matching.
+    Without bitsets, or when the range of the values is too large for the workspace, bound consistency is enforced.
+    :param domains: the domains of the variables, x is an alias for domains
+    :param parameters: the parameters, they only contain the state
+    :param workspace: a scratch buffer
+    :return: the status of the propagation (consistency, inconsistency or entailement) as an int
+    """
+    n = len(domains)
+    if not has_bitsets(domains):
+        return compute_domains_alldifferent(domains, parameters, workspace)
+    min_value = domains[:, MIN].min()
+    m = domains[:, MAX].max() - min_value + 1
+    if m < n:
+        return PROP_INCONSISTENCY
+    node_nb = n + m + 1
+    if m + 6 * node_nb > len(workspace):
+        return compute_domains_alldifferent(domains, parameters, workspace)
+    matching = parameters[len(parameters) - n :]
+    value_match = workspace[:m]
+    orders = workspace[m : m + node_nb]
+    lows = workspace[m + node_nb : m + 2 * node_nb]
+    components = workspace[m + 2 * node_nb : m + 3 * node_nb]
+    stack = workspace[m + 3 * node_nb : m + 4 * node_nb]
+    calls = workspace[m + 4 * node_nb : m + 5 * node_nb]
+    iterators = workspace[m + 5 * node_nb : m + 6 * node_nb]
+    # the last matching is kept as long as its values are still in the domains
+    value_match.fill(-1)
+    for var_idx in range(n):
+        value = matching[var_idx]
+        if has_value(domains, var_idx, value) and value_match[value - min_value] < 0:
+            value_match[value - min_value] = var_idx
+        else:
+            matching[var_idx] = min_value - 1
+    visited = orders[:m]  # the buffers of the components are used as scratch buffers by the matching
+    visited.fill(0)
+    for var_idx in range(n):
+        if matching[var_idx] < min_value and not augment(
+            domains, min_value, var_idx, matching, value_match, visited, var_idx + 1, lows[:n], components[:n]
+        ):
+            return PROP_INCONSISTENCY
+    compute_components(domains, min_value, matching, value_match, orders, lows, components, stack, calls, iterators)
+    for var_idx in range(n):
+        low = domains[var_idx, MIN]
+        while not is_supported(domains, min_value, matching, components, var_idx, low):
+            low += 1
+        high = domains[var_idx, MAX]
+        while not is_supported(domains, min_value, matching, components, var_idx, high):
+            high -= 1
+        domains[var_idx, MIN] = low
+        domains[var_idx, MAX] = high
+        for value in range(low + 1, high):
+            if has_value(domains, var_idx, value) and not is_supported(
+                domains, min_value, matching, components, var_idx, value
+            ):
+                remove_value(domains, var_idx, value)
+    return PROP_CONSISTENCY
+
+
+@njit(cache=True)
+def is_supported(
+    domains: NDArray, min_value: int, matching: NDArray, components: NDArray, var_idx: int, value: int
+) -> bool:
+    """
+    Returns true iff a value of the domain of a variable belongs to a maximum matching,
+    that is if it is matched to the variable or if it is in the same strongly connected component.
+    :param domains: the domains of the variables
+    :param min_value: the minimal value of the domains
+    :param matching: the values matched to the variables
+    :param components: the components of the nodes of the value graph
+    :param var_idx: the index of the variable
+    :param value: the value
+    :return: a boolean
+    """
+    return has_value(domains, var_idx, value) and (
+        value == matching[var_idx] or components[len(matching) + value - min_value] == components[var_idx]
+    )
@@ -12,7 +12,6 @@
 ###############################################################################
 import math
 
-import numpy as np
 from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
@@ -80,6 +79,54 @@ def path_max(t: NDArray, i: int) -> int:
     return i
 
 
+@njit(cache=True)
+def sift_down(domains: NDArray, bound: int, indices: NDArray, root: int, end: int) -> None:
+    """
+    Sifts down an index in a max-heap of indices ordered by the bounds of the domains.
+    :param domains: the domains
+    :param bound: the bound (MIN or MAX)
+    :param indices: the heap of indices
+    :param root: the position of the index to sift down
+    :param end: the size of the heap
+    """
+    child = 2 * root + 1
+    while child < end:
+        if child + 1 < end and domains[indices[child + 1], bound] > domains[indices[child], bound]:
+            child += 1
+        if domains[indices[root], bound] >= domains[indices[child], bound]:
+            return
+        indices[root], indices[child] = indices[child], indices[root]
+        root = child
+        child = 2 * root + 1
+
+
+@njit(cache=True)
+def argsort(domains: NDArray, bound: int, indices: NDArray) -> None:
+    """
+    Sorts the indices of the domains by increasing bounds without allocating memory.
+    Small arrays are insertion sorted, larger arrays are heap sorted.
+    :param domains: the domains
+    :param bound: the bound (MIN or MAX)
+    :param indices: the array where the sorted indices are stored
+    """
+    n = len(indices)
+    for i in range(n):
+        indices[i] = i
+    if n <= 16:
+        for i in range(1, n):
+            j = i
+            while j > 0 and domains[indices[j - 1], bound] > domains[i, bound]:
+                indices[j] = indices[j - 1]
+                j -= 1
+            indices[j] = i
+        return
+    for root in range(n // 2 - 1, -1, -1):
+        sift_down(domains, bound, indices, root, n)
+    for end in range(n - 1, 0, -1):
+        indices[0], indices[end] = indices[end], indices[0]
+        sift_down(domains, bound, indices, 0, end)
+
+
 @njit(cache=True)
 def update_bounds(
     bounds: NDArray,
@@ -194,23 +241,27 @@ def filter_upper(
 
 
 @njit(cache=True)
-def compute_domains_alldifferent(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_alldifferent(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Enforces that x_i <> x_j when i<>j.
     Adapted from "A fast and simple algorithm for bounds consistency of the alldifferent constraint".
     :param domains: the domains of the variables, x is an alias for domains
     :param parameters: unused here
+    :param workspace: a scratch buffer
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     n = len(domains)
-    ranks = np.zeros((n, 2), dtype=np.uint16)
     bounds_nb = 2 * n + 2
-    bounds = np.zeros(bounds_nb, dtype=np.int32)
-    t = np.zeros(bounds_nb, dtype=np.uint16)  # critical capacity pointers
-    d = np.zeros(bounds_nb, dtype=np.int32)  # differences between critical capacities
-    h = np.zeros(bounds_nb, dtype=np.uint16)  # Hall interval pointers
-    min_sorted_vars = np.argsort(domains[:, MIN])
-    max_sorted_vars = np.argsort(domains[:, MAX])
+    workspace[: 2 * n + 4 * bounds_nb] = 0
+    ranks = workspace[: 2 * n].reshape((n, 2))
+    bounds = workspace[2 * n : 2 * n + bounds_nb]
+    t = workspace[2 * n + bounds_nb : 2 * n + 2 * bounds_nb]  # critical capacity pointers
+    d = workspace[2 * n + 2 * bounds_nb : 2 * n + 3 * bounds_nb]  # differences between critical capacities
+    h = workspace[2 * n + 3 * bounds_nb : 2 * n + 4 * bounds_nb]  # Hall interval pointers
+    min_sorted_vars = workspace[2 * n + 4 * bounds_nb : 3 * n + 4 * bounds_nb]
+    max_sorted_vars = workspace[3 * n + 4 * bounds_nb : 4 * n + 4 * bounds_nb]
+    argsort(domains, MIN, min_sorted_vars)
+    argsort(domains, MAX, max_sorted_vars)
     nb = update_bounds(bounds, n, domains, ranks, min_sorted_vars, max_sorted_vars)
     return (
         PROP_CONSISTENCY
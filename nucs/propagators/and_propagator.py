@@ -10,7 +10,6 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-import numpy as np
 from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
@@ -39,18 +38,24 @@ def get_triggers_and(n: int, parameters: NDArray) -> NDArray:
 
 
 @njit(cache=True)
-def compute_domains_and(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_and(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements & b_i = b_{n-1} where for each i, b_i is a boolean variable.
     :param domains: the domains of the variables, b is an alias for domains
     :param parameters: unused here
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     x = domains[:-1]
     y = domains[-1]
-    if np.any(x[:, MAX] == 0):
-        y[MAX] = 0
-    if np.all(x[:, MIN] == 1):
+    for i in range(len(x)):
+        if x[i, MAX] == 0:
+            y[MAX] = 0
+            break
+    for i in range(len(x)):
+        if x[i, MIN] == 0:
+            break
+    else:
         y[MIN] = 1
     if y[MIN] > y[MAX]:
         return PROP_INCONSISTENCY
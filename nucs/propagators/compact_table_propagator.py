@@ -0,0 +1,194 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from typing import Tuple
+
+import numpy as np
+from numba import njit  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.numpy import new_parameters, new_triggers
+
+# The compiled parameters start with the number of words of a bitset and the number of tuples,
+# then, for each variable, its minimal value, its maximal value and the index of the bitset of its minimal value,
+# then the bitsets, and finally the state: the current table and the last bounds of the variables.
+CT_WORD_NB = 0
+CT_TUPLE_NB = 1
+CT_VARIABLES = 2
+CT_WORD_SIZE = 32
+
+
+def get_complexity_compact_table(n: int, parameters: NDArray) -> float:
+    """
+    Returns the time complexity of the propagator as a float.
+    :param n: the number of variables
+    :param parameters: the parameters
+    :return: a float
+    """
+    return 3 * n * (len(parameters) // n // CT_WORD_SIZE + 1)
+
+
+def get_triggers_compact_table(n: int, parameters: NDArray) -> NDArray:
+    """
+    This propagator is triggered whenever there is a change in the domain of a variable.
+    :param n: the number of variables
+    :param parameters: the parameters, unused here
+    :return: an array of triggers
+    """
+    return new_triggers(n, True)
+
+
+def init_parameters_compact_table(n: int, parameters: NDArray) -> Tuple[NDArray, int]:
+    """
+    Compiles the allowed tuples into bitsets: for each variable and each value,
+    the bitset of the tuples that support this value.
+    The state of the propagator is the current table followed by the last bounds of the variables.
+    :param n: the number of variables
+    :param parameters: the allowed tuples, with the same layout as for the relation propagator
+    :return: the compiled parameters and the size of the state
+    """
+    tuples = np.array(parameters, dtype=np.int64).reshape((-1, n))
+    tuple_nb = len(tuples)
+    word_nb = max(1, (tuple_nb + CT_WORD_SIZE - 1) // CT_WORD_SIZE)
+    min_values = tuples.min(axis=0) if tuple_nb > 0 else np.zeros(n, dtype=np.int64)
+    max_values = tuples.max(axis=0) if tuple_nb > 0 else np.full(n, -1, dtype=np.int64)
+    value_nbs = max_values - min_values + 1
+    header_size = CT_VARIABLES + 3 * n
+    state_size = word_nb + 2 * n
+    state = header_size + int(value_nbs.sum()) * word_nb
+    compiled_parameters = new_parameters(state + state_size)
+    compiled_parameters[CT_WORD_NB] = word_nb
+    compiled_parameters[CT_TUPLE_NB] = tuple_nb
+    bitsets = np.zeros((int(value_nbs.sum()), word_nb), dtype=np.uint32)
+    bitset_idx = 0
+    for var_idx in range(n):
+        compiled_parameters[CT_VARIABLES + 3 * var_idx] = min_values[var_idx]
+        compiled_parameters[CT_VARIABLES + 3 * var_idx + 1] = max_values[var_idx]
+        compiled_parameters[CT_VARIABLES + 3 * var_idx + 2] = header_size + bitset_idx * word_nb
+        for tuple_idx in range(tuple_nb):
+            word, bit = divmod(tuple_idx, CT_WORD_SIZE)
+            bitsets[bitset_idx + tuples[tuple_idx, var_idx] - min_values[var_idx], word] |= np.uint32(1 << bit)
+        bitset_idx += value_nbs[var_idx]
+    compiled_parameters[header_size:state] = bitsets.view(np.int32).reshape(-1)
+    # Initially, all the tuples are valid.
+    table = np.full(word_nb, 0xFFFFFFFF, dtype=np.uint32)
+    remainder = tuple_nb - (word_nb - 1) * CT_WORD_SIZE
+    table[word_nb - 1] = (1 << remainder) - 1
+    compiled_parameters[state : state + word_nb] = table.view(np.int32)
+    compiled_parameters[state + word_nb : state + word_nb + n] = min_values
+    compiled_parameters[state + word_nb + n :] = max_values
+    return compiled_parameters, state_size
+
+
+@njit(cache=True)
+def compute_domains_compact_table(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
+    """
+    Implements a relation over n variables defined by its allowed tuples with the Compact-Table algorithm.
+    The current table, the set of the tuples that are still valid, is a bitset kept in the backtrackable state
+    of the propagator: for each variable whose bounds have changed since the last call,
+    either the supports of the remaining values are intersected or the supports of the removed values are subtracted.
+    :param domains: the domains of the variables
+    :param parameters: the parameters compiled by init_parameters_compact_table
+    :param workspace: a scratch buffer, the supports of a variable are stored there
+    :return: the status of the propagation (consistency, inconsistency or entailement) as an int
+    """
+    n = len(domains)
+    word_nb = parameters[CT_WORD_NB]
+    state = len(parameters) - word_nb - 2 * n
+    table = parameters[state : state + word_nb]
+    last_lows = parameters[state + word_nb : state + word_nb + n]
+    last_highs = parameters[state + word_nb + n :]
+    supports = workspace[:word_nb]
+    for var_idx in range(n):
+        min_value = parameters[CT_VARIABLES + 3 * var_idx]
+        first_bitset = parameters[CT_VARIABLES + 3 * var_idx + 2]
+        low = max(domains[var_idx, MIN], last_lows[var_idx])
+        high = min(domains[var_idx, MAX], last_highs[var_idx])
+        if low > high:
+            return PROP_INCONSISTENCY
+        removed_value_nb = last_highs[var_idx] - last_lows[var_idx] - high + low
+        if removed_value_nb == 0:
+            continue
+        supports.fill(0)
+        if removed_value_nb < high - low + 1:
+            add_supports(
+                parameters,
+                first_bitset + (last_lows[var_idx] - min_value) * word_nb,
+                last_lows[var_idx],
+                low - 1,
+                supports,
+            )
+            add_supports(
+                parameters, first_bitset + (high + 1 - min_value) * word_nb, high + 1, last_highs[var_idx], supports
+            )
+            for word_idx in range(word_nb):
+                table[word_idx] &= ~supports[word_idx]
+        else:
+            add_supports(parameters, first_bitset + (low - min_value) * word_nb, low, high, supports)
+            for word_idx in range(word_nb):
+                table[word_idx] &= supports[word_idx]
+        last_lows[var_idx] = low
+        last_highs[var_idx] = high
+    valid_tuple_nb = 0
+    for word_idx in range(word_nb):
+        word = table[word_idx] & 0xFFFFFFFF
+        if word != 0:
+            valid_tuple_nb += 1 if word & (word - 1) == 0 else 2
+    if valid_tuple_nb == 0:
+        return PROP_INCONSISTENCY
+    for var_idx in range(n):
+        min_value = parameters[CT_VARIABLES + 3 * var_idx]
+        first_bitset = parameters[CT_VARIABLES + 3 * var_idx + 2]
+        low = last_lows[var_idx]
+        high = last_highs[var_idx]
+        while not is_supported(parameters, first_bitset + (low - min_value) * word_nb, table):
+            low += 1
+        while not is_supported(parameters, first_bitset + (high - min_value) * word_nb, table):
+            high -= 1
+        domains[var_idx, MIN] = last_lows[var_idx] = low
+        domains[var_idx, MAX] = last_highs[var_idx] = high
+    if valid_tuple_nb == 1:
+        return PROP_ENTAILMENT
+    return PROP_CONSISTENCY
+
+
+@njit(cache=True)
+def add_supports(parameters: NDArray, bitset: int, low: int, high: int, supports: NDArray) -> None:
+    """
+    Adds the bitsets of the supports of some consecutive values.
+    :param parameters: the compiled parameters
+    :param bitset: the index of the bitset of the supports of the first value
+    :param low: the first value
+    :param high: the last value
+    :param supports: the bitset to update
+    """
+    word_nb = len(supports)
+    for _ in range(low, high + 1):
+        for word_idx in range(word_nb):
+            supports[word_idx] |= parameters[bitset + word_idx]
+        bitset += word_nb
+
+
+@njit(cache=True)
+def is_supported(parameters: NDArray, bitset: int, table: NDArray) -> bool:
+    """
+    Returns true iff a bitset of supports intersects the current table.
+    :param parameters: the compiled parameters
+    :param bitset: the index of the bitset of supports
+    :param table: the current table
+    :return: a boolean
+    """
+    for word_idx in range(len(table)):
+        if parameters[bitset + word_idx] & table[word_idx] != 0:
+            return True
+    return False
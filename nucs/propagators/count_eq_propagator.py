@@ -14,6 +14,7 @@ from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.domains import has_value, remove_value
 from nucs.numpy import new_triggers
 
 
@@ -29,20 +30,22 @@ def get_complexity_count_eq(n: int, parameters: NDArray) -> float:
 
 def get_triggers_count_eq(n: int, parameters: NDArray) -> NDArray:
     """
-    This propagator is triggered whenever there is a change in the domain of a variable.
+    This propagator is triggered whenever there is a change in the domain of a variable, including a removed value.
     :param n: the number of variables
     :param parameters: the parameters, unused here
     :return: an array of triggers
     """
-    return new_triggers(n, True)
+    return new_triggers(n, True, True)
 
 
 @njit(cache=True)
-def compute_domains_count_eq(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_count_eq(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements Sigma_i (x_i == a) = x_{n-1}.
+    When the domains are backed by bitsets, a is removed from the domains that cannot be equal to a.
     :param domains: the domains of the variables, x is an alias for domains
     :param parameters: the parameters of the propagator, a is the first parameter
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     a = parameters[0]
@@ -50,10 +53,10 @@ def compute_domains_count_eq(domains: NDArray, parameters: NDArray) -> int:
     counter = domains[-1]
     count_max = len(x)
     count_min = 0
-    for x_i in x:
-        if x_i[MIN] > a or x_i[MAX] < a:
+    for idx in range(len(x)):
+        if not has_value(x, idx, a):
             count_max -= 1
-        elif x_i[MIN] == a and x_i[MAX] == a:
+        elif x[idx, MIN] == a and x[idx, MAX] == a:
             count_min += 1
     counter[MIN] = max(counter[MIN], count_min)
     counter[MAX] = min(counter[MAX], count_max)
@@ -62,13 +65,11 @@ def compute_domains_count_eq(domains: NDArray, parameters: NDArray) -> int:
     if count_min == count_max:
         return PROP_ENTAILMENT
     if count_min == counter[MAX]:  # we cannot have more domains equal to a
-        for x_i in x:
-            if x_i[MIN] == a and x_i[MAX] > a:
-                x_i[MIN] = a + 1
-            elif x_i[MIN] < a and x_i[MAX] == a:
-                x_i[MAX] = a - 1
+        for idx in range(len(x)):
+            if x[idx, MIN] < x[idx, MAX]:
+                remove_value(x, idx, a)
     if count_max == counter[MIN]:  # we cannot have more domains different from a
-        for x_i in x:
-            if x_i[MIN] <= a <= x_i[MAX]:
-                x_i[:] = a
+        for idx in range(len(x)):
+            if has_value(x, idx, a):
+                x[idx, MIN] = x[idx, MAX] = a
     return PROP_CONSISTENCY
@@ -38,7 +38,7 @@ def get_triggers_dummy(n: int, parameters: NDArray) -> NDArray:
 
 
 @njit(cache=True)
-def compute_domains_dummy(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_dummy(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     A propagator that does nothing.
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
@@ -14,6 +14,7 @@ from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.domains import has_value, remove_value
 from nucs.numpy import new_triggers
 
 
@@ -29,20 +30,22 @@ def get_complexity_element_lic(n: int, parameters: NDArray) -> float:
 
 def get_triggers_element_lic(n: int, parameters: NDArray) -> NDArray:
     """
-    This propagator is triggered whenever there is a change in the domain of a variable.
+    This propagator is triggered whenever there is a change in the domain of a variable, including a removed value.
     :param n: the number of variables
     :param parameters: the parameters, unused here
     :return: an array of triggers
     """
-    return new_triggers(n, True)
+    return new_triggers(n, True, True)
 
 
 @njit(cache=True)
-def compute_domains_element_lic(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_element_lic(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Enforces l_i = c.
+    When the domains are backed by bitsets, the unsupported values of i are removed.
     :param domains: the domains of the variables, l is the list of the first n-1 domains, i is the last domain
     :param parameters: the parameters of the propagator, c is the first parameter
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     l = domains[:-1]
@@ -53,18 +56,9 @@ def compute_domains_element_lic(domains: NDArray, parameters: NDArray) -> int:
     if i[MAX] < i[MIN]:
         return PROP_INCONSISTENCY
     c = parameters[0]
-    i_min = i[MIN]
-    i_max = i[MAX]
     for idx in range(i[MIN], i[MAX] + 1):
-        if c < l[idx, MIN] or c > l[idx, MAX]:  # no intersection
-            if idx == i_min:
-                i_min += 1
-            elif idx == i_max:
-                i_max -= 1
-    if i_max < i_min:
-        return PROP_INCONSISTENCY
-    i[MIN] = i_min
-    i[MAX] = i_max
+        if not has_value(l, idx, c) and not remove_value(domains, len(l), idx):  # no intersection
+            return PROP_INCONSISTENCY
     # when strict, update l
     # for idx in range(0, i[MIN]):
     #     if l[idx, MIN] == c:
@@ -80,7 +74,7 @@ def compute_domains_element_lic(domains: NDArray, parameters: NDArray) -> int:
     #         l[idx, MAX] = c - 1
     #     if l[idx, MIN] > l[idx, MAX]:
     #         return PROP_INCONSISTENCY
-    if i_min == i_max:
-        l[i_min, MIN] = l[i_max, MAX] = c
+    if i[MIN] == i[MAX]:
+        l[i[MIN], MIN] = l[i[MIN], MAX] = c
         return PROP_ENTAILMENT
     return PROP_CONSISTENCY
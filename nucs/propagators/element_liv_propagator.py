@@ -16,6 +16,7 @@ from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.domains import has_value, remove_value
 from nucs.numpy import new_triggers
 
 
@@ -31,23 +32,25 @@ def get_complexity_element_liv(n: int, parameters: NDArray) -> float:
 
 def get_triggers_element_liv(n: int, parameters: NDArray) -> NDArray:
     """
-    This propagator is triggered whenever there is a change in the domain of a variable.
+    This propagator is triggered whenever there is a change in the domain of a variable, including a removed value.
     :param n: the number of variables
     :param parameters: the parameters, unused here
     :return: an array of triggers
     """
-    return new_triggers(n, True)
+    return new_triggers(n, True, True)
 
 
 @njit(cache=True)
-def compute_domains_element_liv(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_element_liv(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Enforces l_i = v.
+    When the domains are backed by bitsets, the unsupported values of i are removed.
     :param domains: the domains of the variables,
            l is the list of the first n-2 domains,
            i is the (n-1)th domain,
            v is the last domain
     :param parameters: the parameters of the propagator, it is unused
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     l = domains[:-2]
@@ -59,28 +62,22 @@ def compute_domains_element_liv(domains: NDArray, parameters: NDArray) -> int:
     v = domains[-1]
     v_min = sys.maxsize
     v_max = -sys.maxsize
-    i_min = i[MIN]
-    i_max = i[MAX]
     for idx in range(i[MIN], i[MAX] + 1):
+        if not has_value(domains, len(l), idx):
+            continue
         if v[MAX] < l[idx, MIN] or v[MIN] > l[idx, MAX]:  # no intersection
-            if idx == i_min:
-                i_min += 1
-            elif idx == i_max:
-                i_max -= 1
+            if not remove_value(domains, len(l), idx):
+                return PROP_INCONSISTENCY
         else:  # intersection
             if l[idx, MIN] < v_min:
                 v_min = l[idx, MIN]
             if l[idx, MAX] > v_max:
                 v_max = l[idx, MAX]
-    if i_max < i_min:
-        return PROP_INCONSISTENCY
-    i[MIN] = i_min
-    i[MAX] = i_max
     v[MIN] = max(v[MIN], v_min)
     v[MAX] = min(v[MAX], v_max)
-    if i_min == i_max:
-        l[i_min, MIN] = max(l[i_min, MIN], v[MIN])
-        l[i_max, MAX] = min(l[i_max, MAX], v[MAX])
+    if i[MIN] == i[MAX]:
+        l[i[MIN], MIN] = max(l[i[MIN], MIN], v[MIN])
+        l[i[MAX], MAX] = min(l[i[MAX], MAX], v[MAX])
         if v[MIN] == v[MAX]:
             return PROP_ENTAILMENT
     return PROP_CONSISTENCY
@@ -14,6 +14,7 @@ from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.domains import has_value, remove_value
 from nucs.numpy import new_triggers
 
 
@@ -29,45 +30,45 @@ def get_complexity_exactly_eq(n: int, parameters: NDArray) -> float:
 
 def get_triggers_exactly_eq(n: int, parameters: NDArray) -> NDArray:
     """
-    This propagator is triggered whenever there is a change in the domain of a variable.
+    This propagator is triggered whenever there is a change in the domain of a variable, including a removed value.
     :param n: the number of variables
     :param parameters: the parameters, unused here
     :return: an array of triggers
     """
-    return new_triggers(n, True)
+    return new_triggers(n, True, True)
 
 
 @njit(cache=True)
-def compute_domains_exactly_eq(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_exactly_eq(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements Sigma_i (x_i == a) = c.
+    When the domains are backed by bitsets, a is removed from the domains that cannot be equal to a.
     :param domains: the domains of the variables, x is an alias for domains
     :param parameters: the parameters of the propagator, a is the first parameter, c is the second parameter
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     a = parameters[0]
     c = parameters[1]
     count_max = len(domains) - c
     count_min = -c
-    for domain in domains:
-        if domain[MIN] > a or domain[MAX] < a:
+    for idx in range(len(domains)):
+        if not has_value(domains, idx, a):
             count_max -= 1
             if count_max < 0:
                 return PROP_INCONSISTENCY
-        elif domain[MIN] == a and domain[MAX] == a:
+        elif domains[idx, MIN] == a and domains[idx, MAX] == a:
             count_min += 1
             if count_min > 0:
                 return PROP_INCONSISTENCY
     if count_min == 0 and count_max == 0:
         return PROP_ENTAILMENT
     if count_min == 0:  # we cannot have more domains equal to a
-        for domain in domains:
-            if domain[MIN] == a and domain[MAX] > a:
-                domain[MIN] = a + 1
-            if domain[MIN] < a and domain[MAX] == a:
-                domain[MAX] = a - 1
+        for idx in range(len(domains)):
+            if domains[idx, MIN] < domains[idx, MAX]:
+                remove_value(domains, idx, a)
     elif count_max == 0:  # we cannot have more domains different from a
-        for domain in domains:
-            if domain[MIN] <= a <= domain[MAX]:
-                domain[:] = a
+        for idx in range(len(domains)):
+            if has_value(domains, idx, a):
+                domains[idx, MIN] = domains[idx, MAX] = a
     return PROP_CONSISTENCY
@@ -12,13 +12,12 @@
 ###############################################################################
 import math
 
-import numpy as np
 from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_INCONSISTENCY
 from nucs.numpy import new_triggers
-from nucs.propagators.alldifferent_propagator import path_max, path_min, path_set
+from nucs.propagators.alldifferent_propagator import argsort, path_max, path_min, path_set
 
 
 def get_complexity_gcc(n: int, parameters: NDArray) -> float:
@@ -41,16 +40,16 @@ def get_triggers_gcc(n: int, parameters: NDArray) -> NDArray:
 
 
 @njit(cache=True)
-def init_partial_sum(first_value: int, m: int, values: NDArray) -> NDArray:
+def init_partial_sum(partial_sum: NDArray, first_value: int, m: int, values: NDArray) -> None:
     """
-    Inits the partial_sum data structure:
+    Inits the partial_sum data structure, an array of shape (2, m + 6):
     ---------------------
     | sum | first_value |
     ---------------------
     | ds  | last_value  |
     ---------------------
     """
-    partial_sum = np.zeros((2, m + 6), dtype=np.int32)
+    partial_sum[:] = 0
     partial_sum[0, -1] = first_value - 3
     partial_sum[1, -1] = first_value + m + 1
     sum = partial_sum[0, :-1]
@@ -72,7 +71,6 @@ def init_partial_sum(first_value: int, m: int, values: NDArray) -> NDArray:
         j = i
         i -= 1
     ds[j] = 0
-    return partial_sum
 
 
 @njit(cache=True)
@@ -400,29 +398,37 @@ def filter_upper_min(
 
 
 @njit(cache=True)
-def compute_domains_gcc(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_gcc(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     This propagator (Global Cardinality Constraint) enforces that l_j <= |{ i / x_i =v_j }| <= c_j for all j.
     Adapted from "An efficient bounds consistency algorithm for the global cardinality constraint".
     :param domains: the domains of the variables
     :param parameters: there are 1 + 2 * m parameters:
     the first domain value (v_0), then the m lower bounds, then the m upper bounds (capacities)
+    :param workspace: a scratch buffer
     """
     n = len(domains)
     m = (len(parameters) - 1) // 2  # number of values
     bounds_nb = 2 * n + 2
-    ranks = np.zeros((n, 2), dtype=np.uint16)
-    bounds = np.zeros(bounds_nb, dtype=np.int32)
-    t = np.zeros(bounds_nb, dtype=np.uint16)  # critical capacity pointers
-    d = np.zeros(bounds_nb, dtype=np.int32)  # differences between critical capacities
-    h = np.zeros(bounds_nb, dtype=np.uint16)  # Hall interval pointers
-    stbl_intervals = np.zeros(bounds_nb, dtype=np.int32)
-    pot_stbl_sets = np.zeros(bounds_nb, dtype=np.int32)
-    new_mins = np.zeros(n, dtype=np.int32)
-    l = init_partial_sum(parameters[0], m, parameters[1 : 1 + m])
-    u = init_partial_sum(parameters[0], m, parameters[1 + m :])
-    min_sorted_vars = np.argsort(domains[:, MIN])
-    max_sorted_vars = np.argsort(domains[:, MAX])
+    workspace[: 3 * n + 6 * bounds_nb] = 0
+    ranks = workspace[: 2 * n].reshape((n, 2))
+    bounds = workspace[2 * n : 2 * n + bounds_nb]
+    t = workspace[2 * n + bounds_nb : 2 * n + 2 * bounds_nb]  # critical capacity pointers
+    d = workspace[2 * n + 2 * bounds_nb : 2 * n + 3 * bounds_nb]  # differences between critical capacities
+    h = workspace[2 * n + 3 * bounds_nb : 2 * n + 4 * bounds_nb]  # Hall interval pointers
+    stbl_intervals = workspace[2 * n + 4 * bounds_nb : 2 * n + 5 * bounds_nb]
+    pot_stbl_sets = workspace[2 * n + 5 * bounds_nb : 2 * n + 6 * bounds_nb]
+    new_mins = workspace[2 * n + 6 * bounds_nb : 3 * n + 6 * bounds_nb]
+    min_sorted_vars = workspace[3 * n + 6 * bounds_nb : 4 * n + 6 * bounds_nb]
+    max_sorted_vars = workspace[4 * n + 6 * bounds_nb : 5 * n + 6 * bounds_nb]
+    partial_sum_start = 5 * n + 6 * bounds_nb
+    partial_sum_size = 2 * (m + 6)
+    l = workspace[partial_sum_start : partial_sum_start + partial_sum_size].reshape((2, m + 6))
+    u = workspace[partial_sum_start + partial_sum_size : partial_sum_start + 2 * partial_sum_size].reshape((2, m + 6))
+    init_partial_sum(l, parameters[0], m, parameters[1 : 1 + m])
+    init_partial_sum(u, parameters[0], m, parameters[1 + m :])
+    argsort(domains, MIN, min_sorted_vars)
+    argsort(domains, MAX, max_sorted_vars)
     nb = update_bounds(bounds, n, domains, ranks, min_sorted_vars, max_sorted_vars, l, u)
     # assert get_min_value(l) == get_min_value(u)
     # assert get_max_value(l) == get_max_value(u)
@@ -144,7 +144,7 @@ def compute_domains_1(x: NDArray, y: NDArray, n: int, i: int, q: int, r: int, s:
 
 
 @njit(cache=True)
-def compute_domains_lexicographic_leq(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_lexicographic_leq(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements lexicographic leq: x <_leq y.
     See https://www.diva-portal.org/smash/record.jsf?pid=diva2:1041533.
@@ -152,6 +152,7 @@ def compute_domains_lexicographic_leq(domains: NDArray, parameters: NDArray) ->
            x is the list of the first n domains,
            y is the list of the last n domains
     :param parameters: unused here
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     # TODO: make incremental, use a var?
@@ -43,11 +43,12 @@ def get_triggers_min_geq(n: int, parameters: NDArray) -> NDArray:
 
 
 @njit(cache=True)
-def compute_domains_min_geq(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_min_geq(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements Min_i x_i >= x_{n-1}.
     :param domains: the domains of the variables, x is an alias for domains
     :param parameters: unused here
+    :param workspace: unused here
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     x = domains[:-1]
@@ -10,8 +10,10 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
+from typing import Callable, List, Optional
+
 import numpy as np
-from numba import int32, int64, njit, types  # type: ignore
+from numba import int32, int64, types  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.numba import NUMBA_DISABLE_JIT, build_function_address_list
@@ -19,6 +21,7 @@ from nucs.propagators.affine_eq_propagator import (
     compute_domains_affine_eq,
     get_complexity_affine_eq,
     get_triggers_affine_eq,
+    init_parameters_affine_eq,
 )
 from nucs.propagators.affine_geq_propagator import (
     compute_domains_affine_geq,
@@ -30,12 +33,24 @@ from nucs.propagators.affine_leq_propagator import (
     get_complexity_affine_leq,
     get_triggers_affine_leq,
 )
+from nucs.propagators.alldifferent_matching_propagator import (
+    compute_domains_alldifferent_matching,
+    get_complexity_alldifferent_matching,
+    get_triggers_alldifferent_matching,
+    init_parameters_alldifferent_matching,
+)
 from nucs.propagators.alldifferent_propagator import (
     compute_domains_alldifferent,
     get_complexity_alldifferent,
     get_triggers_alldifferent,
 )
 from nucs.propagators.and_propagator import compute_domains_and, get_complexity_and, get_triggers_and
+from nucs.propagators.compact_table_propagator import (
+    compute_domains_compact_table,
+    get_complexity_compact_table,
+    get_triggers_compact_table,
+    init_parameters_compact_table,
+)
 from nucs.propagators.count_eq_propagator import (
     compute_domains_count_eq,
     get_complexity_count_eq,
@@ -98,7 +113,9 @@ from nucs.propagators.relation_propagator import (
     ALG_MIN_EQ,
     ALG_MIN_GEQ,
     ALG_RELATION,
-) = tuple(range(18))
+    ALG_COMPACT_TABLE,
+    ALG_ALLDIFFERENT_MATCHING,
+) = tuple(range(20))
 
 
 GET_TRIGGERS_FCTS = [
@@ -120,6 +137,8 @@ GET_TRIGGERS_FCTS = [
     get_triggers_min_eq,
     get_triggers_min_geq,
     get_triggers_relation,
+    get_triggers_compact_table,
+    get_triggers_alldifferent_matching,
 ]
 
 GET_COMPLEXITY_FCTS = [
@@ -141,8 +160,39 @@ GET_COMPLEXITY_FCTS = [
     get_complexity_min_eq,
     get_complexity_min_geq,
     get_complexity_relation,
+    get_complexity_compact_table,
+    get_complexity_alldifferent_matching,
 ]
 
+# The functions compiling the parameters of the propagators when the problem is initialized, None for no compilation.
+# Such a function returns the compiled parameters and the size of the backtrackable state of the propagator,
+# the state is made of the last parameters: it can be updated by the propagator and is restored on backtrack.
+# The affine propagators share the same state, the cached sums of the contributions of their variables.
+INIT_PARAMETERS_FCTS: List[Optional[Callable]] = [
+    None,
+    init_parameters_affine_eq,
+    init_parameters_affine_eq,
+    init_parameters_affine_eq,
+    *[None] * (ALG_COMPACT_TABLE - ALG_ALLDIFFERENT),
+    init_parameters_compact_table,
+    init_parameters_alldifferent_matching,
+]
+
+
+def get_workspace_size(n: int, parameter_nb: int) -> int:
+    """
+    Returns the size of the workspace needed by a propagator,
+    the workspace is a scratch buffer shared by all the propagators so that they do not allocate memory.
+    The most demanding propagators are alldifferent, gcc (which also needs 4 * m + 24 integers for m values),
+    relation (which needs one integer per tuple) and compact table (which needs one bit per tuple).
+    The matching alldifferent needs 7 * m + 6 * n + 6 integers for m values,
+    it enforces bound consistency when the workspace is smaller.
+    :param n: the number of variables
+    :param parameter_nb: the number of parameters
+    :return: an int
+    """
+    return 17 * n + 2 * parameter_nb + 36
+
 
 COMPUTE_DOMAINS_FCTS = [
     compute_domains_and,
@@ -163,9 +213,11 @@ COMPUTE_DOMAINS_FCTS = [
     compute_domains_min_eq,
     compute_domains_min_geq,
     compute_domains_relation,
+    compute_domains_compact_table,
+    compute_domains_alldifferent_matching,
 ]
 
-COMPUTE_DOMAIN_SIGNATURE = int64(int32[:, :], int32[:])
+COMPUTE_DOMAIN_SIGNATURE = int64(int32[:, :], int32[:], int32[::1])
 COMPUTE_DOMAIN_TYPE = types.FunctionType(COMPUTE_DOMAIN_SIGNATURE)
 COMPUTE_DOMAINS_ADDRS = (
     np.array(build_function_address_list(COMPUTE_DOMAINS_FCTS, COMPUTE_DOMAIN_SIGNATURE))
@@ -174,10 +226,54 @@ COMPUTE_DOMAINS_ADDRS = (
 )
 
 
-@njit(cache=True)
-def pop_propagator(triggered_propagators: NDArray, not_entailed_propagators: NDArray, previous_prop_idx: int) -> int:
-    for prop_idx, triggered_prop in enumerate(triggered_propagators):
-        if triggered_prop and not_entailed_propagators[prop_idx] and prop_idx != previous_prop_idx:
-            triggered_propagators[prop_idx] = False
-            return prop_idx
-    return -1
+def get_compute_domains_addrs() -> NDArray:
+    """
+    Returns the addresses of the compute_domains functions of the propagators.
+    The array is rebuilt when a propagator is registered, so it must not be kept.
+    :return: a Numpy array
+    """
+    return COMPUTE_DOMAINS_ADDRS
+
+
+def register_propagator(
+    get_triggers_fct: Callable,
+    get_complexity_fct: Callable,
+    compute_domains_fct: Callable,
+    init_parameters_fct: Optional[Callable] = None,
+) -> int:
+    """
+    Registers a custom propagator, it can then be used like the predefined propagators.
+    The compute_domains function must be JIT compiled with Numba and must match COMPUTE_DOMAIN_SIGNATURE,
+    the size of its workspace is given by get_workspace_size.
+    :param get_triggers_fct: the function returning the triggers of the propagator
+    :param get_complexity_fct: the function returning the complexity of the propagator
+    :param compute_domains_fct: the function computing the domains of the propagator
+    :param init_parameters_fct: the optional function compiling the parameters when the problem is initialized,
+    it returns the compiled parameters and the size of the state ending them
+    :return: the algorithm of the propagator
+    """
+    global COMPUTE_DOMAINS_ADDRS
+    GET_TRIGGERS_FCTS.append(get_triggers_fct)
+    GET_COMPLEXITY_FCTS.append(get_complexity_fct)
+    INIT_PARAMETERS_FCTS.append(init_parameters_fct)
+    COMPUTE_DOMAINS_FCTS.append(compute_domains_fct)
+    if not NUMBA_DISABLE_JIT:
+        COMPUTE_DOMAINS_ADDRS = np.append(
+            COMPUTE_DOMAINS_ADDRS, build_function_address_list([compute_domains_fct], COMPUTE_DOMAIN_SIGNATURE)
+        )
+    return len(COMPUTE_DOMAINS_FCTS) - 1
+
+
+def unregister_propagator(algorithm: int) -> None:
+    """
+    Unregisters the last registered custom propagator.
+    :param algorithm: the algorithm of the propagator
+    """
+    global COMPUTE_DOMAINS_ADDRS
+    assert algorithm == len(COMPUTE_DOMAINS_FCTS) - 1 > ALG_ALLDIFFERENT_MATCHING
+    GET_TRIGGERS_FCTS.pop()
+    GET_COMPLEXITY_FCTS.pop()
+    INIT_PARAMETERS_FCTS.pop()
+    COMPUTE_DOMAINS_FCTS.pop()
+    if not NUMBA_DISABLE_JIT:
+        COMPUTE_DOMAINS_ADDRS = COMPUTE_DOMAINS_ADDRS[:algorithm].copy()
@@ -10,10 +10,12 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
+import numpy as np
 from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
-from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.constants import BITS_BASE, BITSET_SIZE, MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.domains import get_bitset, has_bitsets, has_value, set_bitset
 from nucs.numpy import new_triggers
 
 
@@ -29,35 +31,57 @@ def get_complexity_relation(n: int, parameters: NDArray) -> float:
 
 def get_triggers_relation(n: int, parameters: NDArray) -> NDArray:
     """
-    This propagator is triggered whenever there is a change in the domain of a variable.
+    This propagator is triggered whenever there is a change in the domain of a variable, including a removed value.
     :param n: the number of variables
     :param parameters: the parameters, unused here
     :return: an array of triggers
     """
-    return new_triggers(n, True)
+    return new_triggers(n, True, True)
 
 
 @njit(cache=True)
-def compute_domains_relation(domains: NDArray, parameters: NDArray) -> int:
+def compute_domains_relation(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
     """
     Implements a relation over n variables defined by its allowed tuples.
+    When the domains are backed by bitsets, the values without a supporting tuple are removed.
     :param domains: the domains of the variables
     :param parameters: the parameters of the propagator,
            the allowed tuples correspond to:
            (parameters_0, ..., parameters_n-1), (parameters_n, ..., parameters_2n-1), ...
+    :param workspace: a scratch buffer
     :return: the status of the propagation (consistency, inconsistency or entailement) as an int
     """
     n = len(domains)
-    tuples = parameters.copy().reshape((-1, n))
+    tuple_nb = len(parameters) // n
+    for tuple_idx in range(tuple_nb):  # the indices of the supported tuples are stored in the workspace
+        workspace[tuple_idx] = tuple_idx
     for domain_idx in range(n):
-        tuples = tuples[
-            (tuples[:, domain_idx] >= domains[domain_idx, MIN]) & (tuples[:, domain_idx] <= domains[domain_idx, MAX])
-        ]
-        if len(tuples) == 0:
+        supported_tuple_nb = 0
+        for i in range(tuple_nb):
+            value = parameters[workspace[i] * n + domain_idx]
+            if has_value(domains, domain_idx, value):
+                workspace[supported_tuple_nb] = workspace[i]
+                supported_tuple_nb += 1
+        tuple_nb = supported_tuple_nb
+        if tuple_nb == 0:
             return PROP_INCONSISTENCY
-    for domain_idx in range(n):  # no support for .min(axis=0) in Numba
-        domains[domain_idx, MIN] = tuples[:, domain_idx].min()
-        domains[domain_idx, MAX] = tuples[:, domain_idx].max()
-    if len(tuples) == 1:
+    bitsets = has_bitsets(domains)
+    for domain_idx in range(n):
+        if bitsets:
+            base = domains[domain_idx, BITS_BASE]
+            supported_bitset = 0
+            for i in range(tuple_nb):
+                bit = parameters[workspace[i] * n + domain_idx] - base
+                if bit < BITSET_SIZE:
+                    supported_bitset |= np.int64(1) << bit
+            set_bitset(domains, domain_idx, get_bitset(domains, domain_idx) & supported_bitset)
+        domains[domain_idx, MIN] = domains[domain_idx, MAX] = parameters[workspace[0] * n + domain_idx]
+        for i in range(1, tuple_nb):
+            value = parameters[workspace[i] * n + domain_idx]
+            if value < domains[domain_idx, MIN]:
+                domains[domain_idx, MIN] = value
+            elif value > domains[domain_idx, MAX]:
+                domains[domain_idx, MAX] = value
+    if tuple_nb == 1:
         return PROP_ENTAILMENT
     return PROP_CONSISTENCY
@@ -10,14 +10,68 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-from typing import Callable, Iterator, List, Optional
+import sys
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import numpy as np
+from numba import int32, njit, types, void  # type: ignore
+from numpy.typing import NDArray
 
-from nucs.constants import MIN, PROBLEM_INCONSISTENT, PROBLEM_SOLVED
-from nucs.problems.problem import Problem
-from nucs.solvers.consistency_algorithms import bound_consistency_algorithm
-from nucs.solvers.heuristics import first_not_instantiated_var_heuristic, min_value_dom_heuristic
+from nucs.constants import (
+    MAX,
+    MIN,
+    OPTIMIZATION_HYBRID,
+    OPTIMIZATION_LINEAR,
+    PROBLEM_FILTERED,
+    PROBLEM_INCONSISTENT,
+    PROBLEM_SOLVED,
+    SEARCH_COMPLETE,
+    SEARCH_IN_PROGRESS,
+    SEARCH_INTERRUPTED,
+)
+from nucs.numba import NUMBA_DISABLE_JIT, build_function_address, function_from_address, is_njit_function
+from nucs.numpy import (
+    new_cp_shr_domains,
+    new_cp_tops,
+    new_solution,
+    new_stack_not_entailed_propagators,
+    new_stack_shr_domains,
+    new_stack_states,
+)
+from nucs.problems.problem import Problem, save_states
+from nucs.problems.propagator_queue import trigger_propagators
+from nucs.problems.trail import (
+    TRAIL_DEPTH,
+    backtrack_trail,
+    ensure_choice_points_capacity,
+    ensure_state_trail_capacity,
+    ensure_trail_capacity,
+    push_trail_choice_point,
+)
+from nucs.propagators.propagators import get_compute_domains_addrs
+from nucs.solvers.consistency_algorithms import (
+    _consistency_algorithm,
+    bound_consistency_algorithm,
+    domain_consistency_algorithm,
+)
+from nucs.solvers.heuristics import (
+    DOM_HEURISTIC_ADDRS,
+    DOM_HEURISTIC_FCTS,
+    DOM_HEURISTIC_TYPE,
+    LEARNING_VAR_HEURISTIC_FCTS,
+    LEARNING_VAR_HEURISTIC_IMPACT,
+    VAR_HEURISTIC_ADDRS,
+    VAR_HEURISTIC_FCTS,
+    VAR_HEURISTIC_TYPE,
+    first_not_instantiated_var_heuristic,
+    get_log_size,
+    impact_var_heuristic,
+    learning_var_heuristic,
+    min_value_dom_heuristic,
+    update_impact,
+)
+from nucs.solvers.solution_sink import SolutionSink
 from nucs.solvers.solver import Solver
 from nucs.statistics import (
     STATS_OPTIMIZER_SOLUTION_NB,
@@ -25,8 +79,17 @@ from nucs.statistics import (
     STATS_SOLVER_CHOICE_DEPTH,
     STATS_SOLVER_CHOICE_NB,
     STATS_SOLVER_SOLUTION_NB,
+    get_deadline,
+    read_ticks,
 )
 
+NO_DEADLINE = -1  # the deadline of a search without time limit
+CLOCK_PERIOD = 64  # the number of nodes between two readings of the clock
+STACK_MIN_CAPACITY = 16  # the capacity of the stack of choice points when the first choice point is pushed
+
+SOLUTION_CALLBACK_SIGNATURE = void(int32[::1])
+SOLUTION_CALLBACK_TYPE = types.FunctionType(SOLUTION_CALLBACK_SIGNATURE)
+
 
 class BacktrackSolver(Solver):
     """
@@ -39,27 +102,84 @@ class BacktrackSolver(Solver):
         consistency_algorithm: Callable = bound_consistency_algorithm,
         var_heuristic: Callable = first_not_instantiated_var_heuristic,
         dom_heuristic: Callable = min_value_dom_heuristic,
+        trailing: bool = False,
+        profiling: bool = False,
+        propagator_profiling: bool = False,
+        probing: bool = False,
+        time_limit: Optional[float] = None,
+        choice_limit: Optional[int] = None,
+        backtrack_limit: Optional[int] = None,
+        optimization_mode: int = OPTIMIZATION_LINEAR,
+        optimization_probe_time: float = 1.0,
     ):
         """
         Inits the solver.
         :param problem: the problem
-        :param consistency_algorithm: a consistency algorithm (usually bound consistency)
+        :param consistency_algorithm: a consistency algorithm (usually bound consistency),
+        the shared domains are backed by bitsets when it is the domain consistency algorithm
         :param var_heuristic: a heuristic for selecting a variable/domain
         :param dom_heuristic: a heuristic for reducing a domain
+        :param trailing: if true, the choice points record the changes of the domains on a trail
+        instead of copying the domains
+        :param profiling: if true, the calls to the propagators are profiled per algorithm
+        :param propagator_profiling: if true, the calls to the propagators are also profiled per propagator
+        :param probing: if true, the impacts and the activities are initialized by probing at the root
+        :param time_limit: the optional duration in seconds after which the search is interrupted,
+        it starts with the first search
+        :param choice_limit: the optional number of choices after which the search is interrupted
+        :param backtrack_limit: the optional number of backtracks after which the search is interrupted
+        :param optimization_mode: OPTIMIZATION_LINEAR, OPTIMIZATION_DICHOTOMIC or OPTIMIZATION_HYBRID
+        :param optimization_probe_time: in hybrid mode, the duration in seconds of a probe
+        above which the objective is tightened linearly
         """
         super().__init__(problem)
-        self.choice_points = []  # type: ignore
+        # In copying mode, the choice points are stored in a preallocated stack indexed by depth.
+        self.stack_shr_domains = new_stack_shr_domains(0, 0, 2)
+        self.stack_not_entailed_propagators = new_stack_not_entailed_propagators(0, 0)
+        self.stack_states = new_stack_states(0, 0)
+        self.stack_depth = 0
+        # In trailing mode, the choice points are stored in two arrays indexed by depth.
+        self.cp_tops = new_cp_tops(16)
+        self.cp_shr_domains = new_cp_shr_domains(16)
         self.consistency_algorithm = consistency_algorithm
         self.var_heuristic = var_heuristic
         self.dom_heuristic = dom_heuristic
+        self.trailing = trailing
+        # When optimizing, the objective is the variable, its bound to be tightened and the value of this bound.
+        self.objective: Optional[Tuple[int, int, int]] = None
+        self.probing = probing
+        # The impact heuristic needs the last decision and the size of the search space before it.
+        self.impact_dom_idx = -1
+        self.impact_log_size = 0.0
+        # The limits are compared to the statistics and, when there is a time limit, to a deadline.
+        self.time_limit = time_limit
+        self.deadline = NO_DEADLINE
+        self.choice_limit = choice_limit if choice_limit is not None else sys.maxsize
+        self.backtrack_limit = backtrack_limit if backtrack_limit is not None else sys.maxsize
+        self.status = SEARCH_IN_PROGRESS
+        self.optimization_mode = optimization_mode
+        self.optimization_probe_time = optimization_probe_time
+        problem.trailing = trailing
+        if consistency_algorithm == domain_consistency_algorithm:
+            problem.bitsets = True
+        problem.profiling = profiling
+        problem.propagator_profiling = propagator_profiling
 
     def solve(self) -> Iterator[List[int]]:
         """
         Returns an iterator over the solutions.
         :return: an iterator
         """
-        while (solution := self.solve_one()) is not None:
-            yield solution
+        for _ in self.search():
+            yield self.get_solution()
+
+    def search(self) -> Iterator[None]:
+        """
+        Returns an iterator that stops at each solution, the solution is not built but left in the shared domains.
+        :return: an iterator
+        """
+        while self.find_solution():
+            yield
             if not self.backtrack():
                 break
 
@@ -68,64 +188,693 @@ class BacktrackSolver(Solver):
         Find at most one solution.
         :return: the solution if it exists or None
         """
-        if not self.problem.ready:
-            self.problem.init_problem(self.statistics)
-            self.problem.ready = True
+        return self.get_solution() if self.find_solution() else None
+
+    def get_values(self) -> NDArray:
+        """
+        Returns the values of the variables when the problem is solved.
+        :return: a Numpy array
+        """
+        return self.problem.shr_domains_arr[self.problem.dom_indices_arr, MIN] + self.problem.dom_offsets_arr
+
+    def get_solution(self) -> List[int]:
+        """
+        Returns the solution when the problem is solved.
+        :return: the solution
+        """
+        return self.get_values().tolist()
+
+    def find_solution(self) -> bool:
+        """
+        Searches for the next solution.
+        :return: true iff a solution has been found
+        """
+        self.init_problem()
         while True:
-            while (status := self.consistency_algorithm(self.statistics, self.problem)) == PROBLEM_INCONSISTENT:
+            while (status := self.filter()) == PROBLEM_INCONSISTENT:
                 if not self.backtrack():
-                    return None
+                    return False
             if status == PROBLEM_SOLVED:
                 self.statistics[STATS_SOLVER_SOLUTION_NB] += 1
-                values = self.problem.shr_domains_arr[self.problem.dom_indices_arr, MIN] + self.problem.dom_offsets_arr
-                return values.tolist()
-            dom_idx = self.var_heuristic(self.problem.shr_domains_arr)
-            shr_domains_copy = self.problem.shr_domains_arr.copy(order="F")
-            not_entailed_propagators_copy = self.problem.not_entailed_propagators.copy()
-            self.choice_points.append((shr_domains_copy, not_entailed_propagators_copy))
-            event = self.dom_heuristic(self.problem.shr_domains_arr[dom_idx], shr_domains_copy[dom_idx])
-            np.logical_or(
-                self.problem.triggered_propagators,
-                self.problem.shr_domains_propagators[dom_idx, event],
+                return True
+            if self.check_limits():
+                return False
+            dom_idx = choose_shr_domain(self.var_heuristic, self.problem)
+            if self.var_heuristic == impact_var_heuristic:
+                self.impact_dom_idx = dom_idx
+                self.impact_log_size = get_log_size(self.problem.shr_domains_arr)
+            event = self.push_trail_choice_point(dom_idx) if self.trailing else self.push_choice_point(dom_idx)
+            trigger_propagators(
                 self.problem.triggered_propagators,
+                self.problem.shr_domains_propagators,
+                self.problem.shr_domains_propagators_bounds,
+                dom_idx,
+                event,
             )
             self.statistics[STATS_SOLVER_CHOICE_NB] += 1
-            cp_max_depth = len(self.choice_points)
+            cp_max_depth = self.problem.trail_tops[TRAIL_DEPTH] if self.trailing else self.stack_depth
             if cp_max_depth > self.statistics[STATS_SOLVER_CHOICE_DEPTH]:
                 self.statistics[STATS_SOLVER_CHOICE_DEPTH] = cp_max_depth
 
+    def check_limits(self) -> bool:
+        """
+        Returns true iff a limit has been reached, the status of the search is then updated.
+        :return: a boolean
+        """
+        if is_limit_reached(self.statistics, self.choice_limit, self.backtrack_limit, self.deadline):
+            self.status = SEARCH_INTERRUPTED
+            return True
+        return False
+
+    def filter(self) -> int:
+        """
+        Applies the consistency algorithm, then updates the impact of the last decision if needed.
+        :return: the status as an integer
+        """
+        status = self.consistency_algorithm(self.statistics, self.problem)
+        if self.impact_dom_idx >= 0:
+            update_impact(
+                self.problem.shr_domains_arr,
+                self.problem.shr_domains_impacts,
+                self.impact_dom_idx,
+                self.impact_log_size,
+                status == PROBLEM_INCONSISTENT,
+            )
+            self.impact_dom_idx = -1
+        return status
+
+    def solve_all(self, func: Optional[Callable] = None) -> None:
+        """
+        Finds all solutions without building them unless a function has to be applied to them.
+        With no function or a njit function, the search is entirely JIT compiled if possible.
+        A njit function is called with the values of the variables as an int32 array that is reused between calls,
+        it must not return anything.
+        A solution sink is also called with the values of the variables as an int32 array.
+        :param func: a function to apply to each solution
+        """
+        if self.is_jit_search_possible() and (func is None or is_njit_function(func)):
+            self.jit_solve_all(func)
+        elif func is None:
+            for _ in self.search():
+                pass
+        elif is_njit_function(func) or isinstance(func, SolutionSink):
+            for _ in self.search():
+                func(self.get_values())
+        else:
+            super().solve_all(func)
+
+    def is_jit_search_possible(self) -> bool:
+        """
+        Returns true iff the search can be JIT compiled:
+        the bound or domain consistency algorithm and some predefined heuristics must be used,
+        there must be no pending choice points unless they are trail choice points.
+        :return: a boolean
+        """
+        return (
+            self.consistency_algorithm in (bound_consistency_algorithm, domain_consistency_algorithm)
+            and (self.var_heuristic in VAR_HEURISTIC_FCTS or self.var_heuristic in LEARNING_VAR_HEURISTIC_FCTS)
+            and self.dom_heuristic in DOM_HEURISTIC_FCTS
+            and (self.trailing or self.stack_depth == 0)
+        )
+
+    def jit_solve_all(self, func: Optional[Callable] = None) -> None:
+        """
+        Finds all solutions with a JIT compiled search relying on the trail.
+        :param func: an optional njit function to apply to the values of the variables of each solution
+        """
+        self.init_problem()
+        problem = self.problem
+        solution = new_solution(len(problem.dom_indices_arr))
+        problem.trail, problem.state_trail, self.cp_tops, self.cp_shr_domains, self.status = _solve_all(
+            self.statistics,
+            problem.algorithms,
+            problem.var_bounds,
+            problem.param_bounds,
+            problem.props_dom_indices,
+            problem.props_dom_offsets,
+            problem.props_parameters,
+            problem.shr_domains_arr,
+            problem.shr_domains_bases if self.consistency_algorithm == domain_consistency_algorithm else None,
+            problem.shr_domains_propagators,
+            problem.shr_domains_propagators_bounds,
+            problem.triggered_propagators,
+            problem.not_entailed_propagators,
+            problem.propagators_weights,
+            problem.shr_domains_adjacent_propagators,
+            problem.shr_domains_adjacent_propagators_bounds,
+            problem.shr_domains_activities,
+            problem.shr_domains_impacts,
+            problem.props_buckets,
+            problem.queue,
+            problem.queue_bounds,
+            problem.queue_tops,
+            problem.prop_domains,
+            problem.workspace,
+            problem.algorithms_profile,
+            problem.propagators_profile,
+            problem.shr_domains_stamps,
+            problem.trail,
+            problem.entailment_trail,
+            problem.state_bounds,
+            problem.props_states_stamps,
+            problem.state_trail,
+            problem.state_trail_width,
+            problem.trail_tops,
+            self.cp_tops,
+            self.cp_shr_domains,
+            *self.get_heuristic_indices(),
+            self.choice_limit,
+            self.backtrack_limit,
+            self.deadline,
+            get_compute_domains_addrs(),
+            VAR_HEURISTIC_ADDRS,
+            DOM_HEURISTIC_ADDRS,
+            problem.dom_indices_arr,
+            problem.dom_offsets_arr,
+            solution,
+            build_function_address(func, SOLUTION_CALLBACK_SIGNATURE) if func is not None else 0,
+            sys.maxsize,
+        )
+
+    def get_heuristic_indices(self) -> Tuple[int, int, int]:
+        """
+        Returns the indices of the heuristics used by the JIT compiled search.
+        :return: the indices of the var heuristic, of the learning var heuristic (or -1) and of the dom heuristic
+        """
+        return (
+            VAR_HEURISTIC_FCTS.index(self.var_heuristic) if self.var_heuristic in VAR_HEURISTIC_FCTS else 0,
+            (
+                LEARNING_VAR_HEURISTIC_FCTS.index(self.var_heuristic)
+                if self.var_heuristic in LEARNING_VAR_HEURISTIC_FCTS
+                else -1
+            ),
+            DOM_HEURISTIC_FCTS.index(self.dom_heuristic),
+        )
+
+    def init_problem(self) -> None:
+        """
+        Inits the problem if needed, the time limit starts with the first search.
+        """
+        if self.time_limit is not None and self.deadline == NO_DEADLINE:
+            self.deadline = get_deadline(self.time_limit)
+        if not self.problem.ready:
+            self.problem.init_problem(self.statistics)
+            self.problem.ready = True
+            if self.probing:
+                self.probe()
+
+    def probe(self) -> None:
+        """
+        Initializes the impacts and the activities by propagating, at the root,
+        the choice of the first and of the last value of each non-instantiated shared domain.
+        """
+        problem = self.problem
+        if self.consistency_algorithm(self.statistics, problem) == PROBLEM_INCONSISTENT:
+            problem.reset()
+            return
+        root = (problem.shr_domains_arr.copy(), problem.not_entailed_propagators.copy())
+        log_size = get_log_size(root[0])
+        for dom_idx, shr_domain in enumerate(root[0]):
+            if shr_domain[MIN] < shr_domain[MAX]:
+                for bound in range(2):
+                    problem.reset(root)
+                    problem.shr_domains_arr[dom_idx, 1 - bound] = shr_domain[bound]
+                    status = self.consistency_algorithm(self.statistics, problem)
+                    update_impact(
+                        problem.shr_domains_arr,
+                        problem.shr_domains_impacts,
+                        dom_idx,
+                        log_size,
+                        status == PROBLEM_INCONSISTENT,
+                    )
+        problem.reset(root)
+
+    def push_choice_point(self, dom_idx: int) -> int:
+        """
+        Copies the domains, the entailed propagators and the states of the propagators to a new choice point
+        and reduces the chosen domain.
+        The choice point reuses a slot of the stack, the stack grows geometrically.
+        :param dom_idx: the index of the chosen shared domain
+        :return: the event corresponding to the reduction of the domain
+        """
+        if self.stack_depth == len(self.stack_shr_domains):
+            self.grow_stack()
+        shr_domains_copy = self.stack_shr_domains[self.stack_depth]
+        np.copyto(shr_domains_copy, self.problem.shr_domains_arr)
+        np.copyto(self.stack_not_entailed_propagators[self.stack_depth], self.problem.not_entailed_propagators)
+        save_states(
+            self.problem.props_parameters,
+            self.problem.state_bounds,
+            self.problem.stateful_propagators,
+            self.stack_states[self.stack_depth],
+        )
+        self.stack_depth += 1
+        return self.dom_heuristic(self.problem.shr_domains_arr[dom_idx], shr_domains_copy[dom_idx])
+
+    def grow_stack(self) -> None:
+        """
+        Doubles the capacity of the stack of choice points, the stack is allocated by the first choice point.
+        """
+        capacity = max(STACK_MIN_CAPACITY, 2 * len(self.stack_shr_domains))
+        stack_shr_domains = new_stack_shr_domains(
+            capacity, len(self.problem.shr_domains_lst), self.problem.shr_domains_arr.shape[1]
+        )
+        stack_not_entailed_propagators = new_stack_not_entailed_propagators(capacity, self.problem.propagator_nb)
+        stack_states = new_stack_states(capacity, len(self.problem.initial_states))
+        if self.stack_depth > 0:
+            stack_shr_domains[: self.stack_depth] = self.stack_shr_domains[: self.stack_depth]
+            stack_not_entailed_propagators[: self.stack_depth] = self.stack_not_entailed_propagators[: self.stack_depth]
+            stack_states[: self.stack_depth] = self.stack_states[: self.stack_depth]
+        self.stack_shr_domains = stack_shr_domains
+        self.stack_not_entailed_propagators = stack_not_entailed_propagators
+        self.stack_states = stack_states
+
+    def push_trail_choice_point(self, dom_idx: int) -> int:
+        """
+        Pushes a new trail choice point and reduces the chosen domain.
+        :param dom_idx: the index of the chosen shared domain
+        :return: the event corresponding to the reduction of the domain
+        """
+        problem = self.problem
+        problem.trail = ensure_trail_capacity(problem.trail, problem.trail_tops, problem.shr_domains_arr.size)
+        problem.state_trail = ensure_state_trail_capacity(
+            problem.state_trail, problem.trail_tops, problem.state_trail_width
+        )
+        self.cp_tops, self.cp_shr_domains = ensure_choice_points_capacity(
+            self.cp_tops, self.cp_shr_domains, problem.trail_tops[TRAIL_DEPTH]
+        )
+        cp_idx = push_trail_choice_point(
+            problem.shr_domains_arr,
+            problem.shr_domains_stamps,
+            problem.trail,
+            problem.trail_tops,
+            self.cp_tops,
+            self.cp_shr_domains,
+            dom_idx,
+        )
+        return self.dom_heuristic(problem.shr_domains_arr[dom_idx], self.cp_shr_domains[cp_idx])
+
     def minimize(self, variable_idx: int) -> Optional[List[int]]:
-        solution = None
-        while (new_solution := self.solve_one()) is not None:
-            solution = new_solution
-            self.statistics[STATS_OPTIMIZER_SOLUTION_NB] += 1
-            self.reset()
-            self.problem.set_max_value(variable_idx, solution[variable_idx] - 1)
-        return solution
+        return self.optimize(variable_idx, MAX, -1)
 
     def maximize(self, variable_idx: int) -> Optional[List[int]]:
+        return self.optimize(variable_idx, MIN, 1)
+
+    def optimize(self, variable_idx: int, bound: int, delta: int) -> Optional[List[int]]:
+        """
+        Finds, if it exists, an optimal solution by branch and bound.
+        In linear mode, the search is not restarted when a solution is found,
+        the objective bound is applied on backtrack instead.
+        In dichotomic and hybrid modes, the objective range is first bisected.
+        When a limit is reached, the best solution found so far is returned and the status of the search
+        tells that its optimality has not been proved.
+        :param variable_idx: the index of the variable
+        :param bound: the bound of the variable to be tightened (MAX when minimizing, MIN when maximizing)
+        :param delta: the difference between the new bound and the value of the last solution
+        :return: the solution if it exists or None
+        """
         solution = None
-        while (new_solution := self.solve_one()) is not None:
-            solution = new_solution
-            self.statistics[STATS_OPTIMIZER_SOLUTION_NB] += 1
-            self.reset()
-            self.problem.set_min_value(variable_idx, solution[variable_idx] + 1)
-        return solution
+        try:
+            if self.optimization_mode != OPTIMIZATION_LINEAR:
+                solution, min_value, max_value = self.bisect(variable_idx, bound)
+                if self.status != SEARCH_IN_PROGRESS:
+                    return solution
+                # The probes are too slow, the remaining range is searched linearly.
+                self.restrict_objective(variable_idx, bound, min_value, max_value)
+            while (new_solution := self.solve_one()) is not None:
+                solution = new_solution
+                self.statistics[STATS_OPTIMIZER_SOLUTION_NB] += 1
+                self.objective = (variable_idx, bound, solution[variable_idx] + delta)
+                if not self.backtrack():
+                    break
+            return solution
+        finally:
+            # The objective must not be applied by a later search.
+            self.objective = None
+
+    def bisect(self, variable_idx: int, bound: int) -> Tuple[Optional[List[int]], int, int]:
+        """
+        Bisects the range of the values of the objective variable that would improve the best solution.
+        Each probe restarts the search from the root with the variable restricted to half of this range,
+        what has been learned by the heuristics is kept from one probe to the other.
+        In hybrid mode, the bisection stops when a probe is too slow.
+        :param variable_idx: the index of the variable
+        :param bound: the bound of the variable to be tightened (MAX when minimizing, MIN when maximizing)
+        :return: the best solution if any, and the range of the values that remains to be searched
+        """
+        solution = self.solve_one()
+        self.reset()
+        min_value = self.problem.get_min_value(variable_idx)
+        max_value = self.problem.get_max_value(variable_idx)
+        if solution is None:
+            return None, min_value, max_value
+        self.statistics[STATS_OPTIMIZER_SOLUTION_NB] += 1
+        if bound == MAX:
+            max_value = solution[variable_idx] - 1
+        else:
+            min_value = solution[variable_idx] + 1
+        while min_value <= max_value:
+            # When minimizing, the lower half of the range is probed, when maximizing, the upper half is probed.
+            if bound == MAX:
+                probe_min_value, probe_max_value = min_value, (min_value + max_value) // 2
+            else:
+                probe_min_value, probe_max_value = (min_value + max_value + 1) // 2, max_value
+            start_time = time.perf_counter()
+            self.restrict_objective(variable_idx, bound, probe_min_value, probe_max_value)
+            if (new_solution := self.solve_one()) is not None:
+                solution = new_solution
+                self.statistics[STATS_OPTIMIZER_SOLUTION_NB] += 1
+                if bound == MAX:
+                    max_value = solution[variable_idx] - 1
+                else:
+                    min_value = solution[variable_idx] + 1
+            elif self.status == SEARCH_COMPLETE:
+                if bound == MAX:
+                    min_value = probe_max_value + 1
+                else:
+                    max_value = probe_min_value - 1
+            else:
+                return solution, min_value, max_value
+            if min_value > max_value:
+                break
+            if (
+                self.optimization_mode == OPTIMIZATION_HYBRID
+                and time.perf_counter() - start_time > self.optimization_probe_time
+            ):
+                self.status = SEARCH_IN_PROGRESS
+                return solution, min_value, max_value
+        self.status = SEARCH_COMPLETE
+        return solution, min_value, max_value
+
+    def restrict_objective(self, variable_idx: int, bound: int, min_value: int, max_value: int) -> None:
+        """
+        Resets the search and restricts the objective variable to a range,
+        the bound to be tightened is also kept as the objective so that it is applied after a restart.
+        :param variable_idx: the index of the variable
+        :param bound: the bound of the variable to be tightened (MAX when minimizing, MIN when maximizing)
+        :param min_value: the minimal value
+        :param max_value: the maximal value
+        """
+        self.reset()
+        self.objective = (variable_idx, bound, max_value if bound == MAX else min_value)
+        self.problem.set_min_value(variable_idx, min_value)
+        self.problem.set_max_value(variable_idx, max_value)
 
     def backtrack(self) -> bool:
         """
-        Backtracks and updates the problem's domains
+        Backtracks and updates the problem's domains.
+        When optimizing, the objective bound is applied to the restored domains
+        and the choice points for which it is violated are skipped.
         :return: true iff it is possible to backtrack
         """
-        if len(self.choice_points) == 0:
-            return False
+        while not self.check_limits():
+            if not self.backtrack_choice_point():
+                self.status = SEARCH_COMPLETE
+                return False
+            if self.objective is None or self.apply_objective():
+                return True
+        return False
+
+    def apply_objective(self) -> bool:
+        """
+        Tightens the domain of the objective variable with the objective bound.
+        :return: false iff the domain becomes empty
+        """
+        variable_idx, bound, value = self.objective  # type: ignore
+        problem = self.problem
+        if bound == MAX:
+            if problem.get_min_value(variable_idx) > value:
+                return False
+            if problem.get_max_value(variable_idx) > value:
+                problem.set_max_value(variable_idx, value)
+        else:
+            if problem.get_max_value(variable_idx) < value:
+                return False
+            if problem.get_min_value(variable_idx) < value:
+                problem.set_min_value(variable_idx, value)
+        return True
+
+    def backtrack_choice_point(self) -> bool:
+        """
+        Pops the last choice point and updates the problem's domains.
+        :return: true iff it is possible to backtrack
+        """
+        if self.trailing:
+            problem = self.problem
+            if not backtrack_trail(
+                problem.shr_domains_arr,
+                problem.shr_domains_stamps,
+                problem.trail,
+                problem.not_entailed_propagators,
+                problem.entailment_trail,
+                problem.props_parameters,
+                problem.state_bounds,
+                problem.props_states_stamps,
+                problem.state_trail,
+                problem.trail_tops,
+                problem.triggered_propagators,
+                problem.shr_domains_propagators,
+                problem.shr_domains_propagators_bounds,
+                self.cp_tops,
+                self.cp_shr_domains,
+            ):
+                return False
+        else:
+            if self.stack_depth == 0:
+                return False
+            self.stack_depth -= 1
+            self.problem.reset(
+                (self.stack_shr_domains[self.stack_depth], self.stack_not_entailed_propagators[self.stack_depth]),
+                self.stack_states[self.stack_depth],
+            )
         self.statistics[STATS_SOLVER_BACKTRACK_NB] += 1
-        self.problem.reset(self.choice_points.pop())  # TODO: optimize by reusing
         return True
 
     def reset(self) -> None:
         """
-        Resets the solver by resetting the problem and the choice points.
+        Resets the solver by resetting the problem and the choice points, the limits are not reset.
         """
-        self.choice_points.clear()
+        self.status = SEARCH_IN_PROGRESS
+        self.stack_depth = 0
         self.problem.reset()
+
+
+def choose_shr_domain(var_heuristic: Callable, problem: Problem) -> int:
+    """
+    Chooses a shared domain with a var heuristic.
+    The learning var heuristics also need the arrays where the problem records what has been learned.
+    :param var_heuristic: the var heuristic
+    :param problem: the problem
+    :return: the index of the shared domain
+    """
+    if var_heuristic in LEARNING_VAR_HEURISTIC_FCTS:
+        return learning_var_heuristic(
+            LEARNING_VAR_HEURISTIC_FCTS.index(var_heuristic),
+            problem.shr_domains_arr,
+            problem.not_entailed_propagators,
+            problem.propagators_weights,
+            problem.shr_domains_adjacent_propagators,
+            problem.shr_domains_adjacent_propagators_bounds,
+            problem.shr_domains_activities,
+            problem.shr_domains_impacts,
+        )
+    return var_heuristic(problem.shr_domains_arr)
+
+
+@njit(cache=True)
+def is_limit_reached(statistics: NDArray, choice_limit: int, backtrack_limit: int, deadline: int) -> bool:
+    """
+    Returns true iff a limit of the search has been reached.
+    Since reading the clock is much more expensive than comparing counters,
+    the deadline is only checked every CLOCK_PERIOD nodes.
+    :param statistics: the statistics
+    :param choice_limit: the maximal number of choices
+    :param backtrack_limit: the maximal number of backtracks
+    :param deadline: the value of the clock at which the search is interrupted or NO_DEADLINE
+    :return: a boolean
+    """
+    choice_nb = statistics[STATS_SOLVER_CHOICE_NB]
+    backtrack_nb = statistics[STATS_SOLVER_BACKTRACK_NB]
+    if choice_nb >= choice_limit or backtrack_nb >= backtrack_limit:
+        return True
+    return deadline != NO_DEADLINE and (choice_nb + backtrack_nb) % CLOCK_PERIOD == 0 and read_ticks() >= deadline
+
+
+@njit(cache=True)
+def _solve_all(
+    statistics: NDArray,
+    algorithms: NDArray,
+    var_bounds: NDArray,
+    param_bounds: NDArray,
+    props_dom_indices: NDArray,
+    props_dom_offsets: NDArray,
+    props_parameters: NDArray,
+    shr_domains: NDArray,
+    shr_domains_bases: Optional[NDArray],
+    shr_domains_propagators: NDArray,
+    shr_domains_propagators_bounds: NDArray,
+    triggered_propagators: NDArray,
+    not_entailed_propagators: NDArray,
+    propagators_weights: NDArray,
+    shr_domains_adjacent_propagators: NDArray,
+    shr_domains_adjacent_propagators_bounds: NDArray,
+    shr_domains_activities: NDArray,
+    shr_domains_impacts: NDArray,
+    props_buckets: NDArray,
+    queue: NDArray,
+    queue_bounds: NDArray,
+    queue_tops: NDArray,
+    prop_domains: NDArray,
+    workspace: NDArray,
+    algorithms_profile: Optional[NDArray],
+    propagators_profile: Optional[NDArray],
+    shr_domains_stamps: NDArray,
+    trail: NDArray,
+    entailment_trail: NDArray,
+    state_bounds: NDArray,
+    props_states_stamps: NDArray,
+    state_trail: NDArray,
+    state_trail_width: int,
+    trail_tops: NDArray,
+    cp_tops: NDArray,
+    cp_shr_domains: NDArray,
+    var_heuristic_idx: int,
+    learning_var_heuristic_idx: int,
+    dom_heuristic_idx: int,
+    choice_limit: int,
+    backtrack_limit: int,
+    deadline: int,
+    compute_domains_addrs: NDArray,
+    var_heuristic_addrs: NDArray,
+    dom_heuristic_addrs: NDArray,
+    dom_indices: NDArray,
+    dom_offsets: NDArray,
+    solution: NDArray,
+    solution_callback_addr: int,
+    solution_limit: int,
+) -> Tuple[NDArray, NDArray, NDArray, NDArray, int]:
+    """
+    A depth-first search that finds all solutions, it propagates, chooses, branches and backtracks in compiled code.
+    The choice points rely on the trail.
+    The bases of the bitsets of the shared domains are None unless the domain consistency algorithm is applied.
+    The solutions are not built unless a solution callback is given, the values are then written in a reused array.
+    When the number of solutions reaches the solution limit, the search stops on the last solution.
+    This method only uses Numpy arrays as parameters, this permits JIT compilation.
+    :return: the trails and the choice points since they may have been reallocated, and the status of the search
+    """
+    # When a learning var heuristic is used, this function is not called.
+    var_heuristic = (
+        VAR_HEURISTIC_FCTS[var_heuristic_idx]
+        if NUMBA_DISABLE_JIT
+        else function_from_address(VAR_HEURISTIC_TYPE, var_heuristic_addrs[var_heuristic_idx])
+    )
+    dom_heuristic = (
+        DOM_HEURISTIC_FCTS[dom_heuristic_idx]
+        if NUMBA_DISABLE_JIT
+        else function_from_address(DOM_HEURISTIC_TYPE, dom_heuristic_addrs[dom_heuristic_idx])
+    )
+    impact_dom_idx = -1
+    impact_log_size = 0.0
+    while True:
+        status = _consistency_algorithm(
+            statistics,
+            algorithms,
+            var_bounds,
+            param_bounds,
+            props_dom_indices,
+            props_dom_offsets,
+            props_parameters,
+            shr_domains,
+            shr_domains_bases,
+            shr_domains_propagators,
+            shr_domains_propagators_bounds,
+            triggered_propagators,
+            not_entailed_propagators,
+            propagators_weights,
+            shr_domains_activities,
+            props_buckets,
+            queue,
+            queue_bounds,
+            queue_tops,
+            prop_domains,
+            workspace,
+            algorithms_profile,
+            propagators_profile,
+            True,
+            shr_domains_stamps,
+            trail,
+            entailment_trail,
+            state_bounds,
+            props_states_stamps,
+            state_trail,
+            trail_tops,
+            compute_domains_addrs,
+        )
+        if impact_dom_idx >= 0:
+            update_impact(
+                shr_domains, shr_domains_impacts, impact_dom_idx, impact_log_size, status == PROBLEM_INCONSISTENT
+            )
+            impact_dom_idx = -1
+        if status != PROBLEM_FILTERED:
+            if status == PROBLEM_SOLVED:
+                statistics[STATS_SOLVER_SOLUTION_NB] += 1
+                if solution_callback_addr != 0:
+                    for var_idx in range(len(solution)):
+                        solution[var_idx] = shr_domains[dom_indices[var_idx], MIN] + dom_offsets[var_idx]
+                    function_from_address(SOLUTION_CALLBACK_TYPE, solution_callback_addr)(solution)
+                if statistics[STATS_SOLVER_SOLUTION_NB] >= solution_limit:
+                    return trail, state_trail, cp_tops, cp_shr_domains, SEARCH_INTERRUPTED
+            if is_limit_reached(statistics, choice_limit, backtrack_limit, deadline):
+                return trail, state_trail, cp_tops, cp_shr_domains, SEARCH_INTERRUPTED
+            if not backtrack_trail(
+                shr_domains,
+                shr_domains_stamps,
+                trail,
+                not_entailed_propagators,
+                entailment_trail,
+                props_parameters,
+                state_bounds,
+                props_states_stamps,
+                state_trail,
+                trail_tops,
+                triggered_propagators,
+                shr_domains_propagators,
+                shr_domains_propagators_bounds,
+                cp_tops,
+                cp_shr_domains,
+            ):
+                return trail, state_trail, cp_tops, cp_shr_domains, SEARCH_COMPLETE
+            statistics[STATS_SOLVER_BACKTRACK_NB] += 1
+            continue
+        if is_limit_reached(statistics, choice_limit, backtrack_limit, deadline):
+            return trail, state_trail, cp_tops, cp_shr_domains, SEARCH_INTERRUPTED
+        dom_idx = (
+            var_heuristic(shr_domains)
+            if learning_var_heuristic_idx < 0
+            else learning_var_heuristic(
+                learning_var_heuristic_idx,
+                shr_domains,
+                not_entailed_propagators,
+                propagators_weights,
+                shr_domains_adjacent_propagators,
+                shr_domains_adjacent_propagators_bounds,
+                shr_domains_activities,
+                shr_domains_impacts,
+            )
+        )
+        if learning_var_heuristic_idx == LEARNING_VAR_HEURISTIC_IMPACT:
+            impact_dom_idx = dom_idx
+            impact_log_size = get_log_size(shr_domains)
+        trail = ensure_trail_capacity(trail, trail_tops, shr_domains.size)
+        state_trail = ensure_state_trail_capacity(state_trail, trail_tops, state_trail_width)
+        cp_tops, cp_shr_domains = ensure_choice_points_capacity(cp_tops, cp_shr_domains, trail_tops[TRAIL_DEPTH])
+        cp_idx = push_trail_choice_point(
+            shr_domains, shr_domains_stamps, trail, trail_tops, cp_tops, cp_shr_domains, dom_idx
+        )
+        event = dom_heuristic(shr_domains[dom_idx], cp_shr_domains[cp_idx])
+        trigger_propagators(
+            triggered_propagators, shr_domains_propagators, shr_domains_propagators_bounds, dom_idx, event
+        )
+        statistics[STATS_SOLVER_CHOICE_NB] += 1
+        if trail_tops[TRAIL_DEPTH] > statistics[STATS_SOLVER_CHOICE_DEPTH]:
+            statistics[STATS_SOLVER_CHOICE_DEPTH] = trail_tops[TRAIL_DEPTH]
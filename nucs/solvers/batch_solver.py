@@ -0,0 +1,325 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import multiprocessing
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+from numba import njit  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import MIN, SEARCH_COMPLETE, SEARCH_INTERRUPTED
+from nucs.numpy import new_solution
+from nucs.problems.problem import Problem, restore_states
+from nucs.propagators.propagators import get_compute_domains_addrs
+from nucs.solvers.backtrack_solver import BacktrackSolver, _solve_all
+from nucs.solvers.heuristics import (
+    DOM_HEURISTIC_ADDRS,
+    DOM_HEURISTIC_FCTS,
+    LEARNING_VAR_HEURISTIC_FCTS,
+    VAR_HEURISTIC_ADDRS,
+    VAR_HEURISTIC_FCTS,
+    first_not_instantiated_var_heuristic,
+    min_value_dom_heuristic,
+)
+from nucs.statistics import STATS_SOLVER_SOLUTION_NB, merge_statistics
+
+
+class BatchSolver(BacktrackSolver):
+    """
+    A solver for many instances of a problem that only differ by the initial values of their shared domains,
+    eg sudokus with different givens.
+    The problem is initialized once, then the instances are solved one after the other in a single JIT compiled loop,
+    the instances can also be split between several processes.
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        var_heuristic: Callable = first_not_instantiated_var_heuristic,
+        dom_heuristic: Callable = min_value_dom_heuristic,
+        processes: int = 1,
+        time_limit: Optional[float] = None,
+        choice_limit: Optional[int] = None,
+        backtrack_limit: Optional[int] = None,
+    ):
+        """
+        Inits the solver.
+        :param problem: the problem, its shared domains are replaced by the ones of each instance
+        :param var_heuristic: a heuristic for selecting a variable/domain, it must be supported by the JIT search
+        :param dom_heuristic: a heuristic for reducing a domain, it must be supported by the JIT search
+        :param processes: the number of processes between which the instances are split
+        :param time_limit: the optional duration in seconds after which the search of all instances is interrupted
+        :param choice_limit: the optional number of choices after which the search of all instances is interrupted
+        :param backtrack_limit: the optional number of backtracks after which the search of all instances is interrupted
+        """
+        super().__init__(
+            problem,
+            var_heuristic=var_heuristic,
+            dom_heuristic=dom_heuristic,
+            trailing=True,
+            time_limit=time_limit,
+            choice_limit=choice_limit,
+            backtrack_limit=backtrack_limit,
+        )
+        self.processes = processes
+
+    def solve_batch(self, instances: NDArray) -> Tuple[NDArray, NDArray]:
+        """
+        Finds at most one solution per instance.
+        :param instances: the initial shared domains of the instances, an array of shape (instance_nb, shr_domain_nb, 2)
+        :return: the solutions, an array of shape (instance_nb, variable_nb),
+        and an array of booleans indicating which instances have been solved
+        """
+        if not self.is_jit_search_possible():
+            raise ValueError("the heuristics of a batch solver must be supported by the JIT search")
+        if len(instances.shape) != 3 or instances.shape[1:] != (len(self.problem.shr_domains_lst), 2):
+            raise ValueError(
+                f"the instances must be an array of shape (instance_nb, {len(self.problem.shr_domains_lst)}, 2)"
+            )
+        if self.processes > 1:
+            return self.solve_shards(instances)
+        self.init_problem()
+        problem = self.problem
+        solutions = np.zeros((len(instances), problem.variable_nb), dtype=np.int32)
+        solved = np.zeros(len(instances), dtype=np.bool_)
+        problem.trail, problem.state_trail, self.cp_tops, self.cp_shr_domains, self.status = _solve_batch(
+            instances.astype(np.int32, copy=False),
+            solutions,
+            solved,
+            self.statistics,
+            problem.algorithms,
+            problem.var_bounds,
+            problem.param_bounds,
+            problem.props_dom_indices,
+            problem.props_dom_offsets,
+            problem.props_parameters,
+            problem.shr_domains_arr,
+            problem.shr_domains_propagators,
+            problem.shr_domains_propagators_bounds,
+            problem.triggered_propagators,
+            problem.not_entailed_propagators,
+            problem.propagators_weights,
+            problem.shr_domains_adjacent_propagators,
+            problem.shr_domains_adjacent_propagators_bounds,
+            problem.shr_domains_activities,
+            problem.shr_domains_impacts,
+            problem.props_buckets,
+            problem.queue,
+            problem.queue_bounds,
+            problem.queue_tops,
+            problem.prop_domains,
+            problem.workspace,
+            problem.algorithms_profile,
+            problem.propagators_profile,
+            problem.shr_domains_stamps,
+            problem.trail,
+            problem.entailment_trail,
+            problem.state_bounds,
+            problem.stateful_propagators,
+            problem.initial_states,
+            problem.props_states_stamps,
+            problem.state_trail,
+            problem.state_trail_width,
+            problem.trail_tops,
+            self.cp_tops,
+            self.cp_shr_domains,
+            *self.get_heuristic_indices(),
+            self.choice_limit,
+            self.backtrack_limit,
+            self.deadline,
+            get_compute_domains_addrs(),
+            VAR_HEURISTIC_ADDRS,
+            DOM_HEURISTIC_ADDRS,
+            problem.dom_indices_arr,
+            problem.dom_offsets_arr,
+            new_solution(problem.variable_nb),
+        )
+        return solutions, solved
+
+    def solve_shards(self, instances: NDArray) -> Tuple[NDArray, NDArray]:
+        """
+        Splits the instances into shards that are solved by a pool of processes, the statistics are merged.
+        :param instances: the initial shared domains of the instances
+        :return: the solutions and the array of booleans indicating which instances have been solved
+        """
+        # The heuristics are sent by index since the unpickled njit functions would be different objects.
+        solver_args = (
+            (VAR_HEURISTIC_FCTS + LEARNING_VAR_HEURISTIC_FCTS).index(self.var_heuristic),
+            DOM_HEURISTIC_FCTS.index(self.dom_heuristic),
+            self.time_limit,
+            self.choice_limit,
+            self.backtrack_limit,
+        )
+        shards = np.array_split(instances, self.processes)
+        with multiprocessing.Pool(self.processes) as pool:
+            results = pool.map(solve_shard, [(self.problem, solver_args, shard) for shard in shards])
+        self.status = SEARCH_COMPLETE
+        for _, _, statistics, status in results:
+            merge_statistics(self.statistics, statistics)
+            if status == SEARCH_INTERRUPTED:
+                self.status = SEARCH_INTERRUPTED
+        return np.concatenate([result[0] for result in results]), np.concatenate([result[1] for result in results])
+
+
+def solve_shard(
+    args: Tuple[Problem, Tuple[int, int, Optional[float], int, int], NDArray]
+) -> Tuple[NDArray, NDArray, NDArray, int]:
+    """
+    Solves a shard of instances in a worker process.
+    :param args: the problem, the arguments of the solver and the instances of the shard
+    :return: the solutions, the array of booleans indicating which instances have been solved,
+    the statistics and the status
+    """
+    problem, (var_heuristic_idx, dom_heuristic_idx, time_limit, choice_limit, backtrack_limit), instances = args
+    solver = BatchSolver(
+        problem,
+        (VAR_HEURISTIC_FCTS + LEARNING_VAR_HEURISTIC_FCTS)[var_heuristic_idx],
+        DOM_HEURISTIC_FCTS[dom_heuristic_idx],
+        1,
+        time_limit,
+        choice_limit,
+        backtrack_limit,
+    )
+    solutions, solved = solver.solve_batch(instances)
+    return solutions, solved, solver.statistics, solver.status
+
+
+@njit(cache=True)
+def _solve_batch(
+    instances: NDArray,
+    solutions: NDArray,
+    solved: NDArray,
+    statistics: NDArray,
+    algorithms: NDArray,
+    var_bounds: NDArray,
+    param_bounds: NDArray,
+    props_dom_indices: NDArray,
+    props_dom_offsets: NDArray,
+    props_parameters: NDArray,
+    shr_domains: NDArray,
+    shr_domains_propagators: NDArray,
+    shr_domains_propagators_bounds: NDArray,
+    triggered_propagators: NDArray,
+    not_entailed_propagators: NDArray,
+    propagators_weights: NDArray,
+    shr_domains_adjacent_propagators: NDArray,
+    shr_domains_adjacent_propagators_bounds: NDArray,
+    shr_domains_activities: NDArray,
+    shr_domains_impacts: NDArray,
+    props_buckets: NDArray,
+    queue: NDArray,
+    queue_bounds: NDArray,
+    queue_tops: NDArray,
+    prop_domains: NDArray,
+    workspace: NDArray,
+    algorithms_profile: Optional[NDArray],
+    propagators_profile: Optional[NDArray],
+    shr_domains_stamps: NDArray,
+    trail: NDArray,
+    entailment_trail: NDArray,
+    state_bounds: NDArray,
+    stateful_propagators: NDArray,
+    initial_states: NDArray,
+    props_states_stamps: NDArray,
+    state_trail: NDArray,
+    state_trail_width: int,
+    trail_tops: NDArray,
+    cp_tops: NDArray,
+    cp_shr_domains: NDArray,
+    var_heuristic_idx: int,
+    learning_var_heuristic_idx: int,
+    dom_heuristic_idx: int,
+    choice_limit: int,
+    backtrack_limit: int,
+    deadline: int,
+    compute_domains_addrs: NDArray,
+    var_heuristic_addrs: NDArray,
+    dom_heuristic_addrs: NDArray,
+    dom_indices: NDArray,
+    dom_offsets: NDArray,
+    solution: NDArray,
+) -> Tuple[NDArray, NDArray, NDArray, NDArray, int]:
+    """
+    Searches for a solution of each instance, the problem is reset with the shared domains of the instance
+    and the search stops on its first solution.
+    This method only uses Numpy arrays as parameters, this permits JIT compilation.
+    :return: the trails and the choice points since they may have been reallocated, and the status of the search
+    """
+    for instance_idx in range(len(instances)):
+        shr_domains[:] = instances[instance_idx]
+        not_entailed_propagators.fill(True)
+        triggered_propagators.fill(True)
+        shr_domains_stamps.fill(0)
+        trail_tops.fill(0)
+        restore_states(props_parameters, state_bounds, stateful_propagators, initial_states)
+        props_states_stamps.fill(0)
+        solution_nb = statistics[STATS_SOLVER_SOLUTION_NB]
+        trail, state_trail, cp_tops, cp_shr_domains, status = _solve_all(
+            statistics,
+            algorithms,
+            var_bounds,
+            param_bounds,
+            props_dom_indices,
+            props_dom_offsets,
+            props_parameters,
+            shr_domains,
+            None,
+            shr_domains_propagators,
+            shr_domains_propagators_bounds,
+            triggered_propagators,
+            not_entailed_propagators,
+            propagators_weights,
+            shr_domains_adjacent_propagators,
+            shr_domains_adjacent_propagators_bounds,
+            shr_domains_activities,
+            shr_domains_impacts,
+            props_buckets,
+            queue,
+            queue_bounds,
+            queue_tops,
+            prop_domains,
+            workspace,
+            algorithms_profile,
+            propagators_profile,
+            shr_domains_stamps,
+            trail,
+            entailment_trail,
+            state_bounds,
+            props_states_stamps,
+            state_trail,
+            state_trail_width,
+            trail_tops,
+            cp_tops,
+            cp_shr_domains,
+            var_heuristic_idx,
+            learning_var_heuristic_idx,
+            dom_heuristic_idx,
+            choice_limit,
+            backtrack_limit,
+            deadline,
+            compute_domains_addrs,
+            var_heuristic_addrs,
+            dom_heuristic_addrs,
+            dom_indices,
+            dom_offsets,
+            solution,
+            0,
+            solution_nb + 1,
+        )
+        if statistics[STATS_SOLVER_SOLUTION_NB] > solution_nb:
+            for var_idx in range(len(dom_indices)):
+                solutions[instance_idx, var_idx] = shr_domains[dom_indices[var_idx], MIN] + dom_offsets[var_idx]
+            solved[instance_idx] = True
+        elif status == SEARCH_INTERRUPTED:
+            return trail, state_trail, cp_tops, cp_shr_domains, SEARCH_INTERRUPTED
+    return trail, state_trail, cp_tops, cp_shr_domains, SEARCH_COMPLETE
@@ -10,14 +10,17 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-import numpy as np
+from typing import Optional
+
 from numba import njit  # type: ignore
 from numpy.typing import NDArray
 
 from nucs.constants import (
+    BITS_BASE,
+    BITS_HIGH,
+    BITS_LOW,
     END,
-    MAX,
-    MIN,
+    HOLE,
     PROBLEM_FILTERED,
     PROBLEM_INCONSISTENT,
     PROBLEM_SOLVED,
@@ -25,20 +28,20 @@ from nucs.constants import (
     PROP_INCONSISTENCY,
     START,
 )
+from nucs.domains import get_bitset, normalize_domain, set_bitset
 from nucs.numba import NUMBA_DISABLE_JIT, function_from_address
-from nucs.problems.problem import Problem, is_solved
-from nucs.propagators.propagators import (
-    COMPUTE_DOMAIN_TYPE,
-    COMPUTE_DOMAINS_ADDRS,
-    COMPUTE_DOMAINS_FCTS,
-    pop_propagator,
-)
+from nucs.problems.problem import Problem, is_solved, normalize_shr_domains
+from nucs.problems.propagator_queue import init_queue, pop_propagator, trigger_propagator
+from nucs.problems.trail import trail_bound, trail_entailment, trail_state
+from nucs.propagators.propagators import COMPUTE_DOMAIN_TYPE, COMPUTE_DOMAINS_FCTS, get_compute_domains_addrs
 from nucs.statistics import (
     STATS_PROBLEM_FILTER_NB,
     STATS_PROPAGATOR_ENTAILMENT_NB,
     STATS_PROPAGATOR_FILTER_NB,
     STATS_PROPAGATOR_FILTER_NO_CHANGE_NB,
     STATS_PROPAGATOR_INCONSISTENCY_NB,
+    read_ticks,
+    update_profile,
 )
 
 
@@ -49,7 +52,30 @@ def bound_consistency_algorithm(statistics: NDArray, problem: Problem) -> int:
     :param problem: the problem
     :return: the status as an integer
     """
-    return _bound_consistency_algorithm(
+    return apply_consistency_algorithm(statistics, problem, None)
+
+
+def domain_consistency_algorithm(statistics: NDArray, problem: Problem) -> int:
+    """
+    Applies the domain consistency algorithm: the propagators can also remove values from the domains.
+    This requires the shared domains to be backed by bitsets, which is the case when the solver uses this algorithm,
+    otherwise this is the bound consistency algorithm.
+    :param statistics: the statistics array
+    :param problem: the problem
+    :return: the status as an integer
+    """
+    return apply_consistency_algorithm(statistics, problem, problem.shr_domains_bases)
+
+
+def apply_consistency_algorithm(statistics: NDArray, problem: Problem, shr_domains_bases: Optional[NDArray]) -> int:
+    """
+    Applies the bound consistency algorithm or, given the bases of the bitsets, the domain consistency algorithm.
+    :param statistics: the statistics array
+    :param problem: the problem
+    :param shr_domains_bases: the values of the first bits of the bitsets of the shared domains or None
+    :return: the status as an integer
+    """
+    return _consistency_algorithm(
         statistics,
         problem.algorithms,
         problem.var_bounds,
@@ -58,15 +84,35 @@ def bound_consistency_algorithm(statistics: NDArray, problem: Problem) -> int:
         problem.props_dom_offsets,
         problem.props_parameters,
         problem.shr_domains_arr,
+        shr_domains_bases,
         problem.shr_domains_propagators,
+        problem.shr_domains_propagators_bounds,
         problem.triggered_propagators,
         problem.not_entailed_propagators,
-        COMPUTE_DOMAINS_ADDRS,
+        problem.propagators_weights,
+        problem.shr_domains_activities,
+        problem.props_buckets,
+        problem.queue,
+        problem.queue_bounds,
+        problem.queue_tops,
+        problem.prop_domains,
+        problem.workspace,
+        problem.algorithms_profile,
+        problem.propagators_profile,
+        problem.trailing,
+        problem.shr_domains_stamps,
+        problem.trail,
+        problem.entailment_trail,
+        problem.state_bounds,
+        problem.props_states_stamps,
+        problem.state_trail,
+        problem.trail_tops,
+        get_compute_domains_addrs(),
     )
 
 
 @njit(cache=True)
-def _bound_consistency_algorithm(
+def _consistency_algorithm(
     statistics: NDArray,
     algorithms: NDArray,
     var_bounds: NDArray,
@@ -75,19 +121,60 @@ def _bound_consistency_algorithm(
     props_offsets: NDArray,
     props_data: NDArray,
     shr_domains: NDArray,
+    shr_domains_bases: Optional[NDArray],
     shr_domains_props: NDArray,
+    shr_domains_props_bounds: NDArray,
     triggered_props: NDArray,
     not_entailed_props: NDArray,
+    props_weights: NDArray,
+    shr_domains_activities: NDArray,
+    props_buckets: NDArray,
+    queue: NDArray,
+    queue_bounds: NDArray,
+    queue_tops: NDArray,
+    prop_domains_buffer: NDArray,
+    workspace: NDArray,
+    algorithms_profile: Optional[NDArray],
+    propagators_profile: Optional[NDArray],
+    trailing: bool,
+    shr_domains_stamps: NDArray,
+    trail: NDArray,
+    entailment_trail: NDArray,
+    state_bounds: NDArray,
+    props_states_stamps: NDArray,
+    state_trail: NDArray,
+    trail_tops: NDArray,
     compute_domains_addrs: NDArray,
 ) -> int:
     """
-    Internal method for applying the bound consistency algorithm.
+    Internal method for applying the bound consistency algorithm or the domain consistency algorithm.
     This method only uses Numpy arrays as parameters, this permits JIT compilation.
+    The weight of a propagator is incremented when it fails, this is used by the dom/wdeg heuristic.
+    The activity of a shared domain is incremented when it is reduced, this is used by the activity heuristic.
+    In trailing mode, the changes of the shared domains, the entailments and the states of the stateful propagators
+    are recorded on the trails.
+    The domains of the propagators and their temporaries are stored in preallocated buffers, nothing is allocated.
+    The profiles are None unless profiling is enabled: Numba then compiles a version without any profiling code.
+    Likewise, the bases of the bitsets are None unless the domain consistency algorithm is applied:
+    the propagators then get the bitsets of their domains and the removals of values trigger the HOLE watchers.
     """
     statistics[STATS_PROBLEM_FILTER_NB] += 1
+    if shr_domains_bases is not None and not normalize_shr_domains(
+        shr_domains,
+        shr_domains_bases,
+        triggered_props,
+        shr_domains_props,
+        shr_domains_props_bounds,
+        trailing,
+        shr_domains_stamps,
+        trail,
+        trail_tops,
+    ):
+        return PROBLEM_INCONSISTENT
+    init_queue(queue, queue_bounds, queue_tops, props_buckets, triggered_props, not_entailed_props)
     prop_idx = -1
     while True:
-        prop_idx = pop_propagator(triggered_props, not_entailed_props, prop_idx)
+        prop_idx = pop_propagator(queue, queue_bounds, queue_tops, triggered_props, not_entailed_props, prop_idx)
         if prop_idx == -1:
             return PROBLEM_SOLVED if is_solved(shr_domains) else PROBLEM_FILTERED
         statistics[STATS_PROPAGATOR_FILTER_NB] += 1
@@ -96,8 +183,17 @@ def _bound_consistency_algorithm(
         prop_indices = props_indices[prop_var_start:prop_var_end]
         prop_offsets = props_offsets[prop_var_start:prop_var_end]
         prop_var_nb = prop_var_end - prop_var_start
-        prop_domains = np.empty((2, prop_var_nb), dtype=np.int32).T  # trick for order=F
-        np.add(shr_domains[prop_indices], prop_offsets, prop_domains)
+        if shr_domains_bases is None:
+            prop_domains = prop_domains_buffer[:prop_var_nb, :2]
+        else:
+            prop_domains = prop_domains_buffer[:prop_var_nb]
+        for var_idx in range(prop_var_nb):
+            for bound in range(2):
+                prop_domains[var_idx, bound] = shr_domains[prop_indices[var_idx], bound] + prop_offsets[var_idx, 0]
+            if shr_domains_bases is not None:
+                prop_domains[var_idx, BITS_LOW] = shr_domains[prop_indices[var_idx], BITS_LOW]
+                prop_domains[var_idx, BITS_HIGH] = shr_domains[prop_indices[var_idx], BITS_HIGH]
+                prop_domains[var_idx, BITS_BASE] = shr_domains_bases[prop_indices[var_idx]] + prop_offsets[var_idx, 0]
         algorithm = algorithms[prop_idx]
         compute_domains_function = (
             COMPUTE_DOMAINS_FCTS[algorithm]
@@ -105,22 +201,70 @@ def _bound_consistency_algorithm(
             else function_from_address(COMPUTE_DOMAIN_TYPE, compute_domains_addrs[algorithm])
         )
         prop_data = props_data[data_bounds[prop_idx, START] : data_bounds[prop_idx, END]]
-        status = compute_domains_function(prop_domains, prop_data)
+        if trailing and state_bounds[prop_idx, START] < state_bounds[prop_idx, END]:
+            trail_state(props_data, state_bounds, props_states_stamps, state_trail, trail_tops, prop_idx)
+        if algorithms_profile is not None:
+            start_ticks = read_ticks()
+        status = compute_domains_function(prop_domains, prop_data, workspace)
+        if algorithms_profile is not None:
+            ticks = read_ticks() - start_ticks
+        shr_domains_changes = False
+        if status != PROP_INCONSISTENCY:
+            for var_idx in range(prop_var_nb):
+                shr_domain_idx = prop_indices[var_idx]
+                if shr_domains_bases is not None:
+                    # The removed values are removed from the shared domain, its bounds must remain in its bitset.
+                    bitset = get_bitset(prop_domains, var_idx) & get_bitset(shr_domains, shr_domain_idx)
+                    set_bitset(prop_domains, var_idx, bitset)
+                    if not normalize_domain(prop_domains, var_idx, prop_domains[var_idx, BITS_BASE]):
+                        status = PROP_INCONSISTENCY
+                        break
+                    if bitset != get_bitset(shr_domains, shr_domain_idx):
+                        if trailing:
+                            trail_bound(shr_domains, shr_domains_stamps, trail, trail_tops, shr_domain_idx, BITS_LOW)
+                            trail_bound(shr_domains, shr_domains_stamps, trail, trail_tops, shr_domain_idx, BITS_HIGH)
+                        set_bitset(shr_domains, shr_domain_idx, bitset)
+                        shr_domains_activities[shr_domain_idx] += 1
+                        shr_domains_changes = True
+                        for idx in range(
+                            shr_domains_props_bounds[shr_domain_idx, HOLE, START],
+                            shr_domains_props_bounds[shr_domain_idx, HOLE, END],
+                        ):
+                            trigger_propagator(
+                                queue, queue_bounds, queue_tops, props_buckets, triggered_props, shr_domains_props[idx]
+                            )
+                prop_offset = prop_offsets[var_idx, 0]
+                for bound in range(2):
+                    shr_domain_bound = prop_domains[var_idx, bound] - prop_offset
+                    if shr_domains[shr_domain_idx, bound] != shr_domain_bound:
+                        if trailing:
+                            trail_bound(shr_domains, shr_domains_stamps, trail, trail_tops, shr_domain_idx, bound)
+                        shr_domains[shr_domain_idx, bound] = shr_domain_bound
+                        shr_domains_activities[shr_domain_idx] += 1
+                        shr_domains_changes = True
+                        for idx in range(
+                            shr_domains_props_bounds[shr_domain_idx, bound, START],
+                            shr_domains_props_bounds[shr_domain_idx, bound, END],
+                        ):
+                            trigger_propagator(
+                                queue, queue_bounds, queue_tops, props_buckets, triggered_props, shr_domains_props[idx]
+                            )
         if status == PROP_INCONSISTENCY:
+            if algorithms_profile is not None:
+                update_profile(algorithms_profile, algorithm, status, False, ticks)
+                if propagators_profile is not None:
+                    update_profile(propagators_profile, prop_idx, status, False, ticks)
             statistics[STATS_PROPAGATOR_INCONSISTENCY_NB] += 1
+            props_weights[prop_idx] += 1
             return PROBLEM_INCONSISTENT
         if status == PROP_ENTAILMENT:
             not_entailed_props[prop_idx] = False
+            if trailing:
+                trail_entailment(entailment_trail, trail_tops, prop_idx)
             statistics[STATS_PROPAGATOR_ENTAILMENT_NB] += 1
-        shr_domains_changes = False
-        for var_idx in range(prop_var_nb):
-            shr_domain_idx = prop_indices[var_idx]
-            prop_offset = prop_offsets[var_idx][0]
-            for bound in [MIN, MAX]:
-                shr_domain_bound = prop_domains[var_idx, bound] - prop_offset
-                if shr_domains[shr_domain_idx, bound] != shr_domain_bound:
-                    shr_domains[shr_domain_idx, bound] = shr_domain_bound
-                    shr_domains_changes = True
-                    np.logical_or(triggered_props, shr_domains_props[shr_domain_idx, bound], triggered_props)
         if not shr_domains_changes:  # type: ignore
             statistics[STATS_PROPAGATOR_FILTER_NO_CHANGE_NB] += 1
+        if algorithms_profile is not None:
+            update_profile(algorithms_profile, algorithm, status, shr_domains_changes, ticks)
+            if propagators_profile is not None:
+                update_profile(propagators_profile, prop_idx, status, shr_domains_changes, ticks)
@@ -12,10 +12,17 @@
 ###############################################################################
 import sys
 
-from numba import njit  # type: ignore
+import numpy as np
+from numba import int32, int64, njit, types  # type: ignore
 from numpy.typing import NDArray
 
-from nucs.constants import MAX, MIN
+from nucs.constants import END, MAX, MIN, START
+from nucs.numba import NUMBA_DISABLE_JIT, build_function_address_list
+
+# The factor applied to the activities each time a shared domain is chosen.
+ACTIVITY_DECAY = 0.99
+# The weight of the last impact in the impact of a shared domain (exponential moving average).
+IMPACT_SMOOTHING = 0.25
 
 
 @njit(cache=True)
@@ -62,6 +69,145 @@ def smallest_domain_var_heuristic(shr_domains: NDArray) -> int:
     return min_idx
 
 
+@njit(cache=True)
+def random_smallest_domain_var_heuristic(shr_domains: NDArray) -> int:
+    """
+    Chooses the smallest shared domain and which is not instantiated, ties are broken randomly.
+    :param shr_domains: the shared domains of the problem
+    :return: the index of the shared domain
+    """
+    min_size = sys.maxsize
+    min_idx = -1
+    tie_nb = 0
+    for dom_idx, shr_domain in enumerate(shr_domains):
+        size = shr_domain[MAX] - shr_domain[MIN]  # actually this is size - 1
+        if 0 < size < min_size:
+            min_idx = dom_idx
+            min_size = size
+            tie_nb = 1
+        elif size == min_size:
+            # reservoir sampling: each of the smallest domains is chosen with the same probability
+            tie_nb += 1
+            if np.random.randint(tie_nb) == 0:
+                min_idx = dom_idx
+    return min_idx
+
+
+@njit(cache=True)
+def dom_wdeg_var_heuristic(
+    shr_domains: NDArray,
+    not_entailed_propagators: NDArray,
+    propagators_weights: NDArray,
+    shr_domains_adjacent_propagators: NDArray,
+    shr_domains_adjacent_propagators_bounds: NDArray,
+) -> int:
+    """
+    Chooses the non-instantiated shared domain which minimizes its size divided by its weighted degree,
+    the weighted degree being the sum of the weights of the non-entailed propagators involving the shared domain.
+    :param shr_domains: the shared domains of the problem
+    :param not_entailed_propagators: the propagators that are not entailed
+    :param propagators_weights: the weights of the propagators
+    :param shr_domains_adjacent_propagators: the propagators involving the shared domains
+    :param shr_domains_adjacent_propagators_bounds: the bounds of the propagators involving each shared domain
+    :return: the index of the shared domain
+    """
+    min_score = np.inf
+    min_idx = -1
+    for dom_idx, shr_domain in enumerate(shr_domains):
+        size = shr_domain[MAX] - shr_domain[MIN]  # actually this is size - 1
+        if size > 0:
+            weighted_degree = 0
+            for idx in range(
+                shr_domains_adjacent_propagators_bounds[dom_idx, START],
+                shr_domains_adjacent_propagators_bounds[dom_idx, END],
+            ):
+                prop_idx = shr_domains_adjacent_propagators[idx]
+                if not_entailed_propagators[prop_idx]:
+                    weighted_degree += propagators_weights[prop_idx]
+            score = (size + 1) / weighted_degree if weighted_degree > 0 else np.inf
+            if min_idx == -1 or score < min_score:
+                min_idx = dom_idx
+                min_score = score
+    return min_idx
+
+
+@njit(cache=True)
+def activity_var_heuristic(shr_domains: NDArray, shr_domains_activities: NDArray) -> int:
+    """
+    Chooses the non-instantiated shared domain which maximizes its activity divided by its size.
+    The activity of a shared domain is incremented each time it is reduced by a propagator
+    and decays each time a shared domain is chosen.
+    :param shr_domains: the shared domains of the problem
+    :param shr_domains_activities: the activities of the shared domains
+    :return: the index of the shared domain
+    """
+    max_score = -1.0
+    max_idx = -1
+    for dom_idx, shr_domain in enumerate(shr_domains):
+        shr_domains_activities[dom_idx] *= ACTIVITY_DECAY
+        size = shr_domain[MAX] - shr_domain[MIN]  # actually this is size - 1
+        if size > 0:
+            score = shr_domains_activities[dom_idx] / (size + 1)
+            if score > max_score:
+                max_idx = dom_idx
+                max_score = score
+    return max_idx
+
+
+@njit(cache=True)
+def impact_var_heuristic(shr_domains: NDArray, shr_domains_impacts: NDArray) -> int:
+    """
+    Chooses the non-instantiated shared domain with the greatest impact, ties are broken by choosing the smallest.
+    The impact of a shared domain is the average reduction of the search space when it is chosen.
+    :param shr_domains: the shared domains of the problem
+    :param shr_domains_impacts: the impacts of the shared domains
+    :return: the index of the shared domain
+    """
+    max_impact = -1.0
+    min_size = sys.maxsize
+    max_idx = -1
+    for dom_idx, shr_domain in enumerate(shr_domains):
+        size = shr_domain[MAX] - shr_domain[MIN]  # actually this is size - 1
+        if size > 0:
+            impact = shr_domains_impacts[dom_idx]
+            if impact > max_impact or (impact == max_impact and size < min_size):
+                max_idx = dom_idx
+                max_impact = impact
+                min_size = size
+    return max_idx
+
+
+@njit(cache=True)
+def get_log_size(shr_domains: NDArray) -> float:
+    """
+    Returns the logarithm of the size of the search space.
+    :param shr_domains: the shared domains of the problem
+    :return: a float
+    """
+    log_size = 0.0
+    for shr_domain in shr_domains:
+        log_size += np.log(shr_domain[MAX] - shr_domain[MIN] + 1)
+    return log_size
+
+
+@njit(cache=True)
+def update_impact(
+    shr_domains: NDArray, shr_domains_impacts: NDArray, dom_idx: int, log_size: float, inconsistent: bool
+) -> None:
+    """
+    Updates the impact of a shared domain after a decision on it has been propagated.
+    The impact of the decision is 1 - P_after / P_before where P is the size of the search space,
+    it is 1 when the decision leads to an inconsistency.
+    :param shr_domains: the shared domains of the problem
+    :param shr_domains_impacts: the impacts of the shared domains
+    :param dom_idx: the index of the chosen shared domain
+    :param log_size: the logarithm of the size of the search space before the decision
+    :param inconsistent: true iff the decision leads to an inconsistency
+    """
+    impact = 1.0 if inconsistent else 1.0 - np.exp(get_log_size(shr_domains) - log_size)
+    shr_domains_impacts[dom_idx] += IMPACT_SMOOTHING * (impact - shr_domains_impacts[dom_idx])
+
+
 @njit(cache=True)
 def greatest_domain_var_heuristic(shr_domains: NDArray) -> int:
     """
@@ -110,3 +256,98 @@ def split_low_dom_heuristic(shr_domain: NDArray, shr_domain_copy: NDArray) -> in
     shr_domain_copy[MIN] = value + 1
     shr_domain[MAX] = value
     return MAX
+
+
+@njit(cache=True)
+def random_value_dom_heuristic(shr_domain: NDArray, shr_domain_copy: NDArray) -> int:
+    """
+    Chooses randomly the first or the last value of the domain.
+    """
+    if np.random.randint(2) == 0:
+        return min_value_dom_heuristic(shr_domain, shr_domain_copy)
+    return max_value_dom_heuristic(shr_domain, shr_domain_copy)
+
+
+@njit(cache=True)
+def seed_random_heuristics(seed: int) -> None:
+    """
+    Seeds the random number generator used by the random heuristics.
+    This generator is the one of Numba when the code is JIT compiled and the one of Numpy otherwise.
+    :param seed: the seed
+    """
+    np.random.seed(seed)
+
+
+# The heuristics that can be used by the JIT compiled search, they are selected by their function addresses.
+VAR_HEURISTIC_FCTS = [
+    first_not_instantiated_var_heuristic,
+    last_not_instantiated_var_heuristic,
+    smallest_domain_var_heuristic,
+    greatest_domain_var_heuristic,
+    random_smallest_domain_var_heuristic,
+]
+
+DOM_HEURISTIC_FCTS = [
+    min_value_dom_heuristic,
+    max_value_dom_heuristic,
+    split_low_dom_heuristic,
+    random_value_dom_heuristic,
+]
+
+# The var heuristics which learn from the search, their signatures differ from the ones of the other var heuristics.
+LEARNING_VAR_HEURISTIC_FCTS = [
+    dom_wdeg_var_heuristic,
+    activity_var_heuristic,
+    impact_var_heuristic,
+]
+(
+    LEARNING_VAR_HEURISTIC_DOM_WDEG,
+    LEARNING_VAR_HEURISTIC_ACTIVITY,
+    LEARNING_VAR_HEURISTIC_IMPACT,
+) = tuple(range(3))
+
+
+@njit(cache=True)
+def learning_var_heuristic(
+    learning_var_heuristic_idx: int,
+    shr_domains: NDArray,
+    not_entailed_propagators: NDArray,
+    propagators_weights: NDArray,
+    shr_domains_adjacent_propagators: NDArray,
+    shr_domains_adjacent_propagators_bounds: NDArray,
+    shr_domains_activities: NDArray,
+    shr_domains_impacts: NDArray,
+) -> int:
+    """
+    Chooses a shared domain with a learning var heuristic.
+    :param learning_var_heuristic_idx: the index of the heuristic in LEARNING_VAR_HEURISTIC_FCTS
+    :return: the index of the shared domain
+    """
+    if learning_var_heuristic_idx == LEARNING_VAR_HEURISTIC_DOM_WDEG:
+        return dom_wdeg_var_heuristic(
+            shr_domains,
+            not_entailed_propagators,
+            propagators_weights,
+            shr_domains_adjacent_propagators,
+            shr_domains_adjacent_propagators_bounds,
+        )
+    if learning_var_heuristic_idx == LEARNING_VAR_HEURISTIC_ACTIVITY:
+        return activity_var_heuristic(shr_domains, shr_domains_activities)
+    return impact_var_heuristic(shr_domains, shr_domains_impacts)
+
+
+VAR_HEURISTIC_SIGNATURE = int64(int32[:, :])
+VAR_HEURISTIC_TYPE = types.FunctionType(VAR_HEURISTIC_SIGNATURE)
+VAR_HEURISTIC_ADDRS = (
+    np.array(build_function_address_list(VAR_HEURISTIC_FCTS, VAR_HEURISTIC_SIGNATURE))
+    if not NUMBA_DISABLE_JIT
+    else np.empty(0)
+)
+
+DOM_HEURISTIC_SIGNATURE = int64(int32[:], int32[:])
+DOM_HEURISTIC_TYPE = types.FunctionType(DOM_HEURISTIC_SIGNATURE)
+DOM_HEURISTIC_ADDRS = (
+    np.array(build_function_address_list(DOM_HEURISTIC_FCTS, DOM_HEURISTIC_SIGNATURE))
+    if not NUMBA_DISABLE_JIT
+    else np.empty(0)
+)
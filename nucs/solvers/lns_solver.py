@@ -0,0 +1,182 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import sys
+from typing import Callable, List, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from nucs.constants import SEARCH_COMPLETE, SEARCH_IN_PROGRESS, SEARCH_INTERRUPTED
+from nucs.numpy import new_shr_domains_by_values
+from nucs.problems.problem import Problem, restore_states
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.consistency_algorithms import bound_consistency_algorithm
+from nucs.solvers.heuristics import first_not_instantiated_var_heuristic, min_value_dom_heuristic
+from nucs.statistics import STATS_OPTIMIZER_SOLUTION_NB, STATS_SOLVER_BACKTRACK_NB
+
+
+def random_neighborhood(variables: List[int], relaxed_nb: int, iteration: int, rng: np.random.Generator) -> List[int]:
+    """
+    Returns a neighborhood made of random variables.
+    :param variables: the variables that can be relaxed
+    :param relaxed_nb: the number of variables to relax
+    :param iteration: the index of the iteration
+    :param rng: the random number generator
+    :return: the list of the variables to relax
+    """
+    return rng.choice(variables, relaxed_nb, replace=False).tolist()
+
+
+def sliding_neighborhood(variables: List[int], relaxed_nb: int, iteration: int, rng: np.random.Generator) -> List[int]:
+    """
+    Returns a neighborhood made of consecutive variables, the window slides by half its size at each iteration.
+    :param variables: the variables that can be relaxed
+    :param relaxed_nb: the number of variables to relax
+    :param iteration: the index of the iteration
+    :param rng: the random number generator
+    :return: the list of the variables to relax
+    """
+    start = iteration * max(1, relaxed_nb // 2)
+    return [variables[(start + i) % len(variables)] for i in range(relaxed_nb)]
+
+
+class LnsSolver(BacktrackSolver):
+    """
+    A solver that optimizes by Large Neighborhood Search.
+    Starting from a first solution, it repeatedly relaxes some variables to their initial domains,
+    fixes the other ones to their values in the best solution and searches for a better solution
+    with a limited number of backtracks.
+    The search is incomplete but finds good solutions for problems that are too large for branch and bound.
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        variables: Optional[List[int]] = None,
+        neighborhood: Callable = random_neighborhood,
+        relaxation_rate: float = 0.2,
+        fail_limit: int = 100,
+        iteration_limit: int = 100,
+        seed: int = 0,
+        consistency_algorithm: Callable = bound_consistency_algorithm,
+        var_heuristic: Callable = first_not_instantiated_var_heuristic,
+        dom_heuristic: Callable = min_value_dom_heuristic,
+        trailing: bool = False,
+        time_limit: Optional[float] = None,
+    ):
+        """
+        Inits the solver.
+        :param problem: the problem
+        :param variables: the decision variables that are fixed or relaxed,
+        defaults to all variables but the objective variable, the other variables are always relaxed
+        :param neighborhood: a function returning the variables to relax
+        :param relaxation_rate: the proportion of the decision variables to relax
+        :param fail_limit: the number of backtracks after which the search of a neighborhood is stopped
+        :param iteration_limit: the number of neighborhoods to search
+        :param seed: the seed of the random number generator used by the neighborhoods
+        :param consistency_algorithm: a consistency algorithm (usually bound consistency)
+        :param var_heuristic: a heuristic for selecting a variable/domain
+        :param dom_heuristic: a heuristic for reducing a domain
+        :param trailing: if true, the choice points record the changes of the domains on a trail
+        :param time_limit: the optional duration in seconds after which the search is interrupted
+        """
+        super().__init__(problem, consistency_algorithm, var_heuristic, dom_heuristic, trailing, time_limit=time_limit)
+        self.variables = variables
+        self.neighborhood = neighborhood
+        self.relaxation_rate = relaxation_rate
+        self.fail_limit = fail_limit
+        self.iteration_limit = iteration_limit
+        self.rng = np.random.default_rng(seed)
+        self.neighborhood_backtrack_limit = sys.maxsize
+
+    def check_limits(self) -> bool:
+        """
+        Returns true iff a limit has been reached or if the search of the current neighborhood must be stopped.
+        :return: a boolean
+        """
+        return super().check_limits() or self.statistics[STATS_SOLVER_BACKTRACK_NB] >= self.neighborhood_backtrack_limit
+
+    def optimize(self, variable_idx: int, bound: int, delta: int) -> Optional[List[int]]:
+        """
+        Finds, if it exists, a good solution by Large Neighborhood Search.
+        The arrays of the problem are reused: the domains of the fixed variables are copied from the best solution
+        and the other domains are copied from the initial domains, the problem is not reset.
+        :param variable_idx: the index of the variable
+        :param bound: the bound of the variable to be tightened (MAX when minimizing, MIN when maximizing)
+        :param delta: the difference between the new bound and the value of the last solution
+        :return: the best solution found if any or None
+        """
+        solution = self.solve_one()
+        if solution is None:
+            return None
+        self.statistics[STATS_OPTIMIZER_SOLUTION_NB] += 1
+        problem = self.problem
+        best_shr_domains = problem.shr_domains_arr.copy()
+        initial_shr_domains = new_shr_domains_by_values(problem.shr_domains_lst, problem.bitsets)
+        # The objective variable is never fixed.
+        variables = [
+            var_idx
+            for var_idx in (self.variables if self.variables is not None else range(problem.variable_nb))
+            if var_idx != variable_idx
+        ]
+        relaxed_nb = min(len(variables), max(1, round(self.relaxation_rate * len(variables))))
+        for iteration in range(self.iteration_limit):
+            relaxed_variables = set(self.neighborhood(variables, relaxed_nb, iteration, self.rng))
+            fixed_variables = [var_idx for var_idx in variables if var_idx not in relaxed_variables]
+            fixed_dom_indices = problem.dom_indices_arr[fixed_variables]
+            self.reset_neighborhood(initial_shr_domains, best_shr_domains, fixed_dom_indices)
+            self.objective = (variable_idx, bound, solution[variable_idx] + delta)
+            if not self.apply_objective():
+                self.status = SEARCH_COMPLETE
+                break
+            self.neighborhood_backtrack_limit = self.statistics[STATS_SOLVER_BACKTRACK_NB] + self.fail_limit
+            while (new_solution := self.solve_one()) is not None:
+                solution = new_solution
+                self.statistics[STATS_OPTIMIZER_SOLUTION_NB] += 1
+                np.copyto(best_shr_domains, problem.shr_domains_arr)
+                self.objective = (variable_idx, bound, solution[variable_idx] + delta)
+                if not self.backtrack():
+                    break
+            if self.status == SEARCH_INTERRUPTED or (
+                self.status == SEARCH_COMPLETE and len(relaxed_variables) == len(variables)
+            ):
+                # When all the decision variables have been relaxed, the optimality of the solution is proved.
+                break
+        else:
+            self.status = SEARCH_INTERRUPTED
+        self.objective = None
+        self.neighborhood_backtrack_limit = sys.maxsize
+        return solution
+
+    def reset_neighborhood(
+        self, initial_shr_domains: NDArray, best_shr_domains: NDArray, fixed_dom_indices: NDArray
+    ) -> None:
+        """
+        Resets the search in place for a new neighborhood.
+        :param initial_shr_domains: the initial shared domains
+        :param best_shr_domains: the shared domains of the best solution
+        :param fixed_dom_indices: the indices of the shared domains of the fixed variables
+        """
+        problem = self.problem
+        np.copyto(problem.shr_domains_arr, initial_shr_domains)
+        problem.shr_domains_arr[fixed_dom_indices] = best_shr_domains[fixed_dom_indices]
+        problem.not_entailed_propagators.fill(True)
+        problem.triggered_propagators.fill(True)
+        problem.shr_domains_stamps.fill(0)
+        problem.trail_tops.fill(0)
+        problem.props_states_stamps.fill(0)
+        restore_states(
+            problem.props_parameters, problem.state_bounds, problem.stateful_propagators, problem.initial_states
+        )
+        self.stack_depth = 0
+        self.status = SEARCH_IN_PROGRESS
@@ -0,0 +1,186 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import multiprocessing
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from numpy.typing import NDArray
+
+from nucs.constants import PROBLEM_INCONSISTENT, PROBLEM_SOLVED
+from nucs.problems.problem import Problem
+from nucs.solvers.backtrack_solver import BacktrackSolver, choose_shr_domain
+from nucs.solvers.consistency_algorithms import bound_consistency_algorithm, domain_consistency_algorithm
+from nucs.solvers.heuristics import first_not_instantiated_var_heuristic, min_value_dom_heuristic
+from nucs.solvers.solver import Solver
+from nucs.statistics import (
+    STATS_SOLVER_BACKTRACK_NB,
+    STATS_SOLVER_CHOICE_DEPTH,
+    STATS_SOLVER_CHOICE_NB,
+    merge_statistics,
+)
+
+# A cube is a node of the search tree: the shared domains, the not entailed propagators and the depth of the node.
+Cube = Tuple[NDArray, NDArray, int]
+
+# The solver of a worker process, it is created once per process by init_worker.
+worker_solver: Optional[BacktrackSolver] = None
+
+
+class MultiprocessingSolver(Solver):
+    """
+    A solver that splits the search tree into cubes and solves them in parallel with a pool of processes.
+    There are many more cubes than processes and an idle process picks the next cube,
+    this balances the load when the sizes of the subtrees are irregular.
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        processes: Optional[int] = None,
+        cubes_per_process: int = 32,
+        deterministic: bool = False,
+        consistency_algorithm: Callable = bound_consistency_algorithm,
+        var_heuristic: Callable = first_not_instantiated_var_heuristic,
+        dom_heuristic: Callable = min_value_dom_heuristic,
+        trailing: bool = False,
+    ):
+        """
+        Inits the solver.
+        :param problem: the problem
+        :param processes: the number of processes, defaults to the number of CPUs
+        :param cubes_per_process: the number of cubes to generate per process
+        :param deterministic: if true, the solutions are returned in the order of a sequential search
+        :param consistency_algorithm: a consistency algorithm (usually bound consistency)
+        :param var_heuristic: a heuristic for selecting a variable/domain
+        :param dom_heuristic: a heuristic for reducing a domain
+        :param trailing: if true, the workers record the changes of the domains on a trail
+        """
+        super().__init__(problem)
+        self.processes = processes if processes is not None else multiprocessing.cpu_count()
+        self.cubes_per_process = cubes_per_process
+        self.deterministic = deterministic
+        self.consistency_algorithm = consistency_algorithm
+        self.var_heuristic = var_heuristic
+        self.dom_heuristic = dom_heuristic
+        self.trailing = trailing
+        # The cubes are generated with the consistency algorithm of the workers, they share the bitsets mode.
+        if consistency_algorithm == domain_consistency_algorithm:
+            problem.bitsets = True
+
+    def solve(self) -> Iterator[List[int]]:
+        """
+        Returns an iterator over the solutions.
+        :return: an iterator
+        """
+        for solutions in self.map_cubes(True):
+            yield from solutions
+
+    def solve_all(self, func: Optional[Callable] = None) -> None:
+        """
+        Finds all solutions.
+        When no function is applied to the solutions, the workers only count the solutions.
+        :param func: a function to apply to each solution
+        """
+        if func is None:
+            for _ in self.map_cubes(False):
+                pass
+        else:
+            super().solve_all(func)
+
+    def map_cubes(self, with_solutions: bool) -> Iterator[List[List[int]]]:
+        """
+        Solves the cubes with a pool of processes and merges the statistics of the workers.
+        :param with_solutions: if true, the workers return the solutions, otherwise they only count them
+        :return: an iterator over the solutions of the cubes
+        """
+        cubes = self.generate_cubes()
+        solver_args = (self.consistency_algorithm, self.var_heuristic, self.dom_heuristic, self.trailing)
+        with multiprocessing.Pool(self.processes, init_worker, (self.problem, solver_args)) as pool:
+            tasks = [(cube, with_solutions) for cube in cubes]
+            results = pool.imap(solve_cube, tasks) if self.deterministic else pool.imap_unordered(solve_cube, tasks)
+            for solutions, statistics in results:
+                merge_statistics(self.statistics, statistics)
+                yield solutions
+
+    def generate_cubes(self) -> List[Cube]:
+        """
+        Expands the search tree breadth-first until there are enough cubes.
+        The order of the cubes is the order in which a sequential depth-first search would visit them.
+        :return: the list of cubes
+        """
+        problem = self.problem
+        if not problem.ready:
+            problem.init_problem(self.statistics)
+            problem.ready = True
+        problem.reset()
+        cubes = [(problem.shr_domains_arr.copy(), problem.not_entailed_propagators.copy(), 0)]
+        cube_nb = self.processes * self.cubes_per_process
+        expanded = True
+        while expanded and len(cubes) < cube_nb:
+            expanded = False
+            children = []
+            for shr_domains, not_entailed_propagators, depth in cubes:
+                problem.reset((shr_domains, not_entailed_propagators))
+                status = self.consistency_algorithm(self.statistics, problem)
+                if status == PROBLEM_INCONSISTENT:
+                    continue
+                if status == PROBLEM_SOLVED:
+                    children.append((shr_domains, not_entailed_propagators, depth))
+                    continue
+                dom_idx = choose_shr_domain(self.var_heuristic, problem)
+                left_shr_domains = problem.shr_domains_arr.copy()
+                right_shr_domains = problem.shr_domains_arr.copy()
+                self.dom_heuristic(left_shr_domains[dom_idx], right_shr_domains[dom_idx])
+                not_entailed_propagators = problem.not_entailed_propagators.copy()
+                children.append((left_shr_domains, not_entailed_propagators, depth + 1))
+                # As in a sequential search, the choice point is popped before exploring the alternative.
+                children.append((right_shr_domains, not_entailed_propagators, depth))
+                self.statistics[STATS_SOLVER_CHOICE_NB] += 1
+                self.statistics[STATS_SOLVER_BACKTRACK_NB] += 1
+                self.statistics[STATS_SOLVER_CHOICE_DEPTH] = max(self.statistics[STATS_SOLVER_CHOICE_DEPTH], depth + 1)
+                expanded = True
+            cubes = children
+        problem.reset()
+        return cubes
+
+
+def init_worker(problem: Problem, solver_args: Tuple[Callable, Callable, Callable, bool]) -> None:
+    """
+    Inits the solver of a worker process.
+    :param problem: the problem
+    :param solver_args: the consistency algorithm, the heuristics and the trailing mode
+    """
+    global worker_solver
+    consistency_algorithm, var_heuristic, dom_heuristic, trailing = solver_args
+    worker_solver = BacktrackSolver(problem, consistency_algorithm, var_heuristic, dom_heuristic, trailing)
+    worker_solver.init_problem()
+
+
+def solve_cube(args: Tuple[Cube, bool]) -> Tuple[List[List[int]], NDArray]:
+    """
+    Solves a cube in a worker process.
+    :param args: the cube and a boolean indicating whether the solutions should be returned or only counted
+    :return: the solutions and the statistics of the cube
+    """
+    (shr_domains, not_entailed_propagators, depth), with_solutions = args
+    solver = worker_solver
+    assert solver is not None
+    solver.statistics.fill(0)
+    solver.reset()
+    solver.problem.reset((shr_domains, not_entailed_propagators))
+    solutions = []
+    if with_solutions:
+        solutions = list(solver.solve())
+    else:
+        solver.solve_all()
+    solver.statistics[STATS_SOLVER_CHOICE_DEPTH] += depth
+    return solutions, solver.statistics.copy()
@@ -0,0 +1,171 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import multiprocessing
+import queue
+from multiprocessing.sharedctypes import RawArray
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from nucs.problems.problem import Problem
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.heuristics import (
+    first_not_instantiated_var_heuristic,
+    min_value_dom_heuristic,
+    smallest_domain_var_heuristic,
+    split_low_dom_heuristic,
+)
+from nucs.solvers.solver import Solver
+from nucs.statistics import STATS_MAX, get_statistics
+
+# The duration in seconds after which the processes of a race are checked when no result has been received.
+PROCESS_CHECK_PERIOD = 0.1
+
+# The configurations raced by default, a configuration holds the parameters of a backtrack solver.
+DEFAULT_CONFIGURATIONS = [
+    {"var_heuristic": first_not_instantiated_var_heuristic, "dom_heuristic": min_value_dom_heuristic},
+    {"var_heuristic": first_not_instantiated_var_heuristic, "dom_heuristic": split_low_dom_heuristic},
+    {"var_heuristic": smallest_domain_var_heuristic, "dom_heuristic": min_value_dom_heuristic},
+    {"var_heuristic": smallest_domain_var_heuristic, "dom_heuristic": split_low_dom_heuristic},
+]
+
+
+class PortfolioSolver(Solver):
+    """
+    A solver that races several configurations of backtrack solvers, one per process, on the same problem.
+    The result of the first configuration to complete is returned and the other configurations are cancelled.
+    A configuration that fails is skipped, the race fails only when all the configurations fail.
+    """
+
+    def __init__(self, problem: Problem, configurations: Optional[List[Dict[str, Any]]] = None):
+        """
+        Inits the solver.
+        :param problem: the problem
+        :param configurations: the parameters of the backtrack solvers, defaults to DEFAULT_CONFIGURATIONS
+        """
+        super().__init__(problem)
+        self.configurations = configurations if configurations is not None else DEFAULT_CONFIGURATIONS
+        self.configurations_statistics = [np.zeros(STATS_MAX, dtype=np.int64) for _ in self.configurations]
+        self.winner = -1
+
+    def solve(self) -> Iterator[List[int]]:
+        """
+        Returns an iterator over the solutions found by the fastest configuration.
+        :return: an iterator
+        """
+        yield from self.race("find_all")
+
+    def solve_one(self) -> Optional[List[int]]:
+        """
+        Find at most one solution.
+        :return: the solution if it exists or None
+        """
+        return self.race("solve_one")
+
+    def minimize(self, var_idx: int) -> Optional[List[int]]:
+        return self.race("minimize", var_idx)
+
+    def maximize(self, var_idx: int) -> Optional[List[int]]:
+        return self.race("maximize", var_idx)
+
+    def race(self, method: str, *args: Any) -> Any:
+        """
+        Calls a method of a backtrack solver for each configuration, in separate processes,
+        and returns the result of the first process to complete.
+        Since each configuration explores the whole search space, any completed optimization is optimal.
+        :param method: the name of the method of the backtrack solver
+        :param args: the arguments of the method
+        :return: the result of the method
+        """
+        results: multiprocessing.Queue = multiprocessing.Queue()
+        # The statistics are shared so that they can be read even when a process is cancelled.
+        buffers = [RawArray("q", STATS_MAX) for _ in self.configurations]
+        processes = [
+            multiprocessing.Process(
+                target=run_configuration,
+                args=(self.problem, configuration, method, args, buffer, results, config_idx),
+            )
+            for config_idx, (configuration, buffer) in enumerate(zip(self.configurations, buffers))
+        ]
+        errors: Dict[int, str] = {}
+        self.winner = -1
+        try:
+            for process in processes:
+                process.start()
+            while self.winner < 0:
+                if len(errors) == len(processes):
+                    raise RuntimeError(f"all the configurations have failed: {errors}")
+                # The processes are checked before waiting so that the result of a terminated process is not missed.
+                exited_processes = [
+                    config_idx for config_idx, process in enumerate(processes) if process.exitcode is not None
+                ]
+                try:
+                    config_idx, result, error = results.get(timeout=PROCESS_CHECK_PERIOD)
+                except queue.Empty:
+                    for config_idx in exited_processes:
+                        errors.setdefault(config_idx, f"exit code {processes[config_idx].exitcode}")
+                    continue
+                if error is None:
+                    self.winner = config_idx
+                else:
+                    errors[config_idx] = error
+        finally:
+            for process in processes:
+                process.terminate()
+                process.join()
+        self.configurations_statistics = [np.frombuffer(buffer, dtype=np.int64).copy() for buffer in buffers]
+        np.copyto(self.statistics, self.configurations_statistics[self.winner])
+        return result
+
+    def get_configurations_statistics(self) -> List[Dict[str, Any]]:
+        """
+        Returns the statistics of the configurations of the last race.
+        :return: a list of dictionaries
+        """
+        return [
+            {
+                "CONFIGURATION": {key: getattr(value, "__name__", value) for key, value in configuration.items()},
+                "WINNER": config_idx == self.winner,
+                "STATISTICS": get_statistics(statistics),
+            }
+            for config_idx, (configuration, statistics) in enumerate(
+                zip(self.configurations, self.configurations_statistics)
+            )
+        ]
+
+
+def run_configuration(
+    problem: Problem,
+    configuration: Dict[str, Any],
+    method: str,
+    args: Any,
+    statistics_buffer: Any,
+    results: multiprocessing.Queue,
+    config_idx: int,
+) -> None:
+    """
+    Runs a configuration in a separate process.
+    :param problem: the problem
+    :param configuration: the parameters of the backtrack solver
+    :param method: the name of the method of the backtrack solver
+    :param args: the arguments of the method
+    :param statistics_buffer: the shared buffer of the statistics of the backtrack solver
+    :param results: the queue where the index of the configuration, the result and the error if any are put
+    :param config_idx: the index of the configuration
+    """
+    try:
+        solver = BacktrackSolver(problem, **configuration)
+        solver.statistics = np.frombuffer(statistics_buffer, dtype=np.int64)
+        results.put((config_idx, getattr(solver, method)(*args), None))
+    except Exception as exception:
+        results.put((config_idx, None, repr(exception)))
@@ -0,0 +1,185 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import sys
+from typing import Callable, Iterator, List, Optional
+
+from numpy.typing import NDArray
+
+from nucs.constants import SEARCH_COMPLETE
+from nucs.problems.problem import Problem
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.consistency_algorithms import bound_consistency_algorithm
+from nucs.solvers.heuristics import (
+    min_value_dom_heuristic,
+    random_smallest_domain_var_heuristic,
+    seed_random_heuristics,
+)
+from nucs.statistics import STATS_SOLVER_BACKTRACK_NB
+
+
+def luby(i: int) -> int:
+    """
+    Returns the i-th term of the Luby sequence: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+    :param i: the index of the term, starting from 1
+    :return: an int
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    if (1 << k) - 1 == i:
+        return 1 << (k - 1)
+    return luby(i - (1 << (k - 1)) + 1)
+
+
+def luby_cutoffs(scale: int = 100) -> Iterator[int]:
+    """
+    Returns the cutoffs of the Luby restart strategy.
+    :param scale: the unit of the cutoffs
+    :return: an infinite iterator
+    """
+    i = 1
+    while True:
+        yield scale * luby(i)
+        i += 1
+
+
+def geometric_cutoffs(scale: int = 100, factor: float = 1.5) -> Iterator[int]:
+    """
+    Returns the cutoffs of the geometric restart strategy.
+    :param scale: the first cutoff
+    :param factor: the ratio between two consecutive cutoffs
+    :return: an infinite iterator
+    """
+    cutoff = float(scale)
+    while True:
+        yield int(cutoff)
+        cutoff *= factor
+
+
+class RestartSolver(BacktrackSolver):
+    """
+    A backtrack solver that restarts the search from the root when a number of backtracks is reached.
+    The cutoffs grow so that the search remains complete,
+    combined with random heuristics, the restarts avoid the heavy tails of the runtime distributions.
+    """
+
+    def __init__(
+        self,
+        problem: Problem,
+        cutoffs: Optional[Iterator[int]] = None,
+        seed: int = 0,
+        consistency_algorithm: Callable = bound_consistency_algorithm,
+        var_heuristic: Callable = random_smallest_domain_var_heuristic,
+        dom_heuristic: Callable = min_value_dom_heuristic,
+        trailing: bool = False,
+        time_limit: Optional[float] = None,
+        choice_limit: Optional[int] = None,
+        backtrack_limit: Optional[int] = None,
+    ):
+        """
+        Inits the solver.
+        :param problem: the problem
+        :param cutoffs: the numbers of backtracks after which the search is restarted, defaults to luby_cutoffs()
+        :param seed: the seed of the random number generator used by the random heuristics
+        :param consistency_algorithm: a consistency algorithm (usually bound consistency)
+        :param var_heuristic: a heuristic for selecting a variable/domain
+        :param dom_heuristic: a heuristic for reducing a domain
+        :param trailing: if true, the choice points record the changes of the domains on a trail
+        :param time_limit: the optional duration in seconds after which the search is interrupted
+        :param choice_limit: the optional number of choices after which the search is interrupted
+        :param backtrack_limit: the optional number of backtracks after which the search is interrupted
+        """
+        super().__init__(
+            problem,
+            consistency_algorithm,
+            var_heuristic,
+            dom_heuristic,
+            trailing,
+            time_limit=time_limit,
+            choice_limit=choice_limit,
+            backtrack_limit=backtrack_limit,
+        )
+        self.cutoffs = cutoffs if cutoffs is not None else luby_cutoffs()
+        self.seed = seed
+        self.cutoff = -1  # the search has not started yet
+        # The statistics of each restart, the last ones are the statistics of the current restart.
+        self.restarts_statistics: List[NDArray] = []
+        self.restart_statistics = self.statistics.copy()
+
+    def search(self) -> Iterator[None]:
+        """
+        Returns an iterator that stops at each solution.
+        Once a solution has been found, the search is not restarted anymore since it would find it again.
+        :return: an iterator
+        """
+        while self.find_solution():
+            self.cutoff = sys.maxsize
+            yield
+            if not self.backtrack():
+                break
+
+    def is_jit_search_possible(self) -> bool:
+        """
+        Returns false since the JIT compiled search does not restart.
+        :return: a boolean
+        """
+        return False
+
+    def find_solution(self) -> bool:
+        """
+        Searches for the next solution, the search is restarted each time the cutoff is reached.
+        :return: true iff a solution has been found
+        """
+        if self.cutoff < 0:
+            seed_random_heuristics(self.seed)
+            self.start_restart()
+        found = super().find_solution()
+        self.update_restart_statistics()
+        return found
+
+    def backtrack(self) -> bool:
+        """
+        Backtracks, or restarts the search if the cutoff is reached.
+        :return: true iff it is possible to backtrack
+        """
+        if self.statistics[STATS_SOLVER_BACKTRACK_NB] < self.cutoff or self.check_limits():
+            return super().backtrack()
+        return self.restart()
+
+    def restart(self) -> bool:
+        """
+        Restarts the search from the root with the next cutoff.
+        When optimizing, the objective bound is kept.
+        :return: false iff the objective bound cannot be satisfied
+        """
+        self.update_restart_statistics()
+        self.reset()
+        if self.objective is not None and not self.apply_objective():
+            self.status = SEARCH_COMPLETE
+            return False
+        self.start_restart()
+        return True
+
+    def start_restart(self) -> None:
+        """
+        Starts a new restart with the next cutoff.
+        """
+        self.cutoff = self.statistics[STATS_SOLVER_BACKTRACK_NB] + next(self.cutoffs)
+        self.restart_statistics = self.statistics.copy()
+        self.restarts_statistics.append(self.statistics - self.restart_statistics)
+
+    def update_restart_statistics(self) -> None:
+        """
+        Updates the statistics of the current restart.
+        """
+        self.restarts_statistics[-1] = self.statistics - self.restart_statistics
@@ -0,0 +1,121 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from types import TracebackType
+from typing import List, Optional, Sequence, Type, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class SolutionSink:
+    """
+    A function to apply to the solutions that writes them to a .npy file,
+    the memory used does not depend on the number of solutions.
+    The solutions are first stored in a batch, then the full batches are flushed to the file through a memory map.
+    The file grows as needed, it can be loaded with np.load once the sink has been closed.
+    """
+
+    def __init__(
+        self, path: str, variable_nb: int, variables: Optional[List[int]] = None, batch_size: int = 4096
+    ) -> None:
+        """
+        Inits the sink.
+        :param path: the path of the .npy file
+        :param variable_nb: the number of variables of the problem
+        :param variables: the optional variables to project the solutions on, defaults to all variables
+        :param batch_size: the number of solutions of a batch
+        """
+        self.path = path
+        self.variables = np.array(variables if variables is not None else range(variable_nb), dtype=np.int32)
+        self.batch = np.empty((batch_size, len(self.variables)), dtype=np.int32)
+        self.batch_top = 0
+        self.solution_nb = 0  # the number of solutions in the file
+        self.capacity = 0  # the number of solutions the file can hold
+        self.memmap: Optional[np.memmap] = None
+        self.header_size = self.write_header("wb")
+
+    def __call__(self, solution: Union[Sequence[int], NDArray]) -> None:
+        """
+        Adds a solution.
+        :param solution: the values of the variables
+        """
+        self.batch[self.batch_top] = np.asarray(solution)[self.variables]
+        self.batch_top += 1
+        if self.batch_top == len(self.batch):
+            self.flush()
+
+    def __enter__(self) -> "SolutionSink":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def write_header(self, mode: str = "r+b") -> int:
+        """
+        Writes the header of the .npy file for the solutions in the file.
+        The header of a 2-D array does not depend on the length of its first axis.
+        :param mode: the mode used to open the file
+        :return: the size of the header in bytes
+        """
+        with open(self.path, mode) as file:
+            np.lib.format.write_array_header_1_0(
+                file,
+                {
+                    "descr": np.lib.format.dtype_to_descr(self.batch.dtype),
+                    "fortran_order": False,
+                    "shape": (self.solution_nb, len(self.variables)),
+                },
+            )
+            return file.tell()
+
+    def flush(self) -> None:
+        """
+        Writes the solutions of the batch to the file, the file is grown by doubling its capacity if needed.
+        """
+        if self.batch_top == 0:
+            return
+        solution_nb = self.solution_nb + self.batch_top
+        if solution_nb > self.capacity:
+            self.capacity = max(solution_nb, 2 * self.capacity)
+            self.memmap = None
+            with open(self.path, "r+b") as file:
+                file.truncate(self.header_size + self.capacity * self.batch.itemsize * len(self.variables))
+            if len(self.variables) > 0:
+                self.memmap = np.memmap(
+                    self.path,
+                    dtype=self.batch.dtype,
+                    mode="r+",
+                    offset=self.header_size,
+                    shape=(self.capacity, len(self.variables)),
+                )
+        if self.memmap is not None:
+            self.memmap[self.solution_nb : solution_nb] = self.batch[: self.batch_top]
+        self.solution_nb = solution_nb
+        self.batch_top = 0
+
+    def close(self) -> None:
+        """
+        Flushes the batch, then truncates the file to the solutions and updates its header.
+        """
+        self.flush()
+        if self.memmap is not None:
+            self.memmap.flush()
+            self.memmap = None
+        with open(self.path, "r+b") as file:
+            file.truncate(self.header_size + self.solution_nb * self.batch.itemsize * len(self.variables))
+        self.write_header()
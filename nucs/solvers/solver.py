@@ -13,7 +13,7 @@
 from typing import Callable, Iterator, List, Optional
 
 from nucs.problems.problem import Problem
-from nucs.statistics import init_statistics
+from nucs.statistics import STATS_SOLVER_SOLUTION_NB, init_statistics
 
 
 class Solver:
@@ -44,6 +44,15 @@ class Solver:
             if func is not None:
                 func(solution)
 
+    def count_all(self) -> int:
+        """
+        Counts all solutions.
+        :return: the number of solutions
+        """
+        solution_nb = self.statistics[STATS_SOLVER_SOLUTION_NB]
+        self.solve_all()
+        return int(self.statistics[STATS_SOLVER_SOLUTION_NB] - solution_nb)
+
     def find_all(self) -> List[List[int]]:
         """
         Finds all solutions.
@@ -10,11 +10,16 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-from typing import Dict
+import time
+from typing import Any, Dict, Optional
 
 import numpy as np
+from numba import njit, objmode  # type: ignore
 from numpy.typing import NDArray
 
+from nucs.constants import PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.propagators.propagators import COMPUTE_DOMAINS_FCTS
+
 
 def init_statistics() -> NDArray:
     """
@@ -24,13 +29,31 @@ def init_statistics() -> NDArray:
     return np.array([0] * STATS_MAX, dtype=np.int64)
 
 
-def get_statistics(stats: NDArray) -> Dict[str, int]:
+def merge_statistics(stats: NDArray, other_stats: NDArray) -> None:
+    """
+    Merges some statistics into other statistics, the counters are added and the depths are maxed.
+    :param stats: the Numpy array of statistics to be updated
+    :param other_stats: the Numpy array of statistics to be merged
+    """
+    depth = max(stats[STATS_SOLVER_CHOICE_DEPTH], other_stats[STATS_SOLVER_CHOICE_DEPTH])
+    stats += other_stats
+    stats[STATS_SOLVER_CHOICE_DEPTH] = depth
+
+
+def get_statistics(
+    stats: NDArray,
+    algorithms_profile: Optional[NDArray] = None,
+    propagators_profile: Optional[NDArray] = None,
+) -> Dict[str, Any]:
     """
     Returns the statistics as a dictionary.
+    When profiling is enabled, the profiles are returned as nested dictionaries.
     :param stats: a Numpy array of statistics
+    :param algorithms_profile: the optional profile of the algorithms
+    :param propagators_profile: the optional profile of the propagators
     :return: a dictionary
     """
-    return {
+    statistics: Dict[str, Any] = {
         "OPTIMIZER_SOLUTION_NB": int(stats[STATS_OPTIMIZER_SOLUTION_NB]),
         "PROBLEM_FILTER_NB": int(stats[STATS_PROBLEM_FILTER_NB]),
         "PROBLEM_PROPAGATOR_NB": int(stats[STATS_PROBLEM_PROPAGATOR_NB]),
@@ -44,6 +67,19 @@ def get_statistics(stats: NDArray) -> Dict[str, int]:
         "SOLVER_CHOICE_DEPTH": int(stats[STATS_SOLVER_CHOICE_DEPTH]),
         "SOLVER_SOLUTION_NB": int(stats[STATS_SOLVER_SOLUTION_NB]),
     }
+    if algorithms_profile is not None:
+        statistics["ALGORITHMS_PROFILE"] = {
+            get_algorithm_name(algorithm): get_profile(algorithms_profile[algorithm])
+            for algorithm in range(len(algorithms_profile))
+            if algorithms_profile[algorithm, PROFILE_CALL_NB] > 0
+        }
+    if propagators_profile is not None:
+        statistics["PROPAGATORS_PROFILE"] = {
+            prop_idx: get_profile(propagators_profile[prop_idx])
+            for prop_idx in range(len(propagators_profile))
+            if propagators_profile[prop_idx, PROFILE_CALL_NB] > 0
+        }
+    return statistics
 
 
 STATS_MAX = 12
@@ -61,3 +97,93 @@ STATS_MAX = 12
     STATS_SOLVER_CHOICE_DEPTH,
     STATS_SOLVER_SOLUTION_NB,
 ) = tuple(range(STATS_MAX))
+
+
+# The profiling mode records, per algorithm and optionally per propagator, the following counters.
+PROFILE_MAX = 5
+(
+    PROFILE_CALL_NB,
+    PROFILE_NO_CHANGE_NB,
+    PROFILE_INCONSISTENCY_NB,
+    PROFILE_ENTAILMENT_NB,
+    PROFILE_TICKS,  # the time spent in the propagator, in nanoseconds
+) = tuple(range(PROFILE_MAX))
+
+
+def init_profile(n: int) -> NDArray:
+    """
+    Inits a Numpy array for storing the profile of n algorithms or propagators.
+    :param n: the number of algorithms or propagators
+    :return: a Numpy array
+    """
+    return np.zeros((n, PROFILE_MAX), dtype=np.int64)
+
+
+def get_algorithm_name(algorithm: int) -> str:
+    """
+    Returns the name of an algorithm, for example ALLDIFFERENT for ALG_ALLDIFFERENT.
+    :param algorithm: the algorithm
+    :return: a string
+    """
+    return COMPUTE_DOMAINS_FCTS[algorithm].__name__.removeprefix("compute_domains_").upper()
+
+
+def get_profile(profile: NDArray) -> Dict[str, Any]:
+    """
+    Returns the profile of an algorithm or of a propagator as a dictionary.
+    :param profile: a Numpy array of counters
+    :return: a dictionary
+    """
+    return {
+        "CALL_NB": int(profile[PROFILE_CALL_NB]),
+        "NO_CHANGE_NB": int(profile[PROFILE_NO_CHANGE_NB]),
+        "INCONSISTENCY_NB": int(profile[PROFILE_INCONSISTENCY_NB]),
+        "ENTAILMENT_NB": int(profile[PROFILE_ENTAILMENT_NB]),
+        "TIME": float(profile[PROFILE_TICKS] * TICK_DURATION),
+    }
+
+
+# The duration of a tick in seconds.
+TICK_DURATION = 1e-9
+
+
+@njit(cache=True)
+def read_ticks() -> int:
+    """
+    Reads the monotonic clock, in nanoseconds, from Python or from compiled code.
+    The clock is read in object mode, this is portable but costs about a microsecond.
+    :return: an int
+    """
+    with objmode(ticks="int64"):
+        ticks = time.perf_counter_ns()
+    return ticks
+
+
+def get_deadline(duration: float) -> int:
+    """
+    Returns the value that the clock will reach after a given duration.
+    :param duration: the duration in seconds
+    :return: an int
+    """
+    return read_ticks() + int(duration / TICK_DURATION)
+
+
+@njit(cache=True)
+def update_profile(profile: NDArray, idx: int, status: int, changes: bool, ticks: int) -> None:
+    """
+    Updates the profile of an algorithm or of a propagator after a call to a propagator.
+    :param profile: the profile
+    :param idx: the index of the algorithm or of the propagator
+    :param status: the status returned by the propagator
+    :param changes: true iff the propagator has changed some domains
+    :param ticks: the number of ticks spent in the propagator
+    """
+    profile[idx, PROFILE_CALL_NB] += 1
+    profile[idx, PROFILE_TICKS] += ticks
+    if status == PROP_INCONSISTENCY:
+        profile[idx, PROFILE_INCONSISTENCY_NB] += 1
+        return
+    if status == PROP_ENTAILMENT:
+        profile[idx, PROFILE_ENTAILMENT_NB] += 1
+    if not changes:
+        profile[idx, PROFILE_NO_CHANGE_NB] += 1
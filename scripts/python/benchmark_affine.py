@@ -0,0 +1,101 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+from rich import print
+
+from nucs.examples.knapsack.knapsack_problem import KnapsackProblem
+from nucs.examples.magic_sequence.magic_sequence_problem import MagicSequenceProblem
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.heuristics import (
+    first_not_instantiated_var_heuristic,
+    last_not_instantiated_var_heuristic,
+    max_value_dom_heuristic,
+    min_value_dom_heuristic,
+)
+from nucs.statistics import STATS_PROPAGATOR_FILTER_NB, STATS_SOLVER_CHOICE_NB, STATS_SOLVER_SOLUTION_NB
+
+# Measures the affine propagators on long sums: the redundant sums of the magic sequence problem
+# and the weight and volume sums of a random knapsack problem whose search tree is explored up to a choice limit.
+# The searches are JIT compiled and each one is repeated, the best duration is reported.
+# Run with the following command (the first run also measures the compilation):
+# NUMBA_CACHE_DIR=.numba/cache PYTHONPATH=. python scripts/python/benchmark_affine.py
+
+
+def benchmark(name: str, build_solver: Callable[[], BacktrackSolver], repeat: int) -> None:
+    durations = []
+    for _ in range(repeat):
+        solver = build_solver()
+        start = time.perf_counter()
+        solver.solve_all()
+        durations.append(time.perf_counter() - start)
+    print(
+        {
+            "PROBLEM": name,
+            "DURATION": round(min(durations), 3),
+            "SOLUTION_NB": int(solver.statistics[STATS_SOLVER_SOLUTION_NB]),
+            "CHOICE_NB": int(solver.statistics[STATS_SOLVER_CHOICE_NB]),
+            "PROPAGATOR_FILTER_NB": int(solver.statistics[STATS_PROPAGATOR_FILTER_NB]),
+        }
+    )
+
+
+def build_magic_sequence_solver(n: int, trailing: bool) -> BacktrackSolver:
+    problem = MagicSequenceProblem(n)
+    solver = BacktrackSolver(
+        problem,
+        var_heuristic=last_not_instantiated_var_heuristic,
+        dom_heuristic=min_value_dom_heuristic,
+        trailing=trailing,
+    )
+    solver.init_problem()
+    return solver
+
+
+def build_knapsack_solver(item_nb: int, choice_limit: int, trailing: bool) -> BacktrackSolver:
+    rng = np.random.default_rng(0)
+    weights = rng.integers(10, 100, item_nb).tolist()
+    volumes = rng.integers(10, 100, item_nb).tolist()
+    problem = KnapsackProblem(weights, volumes, sum(volumes) // 4)
+    solver = BacktrackSolver(
+        problem,
+        var_heuristic=first_not_instantiated_var_heuristic,
+        dom_heuristic=max_value_dom_heuristic,
+        trailing=trailing,
+        choice_limit=choice_limit,
+    )
+    solver.init_problem()
+    return solver
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200)
+    parser.add_argument("--item_nb", type=int, default=500)
+    parser.add_argument("--choice_limit", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for trailing in [False, True]:
+        benchmark(
+            f"MagicSequence(n={args.n}, trailing={trailing})",
+            lambda: build_magic_sequence_solver(args.n, trailing),
+            args.repeat,
+        )
+        benchmark(
+            f"Knapsack(item_nb={args.item_nb}, trailing={trailing})",
+            lambda: build_knapsack_solver(args.item_nb, args.choice_limit, trailing),
+            args.repeat,
+        )
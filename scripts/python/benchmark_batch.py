@@ -0,0 +1,105 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import argparse
+import multiprocessing
+import time
+from typing import List
+
+import numpy as np
+from numpy.typing import NDArray
+from rich import print
+
+from nucs.examples.sudoku.sudoku_problem import SudokuProblem, sudoku_shr_domains
+from nucs.numpy import new_instances_by_values
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.batch_solver import BatchSolver
+from nucs.solvers.heuristics import smallest_domain_var_heuristic
+
+# Measures the number of sudokus solved per second, one problem and one solver per instance or with a batch solver.
+# The instances are obtained by permuting the digits of a few sudokus.
+# Run with the following command (the first run also measures the compilation):
+# NUMBA_CACHE_DIR=.numba/cache PYTHONPATH=. python scripts/python/benchmark_batch.py
+
+SUDOKUS = [
+    [
+        [0, 0, 0, 0, 3, 0, 0, 0, 0],
+        [2, 8, 9, 0, 0, 0, 0, 0, 0],
+        [0, 0, 5, 7, 0, 0, 0, 9, 0],
+        [0, 0, 0, 0, 0, 0, 8, 0, 6],
+        [0, 0, 0, 3, 0, 0, 1, 0, 0],
+        [7, 1, 0, 0, 0, 6, 0, 0, 2],
+        [0, 6, 3, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 4, 0, 2, 0, 0],
+        [0, 0, 1, 0, 5, 0, 6, 0, 0],
+    ],
+    [
+        [6, 0, 0, 0, 1, 0, 0, 8, 0],
+        [5, 1, 7, 4, 0, 0, 0, 0, 0],
+        [0, 0, 3, 0, 0, 0, 0, 4, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 1],
+        [0, 0, 0, 5, 0, 0, 3, 0, 0],
+        [1, 6, 0, 0, 0, 9, 0, 5, 2],
+        [2, 5, 9, 6, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 7, 0, 0, 0, 0],
+        [0, 0, 0, 0, 5, 0, 4, 0, 0],
+    ],
+]
+
+
+def generate_givens(instance_nb: int, seed: int) -> List[List[List[int]]]:
+    rng = np.random.default_rng(seed)
+    givens_list = []
+    for instance_idx in range(instance_nb):
+        digits = [0, *rng.permutation(range(1, 10)).tolist()]
+        givens_list.append([[digits[given] for given in line] for line in SUDOKUS[instance_idx % len(SUDOKUS)]])
+    return givens_list
+
+
+def report(name: str, instance_nb: int, duration: float) -> None:
+    print(
+        {
+            "SOLVER": name,
+            "INSTANCE_NB": instance_nb,
+            "DURATION": round(duration, 3),
+            "INSTANCES_PER_SEC": int(instance_nb / duration),
+        }
+    )
+
+
+def benchmark_solvers(givens_list: List[List[List[int]]]) -> None:
+    start = time.perf_counter()
+    for givens in givens_list:
+        BacktrackSolver(SudokuProblem(givens), var_heuristic=smallest_domain_var_heuristic).solve_one()
+    report("BacktrackSolver", len(givens_list), time.perf_counter() - start)
+
+
+def benchmark_batch_solver(instances: NDArray, processes: int) -> None:
+    start = time.perf_counter()
+    solver = BatchSolver(SudokuProblem(SUDOKUS[0]), smallest_domain_var_heuristic, processes=processes)
+    _, solved = solver.solve_batch(instances)
+    assert solved.all()
+    report(f"BatchSolver(processes={processes})", len(instances), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instance_nb", type=int, default=2000)
+    parser.add_argument("--solver_instance_nb", type=int, default=200)
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+    givens_list = generate_givens(args.instance_nb, 0)
+    instances = new_instances_by_values([sudoku_shr_domains(givens) for givens in givens_list])
+    benchmark_solvers(givens_list[: args.solver_instance_nb])
+    benchmark_batch_solver(instances, 1)
+    if args.processes > 1:
+        benchmark_batch_solver(instances, args.processes)
@@ -0,0 +1,61 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import argparse
+import time
+
+from rich import print
+
+from nucs.examples.bibd.bibd_problem import BIBDProblem
+from nucs.examples.quasigroup.quasigroup_problem import Quasigroup5Problem
+from nucs.problems.problem import Problem
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.heuristics import max_value_dom_heuristic, min_value_dom_heuristic, smallest_domain_var_heuristic
+from nucs.statistics import STATS_PROBLEM_PROPAGATOR_NB, STATS_PROPAGATOR_FILTER_NB
+
+# Measures the number of propagation steps per second on large BIBD and quasigroup instances.
+# Run with the following command (the first run also measures the compilation):
+# NUMBA_CACHE_DIR=.numba/cache PYTHONPATH=. python scripts/python/benchmark_propagation.py
+
+
+def benchmark(name: str, problem: Problem, solver: BacktrackSolver) -> None:
+    start = time.perf_counter()
+    solver.solve_one()
+    duration = time.perf_counter() - start
+    filter_nb = solver.statistics[STATS_PROPAGATOR_FILTER_NB]
+    print(
+        {
+            "PROBLEM": name,
+            "PROPAGATOR_NB": int(solver.statistics[STATS_PROBLEM_PROPAGATOR_NB]),
+            "PROPAGATOR_FILTER_NB": int(filter_nb),
+            "DURATION": round(duration, 3),
+            "PROPAGATOR_FILTER_PER_SEC": int(filter_nb / duration),
+        }
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quasigroup_n", type=int, default=10)
+    args = parser.parse_args()
+    bibd_problem = BIBDProblem(8, 14, 7, 4, 3)
+    benchmark("bibd-8-14-7-4-3", bibd_problem, BacktrackSolver(bibd_problem, dom_heuristic=max_value_dom_heuristic))
+    bibd_problem = BIBDProblem(11, 55, 15, 3, 3)
+    benchmark("bibd-11-55-15-3-3", bibd_problem, BacktrackSolver(bibd_problem, dom_heuristic=max_value_dom_heuristic))
+    quasigroup_problem = Quasigroup5Problem(args.quasigroup_n)
+    benchmark(
+        f"quasigroup5-{args.quasigroup_n}",
+        quasigroup_problem,
+        BacktrackSolver(
+            quasigroup_problem, var_heuristic=smallest_domain_var_heuristic, dom_heuristic=min_value_dom_heuristic
+        ),
+    )
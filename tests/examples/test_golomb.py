@@ -36,3 +36,11 @@ class TestGolomb:
         solution = solver.minimize(problem.length_idx)
         assert solution
         assert solution[problem.length_idx] == solution_nb
+
+    @pytest.mark.parametrize("mark_nb,solution_nb", [(6, 17), (8, 34)])
+    def test_golomb_trailing(self, mark_nb: int, solution_nb: int) -> None:
+        problem = GolombProblem(mark_nb)
+        solver = BacktrackSolver(problem, consistency_algorithm=golomb_consistency_algorithm, trailing=True)
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        assert solution[problem.length_idx] == solution_nb
@@ -10,8 +10,9 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
-from nucs.constants import MAX, MIN
+from nucs.constants import BITS_HIGH, BITS_LOW, END, HOLE, MAX, MIN, START
 from nucs.problems.problem import Problem, is_solved
+from nucs.propagators.propagators import ALG_AFFINE_LEQ, ALG_ALLDIFFERENT, ALG_COMPACT_TABLE, ALG_RELATION
 
 
 class TestProblem:
@@ -31,3 +32,77 @@ class TestProblem:
         problem = Problem([(2, 2), (2, 2), (6, 6)])
         problem.init_problem()
         assert is_solved(problem.shr_domains_arr)
+
+    def test_shr_domains_propagators(self) -> None:
+        problem = Problem([(0, 2), (0, 2), (0, 2)])
+        problem.add_propagator(([0, 1], ALG_AFFINE_LEQ, [1, -1, 0]))
+        problem.add_propagator(([0, 1, 2], ALG_ALLDIFFERENT, []))
+        problem.init_problem()
+        bounds = problem.shr_domains_propagators_bounds
+        triggered = [
+            [
+                problem.shr_domains_propagators[bounds[dom_idx, bound, START] : bounds[dom_idx, bound, END]].tolist()
+                for bound in [MIN, MAX]
+            ]
+            for dom_idx in range(3)
+        ]
+        assert triggered == [[[0, 1], [1]], [[1], [0, 1]], [[1], [1]]]
+
+    def test_shr_domains_adjacent_propagators(self) -> None:
+        problem = Problem([(0, 2), (0, 2), (0, 2)])
+        problem.add_propagator(([0, 1], ALG_AFFINE_LEQ, [1, -1, 0]))
+        problem.add_propagator(([1, 2], ALG_ALLDIFFERENT, []))
+        problem.init_problem()
+        bounds = problem.shr_domains_adjacent_propagators_bounds
+        adjacent = [
+            problem.shr_domains_adjacent_propagators[bounds[dom_idx, START] : bounds[dom_idx, END]].tolist()
+            for dom_idx in range(3)
+        ]
+        assert adjacent == [[0], [0, 1], [1]]
+        assert problem.propagators_weights.tolist() == [1, 1]
+
+    def test_state_bounds(self) -> None:
+        problem = Problem([(0, 2), (0, 2), (0, 2)])
+        problem.add_propagator(([0, 1], ALG_ALLDIFFERENT, []))
+        problem.add_propagator(([1, 2], ALG_COMPACT_TABLE, [0, 1, 1, 2]))
+        problem.init_problem()
+        ct_idx = problem.algorithms.tolist().index(ALG_COMPACT_TABLE)
+        assert problem.state_bounds[1 - ct_idx, START] == problem.state_bounds[1 - ct_idx, END]
+        assert problem.state_bounds[ct_idx, END] == problem.param_bounds[ct_idx, END]
+        assert problem.state_bounds[ct_idx, END] - problem.state_bounds[ct_idx, START] == 5
+        assert problem.stateful_propagators.tolist() == [ct_idx]
+        assert len(problem.initial_states) == 5
+
+    def test_reset_states(self) -> None:
+        problem = Problem([(0, 2), (0, 2)])
+        problem.add_propagator(([0, 1], ALG_COMPACT_TABLE, [0, 1, 1, 2, 2, 0]))
+        problem.init_problem()
+        props_parameters = problem.props_parameters.copy()
+        problem.props_parameters[problem.state_bounds[0, START] :] = 0
+        problem.reset()
+        assert problem.props_parameters.tolist() == props_parameters.tolist()
+
+    def test_shr_domains_propagators_holes(self) -> None:
+        problem = Problem([(0, 2), (0, 2)])
+        problem.add_propagator(([0, 1], ALG_AFFINE_LEQ, [1, -1, 0]))
+        problem.add_propagator(([0, 1], ALG_RELATION, [0, 1, 2, 2]))
+        problem.init_problem()
+        bounds = problem.shr_domains_propagators_bounds
+        relation_idx = problem.algorithms.tolist().index(ALG_RELATION)
+        for dom_idx in range(2):
+            watchers = problem.shr_domains_propagators[bounds[dom_idx, HOLE, START] : bounds[dom_idx, HOLE, END]]
+            assert watchers.tolist() == [relation_idx]
+
+    def test_bitsets(self) -> None:
+        problem = Problem([(0, 3), (0, 100), 5])
+        problem.bitsets = True
+        problem.init_problem()
+        assert problem.shr_domains_arr.shape == (3, 4)
+        assert problem.shr_domains_arr[:, BITS_LOW].tolist() == [-1, -1, -1]
+        assert problem.shr_domains_arr[:, BITS_HIGH].tolist() == [-1, -1, -1]
+        assert problem.shr_domains_bases is not None
+        assert problem.shr_domains_bases.tolist() == [0, -64, 5]
+        assert problem.shr_domains_stamps.shape == (3, 4)
+        problem.shr_domains_arr[0, BITS_LOW] = 0
+        problem.reset()
+        assert problem.shr_domains_arr[0, BITS_LOW] == -1
@@ -0,0 +1,42 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import numpy as np
+
+from nucs.numpy import new_bounds, new_not_entailed_propagators, new_queue, new_queue_tops
+from nucs.problems.propagator_queue import get_buckets, init_queue, pop_propagator, trigger_propagator
+
+
+class TestPropagatorQueue:
+    def test_get_buckets(self) -> None:
+        assert get_buckets([0, 0, 3, 5, 40, 45, 1000]) == [0, 0, 1, 1, 2, 2, 3]
+
+    def test_pop_propagator(self) -> None:
+        props_buckets = np.array([0, 0, 1, 1], dtype=np.int32)
+        queue = new_queue(4)
+        queue_bounds = new_bounds(2)
+        queue_bounds[:] = [[0, 2], [2, 4]]
+        queue_tops = new_queue_tops(2)
+        triggered_propagators = np.array([False, True, True, True])
+        not_entailed_propagators = new_not_entailed_propagators(4)
+        not_entailed_propagators[2] = False
+        init_queue(queue, queue_bounds, queue_tops, props_buckets, triggered_propagators, not_entailed_propagators)
+        assert pop_propagator(queue, queue_bounds, queue_tops, triggered_propagators, not_entailed_propagators, -1) == 1
+        trigger_propagator(queue, queue_bounds, queue_tops, props_buckets, triggered_propagators, 0)
+        trigger_propagator(queue, queue_bounds, queue_tops, props_buckets, triggered_propagators, 1)
+        trigger_propagator(queue, queue_bounds, queue_tops, props_buckets, triggered_propagators, 1)
+        assert pop_propagator(queue, queue_bounds, queue_tops, triggered_propagators, not_entailed_propagators, 1) == 0
+        assert pop_propagator(queue, queue_bounds, queue_tops, triggered_propagators, not_entailed_propagators, 0) == 1
+        assert pop_propagator(queue, queue_bounds, queue_tops, triggered_propagators, not_entailed_propagators, 1) == 3
+        trigger_propagator(queue, queue_bounds, queue_tops, props_buckets, triggered_propagators, 3)
+        assert pop_propagator(queue, queue_bounds, queue_tops, triggered_propagators, not_entailed_propagators, 3) == -1
+        assert triggered_propagators.tolist() == [False, False, True, True]
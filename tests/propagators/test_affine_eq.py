@@ -10,11 +10,23 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
+from typing import List
+
 import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_INCONSISTENCY
+from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values, new_workspace
+from nucs.propagators.affine_eq_propagator import (
+    compute_domains_affine_eq,
+    get_triggers_affine_eq,
+    init_parameters_affine_eq,
+)
+
 
-from nucs.constants import PROP_CONSISTENCY
-from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values
-from nucs.propagators.affine_eq_propagator import compute_domains_affine_eq, get_triggers_affine_eq
+def init_parameters(values: List[int]) -> NDArray:
+    return init_parameters_affine_eq(len(values) - 1, new_parameters_by_values(values))[0]
 
 
 class TestAffineEQ:
@@ -24,35 +36,68 @@ class TestAffineEQ:
 
     def test_compute_domains_1(self) -> None:
         domains = new_shr_domains_by_values([(1, 10), (1, 10)])
-        data = new_parameters_by_values([1, 1, 8])
-        assert compute_domains_affine_eq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([1, 1, 8])
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[1, 7], [1, 7]]))
 
     def test_compute_domains_2(self) -> None:
         domains = new_shr_domains_by_values([(5, 10), (5, 10), (5, 10)])
-        data = new_parameters_by_values([1, 1, 1, 27])
-        assert compute_domains_affine_eq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([1, 1, 1, 27])
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[7, 10], [7, 10], [7, 10]]))
 
     def test_compute_domains_3(self) -> None:
         domains = new_shr_domains_by_values([(-2, -1), (2, 3)])
-        data = new_parameters_by_values([1, 1, 0])
-        assert compute_domains_affine_eq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([1, 1, 0])
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[-2, -2], [2, 2]]))
 
     def test_compute_domains_4(self) -> None:
         domains = new_shr_domains_by_values([(1, 10), (1, 10)])
-        data = new_parameters_by_values([1, -3, 0])
-        assert compute_domains_affine_eq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([1, -3, 0])
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[3, 10], [1, 3]]))
 
     def test_compute_domains_5(self) -> None:
         domains = new_shr_domains_by_values([(-14, 11), (-4, 5)])
-        data = new_parameters_by_values([1, 3, 0])
-        assert compute_domains_affine_eq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([1, 3, 0])
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[-14, 11], [-3, 4]]))
 
     def test_compute_domains_6(self) -> None:
         domains = new_shr_domains_by_values([4, 3, 5, 9, 1, 8, 6, 2, 7, 0])
-        data = new_parameters_by_values([200, -1000, 100002, 9900, 100000, 20, 1000, 0, -99010, -1, 0])
-        assert compute_domains_affine_eq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([200, -1000, 100002, 9900, 100000, 20, 1000, 0, -99010, -1, 0])
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
+
+    def test_compute_domains_large_sums(self) -> None:
+        domains = new_shr_domains_by_values([(0, 1000000), (0, 1000000)])
+        data = init_parameters([100000, 100000, 300000])
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
+        assert np.all(domains == np.array([[0, 3], [0, 3]]))
+        domains[1, MAX] = 1
+        assert compute_domains_affine_eq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
+        assert np.all(domains == np.array([[2, 3], [0, 1]]))
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_compute_domains_incremental(self, seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        n = 10
+        values = [*rng.integers(-10, 10, n).tolist(), int(rng.integers(-50, 50))]
+        data = init_parameters(values)
+        domains = new_shr_domains_by_values([(-10, 10)] * n)
+        for _ in range(50):
+            # The domains are reduced or restored, as they are along the search.
+            if rng.integers(0, 4) == 0:
+                domains = new_shr_domains_by_values([(-10, 10)] * n)
+            else:
+                var_idx = int(rng.integers(0, n))
+                if domains[var_idx, MIN] < domains[var_idx, MAX]:
+                    domains[var_idx, int(rng.integers(0, 2))] += 1 if rng.integers(0, 2) == 0 else -1
+            fresh_domains = domains.copy()
+            status = compute_domains_affine_eq(domains, data, new_workspace(256))
+            fresh_status = compute_domains_affine_eq(fresh_domains, init_parameters(values), new_workspace(256))
+            assert status == fresh_status
+            if status == PROP_INCONSISTENCY:
+                domains = new_shr_domains_by_values([(-10, 10)] * n)
+            else:
+                assert domains.tolist() == fresh_domains.tolist()
@@ -10,13 +10,21 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
+from typing import List
+
 import numpy as np
+from numpy.typing import NDArray
 
 from nucs.constants import PROP_CONSISTENCY, PROP_ENTAILMENT
-from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values
+from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values, new_workspace
+from nucs.propagators.affine_eq_propagator import init_parameters_affine_eq
 from nucs.propagators.affine_geq_propagator import compute_domains_affine_geq, get_triggers_affine_geq
 
 
+def init_parameters(values: List[int]) -> NDArray:
+    return init_parameters_affine_eq(len(values) - 1, new_parameters_by_values(values))[0]
+
+
 class TestAffineGEQ:
     def test_get_triggers(self) -> None:
         data = new_parameters_by_values([1, -1, 8])
@@ -24,18 +32,18 @@ class TestAffineGEQ:
 
     def test_compute_domains_1(self) -> None:
         domains = new_shr_domains_by_values([(1, 10), (1, 10)])
-        data = new_parameters_by_values([1, -1, 1])
-        assert compute_domains_affine_geq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([1, -1, 1])
+        assert compute_domains_affine_geq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[2, 10], [1, 9]]))
 
     def test_compute_domains_2(self) -> None:
         domains = new_shr_domains_by_values([(5, 10), (5, 10), (5, 10)])
-        data = new_parameters_by_values([1, 1, 1, 27])
-        assert compute_domains_affine_geq(domains, data) == PROP_CONSISTENCY
+        data = init_parameters([1, 1, 1, 27])
+        assert compute_domains_affine_geq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[7, 10], [7, 10], [7, 10]]))
 
     def test_compute_domains_3(self) -> None:
         domains = new_shr_domains_by_values([(5, 10), (1, 2)])
-        data = new_parameters_by_values([1, 1, 6])
-        assert compute_domains_affine_geq(domains, data) == PROP_ENTAILMENT
+        data = init_parameters([1, 1, 6])
+        assert compute_domains_affine_geq(domains, data, new_workspace(256)) == PROP_ENTAILMENT
         assert np.all(domains == np.array([[5, 10], [1, 2]]))
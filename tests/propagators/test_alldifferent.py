@@ -11,10 +11,11 @@
 # Copyright 2024 - Yan Georget
 ###############################################################################
 import numpy as np
+import pytest
 
-from nucs.constants import PROP_CONSISTENCY
-from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values
-from nucs.propagators.alldifferent_propagator import compute_domains_alldifferent, path_max, path_min, path_set
+from nucs.constants import MAX, MIN, PROP_CONSISTENCY
+from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values, new_workspace
+from nucs.propagators.alldifferent_propagator import argsort, compute_domains_alldifferent, path_max, path_min, path_set
 
 
 class TestAlldifferent:
@@ -39,20 +40,29 @@ class TestAlldifferent:
         path_set(a, 0, 4, -1)
         assert np.all(a == np.array([-1, 3, -1, 0, 1]))
 
+    @pytest.mark.parametrize("n", [5, 40])
+    def test_argsort(self, n: int) -> None:
+        domains = np.random.default_rng(n).integers(0, 10, (n, 2), dtype=np.int32)
+        indices = new_workspace(n)
+        for bound in [MIN, MAX]:
+            argsort(domains, bound, indices)
+            assert sorted(indices.tolist()) == list(range(n))
+            assert np.all(np.diff(domains[indices, bound]) >= 0)
+
     def test_compute_domains_1(self) -> None:
         domains = new_shr_domains_by_values([(3, 6), (3, 4), (2, 5), (2, 4), (3, 4), (1, 6)])
         data = new_parameters_by_values([])
-        assert compute_domains_alldifferent(domains, data) == PROP_CONSISTENCY
+        assert compute_domains_alldifferent(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[6, 6], [3, 4], [5, 5], [2, 2], [3, 4], [1, 1]]))
 
     def test_compute_domains_2(self) -> None:
         domains = new_shr_domains_by_values([(0, 0), (2, 2), (1, 2)])
         data = new_parameters_by_values([])
-        assert compute_domains_alldifferent(domains, data) == PROP_CONSISTENCY
+        assert compute_domains_alldifferent(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[0, 0], [2, 2], [1, 1]]))
 
     def test_compute_domains_3(self) -> None:
         domains = new_shr_domains_by_values([(0, 0), (0, 4), (0, 4), (0, 4), (0, 4)])
         data = new_parameters_by_values([])
-        assert compute_domains_alldifferent(domains, data) == PROP_CONSISTENCY
+        assert compute_domains_alldifferent(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[0, 0], [1, 4], [1, 4], [1, 4], [1, 4]]))
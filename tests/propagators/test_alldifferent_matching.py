@@ -0,0 +1,133 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import itertools
+
+import numpy as np
+import pytest
+
+from nucs.constants import PROP_CONSISTENCY, PROP_INCONSISTENCY
+from nucs.domains import has_value, remove_value
+from nucs.examples.quasigroup.quasigroup_problem import Quasigroup5Problem
+from nucs.examples.queens.queens_problem import QueensProblem
+from nucs.examples.sudoku.sudoku_problem import SudokuProblem
+from nucs.numpy import new_bitset_domains_by_values, new_parameters_by_values, new_shr_domains_by_values, new_workspace
+from nucs.problems.problem import Problem
+from nucs.propagators.alldifferent_matching_propagator import (
+    compute_domains_alldifferent_matching,
+    init_parameters_alldifferent_matching,
+)
+from nucs.propagators.propagators import ALG_ALLDIFFERENT, ALG_ALLDIFFERENT_MATCHING
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.consistency_algorithms import domain_consistency_algorithm
+from nucs.statistics import STATS_SOLVER_CHOICE_NB
+
+
+def use_matching(problem: Problem) -> Problem:
+    problem.propagators = [
+        (variables, ALG_ALLDIFFERENT_MATCHING if algorithm == ALG_ALLDIFFERENT else algorithm, parameters)
+        for variables, algorithm, parameters in problem.propagators
+    ]
+    return problem
+
+
+class TestAlldifferentMatching:
+    def test_compute_domains_holes(self) -> None:
+        domains = new_bitset_domains_by_values([(2, 3), (2, 3), (1, 4)])
+        parameters, _ = init_parameters_alldifferent_matching(3, new_parameters_by_values([]))
+        assert compute_domains_alldifferent_matching(domains, parameters, new_workspace(256)) == PROP_CONSISTENCY
+        assert domains[:, :2].tolist() == [[2, 3], [2, 3], [1, 4]]
+        assert [has_value(domains, 2, value) for value in range(1, 5)] == [True, False, False, True]
+
+    def test_compute_domains_inconsistency(self) -> None:
+        domains = new_bitset_domains_by_values([(1, 3), (1, 3), (1, 3)])
+        for var_idx in range(3):
+            remove_value(domains, var_idx, 2)
+        parameters, _ = init_parameters_alldifferent_matching(3, new_parameters_by_values([]))
+        assert compute_domains_alldifferent_matching(domains, parameters, new_workspace(256)) == PROP_INCONSISTENCY
+
+    def test_compute_domains_bounds(self) -> None:
+        domains = new_shr_domains_by_values([(3, 6), (3, 4), (2, 5), (2, 4), (3, 4), (1, 6)])
+        parameters, _ = init_parameters_alldifferent_matching(6, new_parameters_by_values([]))
+        assert compute_domains_alldifferent_matching(domains, parameters, new_workspace(256)) == PROP_CONSISTENCY
+        assert domains.tolist() == [[6, 6], [3, 4], [5, 5], [2, 2], [3, 4], [1, 1]]
+
+    def test_compute_domains_small_workspace(self) -> None:
+        domains = new_bitset_domains_by_values([0, (0, 100), (0, 100)])
+        parameters, _ = init_parameters_alldifferent_matching(3, new_parameters_by_values([]))
+        assert compute_domains_alldifferent_matching(domains, parameters, new_workspace(256)) == PROP_CONSISTENCY
+        assert domains[:, :2].tolist() == [[0, 0], [1, 100], [1, 100]]
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_compute_domains_same_as_enumeration(self, seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        n = 4
+        parameters, _ = init_parameters_alldifferent_matching(n, new_parameters_by_values([]))
+        workspace = new_workspace(256)
+        for _ in range(20):
+            values = [set(rng.choice(6, int(rng.integers(1, 5)), replace=False).tolist()) for _ in range(n)]
+            domains = new_bitset_domains_by_values([(min(var_values), max(var_values)) for var_values in values])
+            for var_idx, var_values in enumerate(values):
+                for value in range(min(var_values), max(var_values)):
+                    if value not in var_values:
+                        remove_value(domains, var_idx, value)
+            supports = [set() for _ in range(n)]  # type: ignore
+            for solution in itertools.product(*values):
+                if len(set(solution)) == n:
+                    for var_idx, value in enumerate(solution):
+                        supports[var_idx].add(value)
+            # the parameters are not reset so that the last matching is reused
+            status = compute_domains_alldifferent_matching(domains, parameters, workspace)
+            if len(supports[0]) == 0:
+                assert status == PROP_INCONSISTENCY
+                continue
+            assert status == PROP_CONSISTENCY
+            for var_idx in range(n):
+                assert {value for value in range(6) if has_value(domains, var_idx, value)} == supports[var_idx]
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_same_as_alldifferent(self, trailing: bool) -> None:
+        solutions = [
+            BacktrackSolver(problem, consistency_algorithm=domain_consistency_algorithm, trailing=trailing).find_all()
+            for problem in [QueensProblem(7), use_matching(QueensProblem(7))]
+        ]
+        assert len(solutions[0]) == 40
+        assert solutions[1] == solutions[0]
+
+    def test_solve_sudoku(self) -> None:
+        givens = [
+            [0, 0, 0, 0, 0, 0, 0, 1, 2],
+            [0, 0, 0, 0, 3, 5, 0, 0, 0],
+            [0, 0, 0, 6, 0, 0, 0, 7, 0],
+            [7, 0, 0, 0, 0, 0, 3, 0, 0],
+            [0, 0, 0, 4, 0, 0, 8, 0, 0],
+            [1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 1, 2, 0, 0, 0, 0],
+            [0, 8, 0, 0, 0, 0, 0, 4, 0],
+            [0, 5, 0, 0, 0, 0, 6, 0, 0],
+        ]
+        solvers = [
+            BacktrackSolver(problem, consistency_algorithm=domain_consistency_algorithm)
+            for problem in [SudokuProblem(givens), use_matching(SudokuProblem(givens))]
+        ]
+        solutions = [solver.find_all() for solver in solvers]
+        assert len(solutions[0]) == 1
+        assert solutions[1] == solutions[0]
+        assert solvers[1].statistics[STATS_SOLVER_CHOICE_NB] < solvers[0].statistics[STATS_SOLVER_CHOICE_NB]
+
+    def test_solve_quasigroup(self) -> None:
+        solvers = [
+            BacktrackSolver(problem, consistency_algorithm=domain_consistency_algorithm, trailing=True)
+            for problem in [Quasigroup5Problem(9), use_matching(Quasigroup5Problem(9))]
+        ]
+        assert [solver.count_all() for solver in solvers] == [0, 0]
+        assert solvers[1].statistics[STATS_SOLVER_CHOICE_NB] < solvers[0].statistics[STATS_SOLVER_CHOICE_NB]
@@ -0,0 +1,164 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values, new_workspace
+from nucs.problems.problem import Problem
+from nucs.propagators.compact_table_propagator import compute_domains_compact_table, init_parameters_compact_table
+from nucs.propagators.propagators import ALG_COMPACT_TABLE, ALG_RELATION, get_workspace_size
+from nucs.propagators.relation_propagator import compute_domains_relation
+from nucs.solvers.backtrack_solver import BacktrackSolver
+
+
+def compute_domains(domains: List[Tuple[int, int]], tuples: List[int]) -> Tuple[int, List[List[int]]]:
+    shr_domains = new_shr_domains_by_values(domains)  # type: ignore
+    parameters, _ = init_parameters_compact_table(len(domains), new_parameters_by_values(tuples))
+    status = compute_domains_compact_table(shr_domains, parameters, new_workspace(256))
+    return status, shr_domains.tolist()
+
+
+class TestCompactTable:
+    def test_compute_domains_1(self) -> None:
+        status, domains = compute_domains([(-5, 5), (-5, 5)], [0, 7, 1, 4, 2, -7, 3, 3])
+        assert status == PROP_CONSISTENCY
+        assert domains == [[1, 3], [3, 4]]
+
+    def test_compute_domains_2(self) -> None:
+        status, domains = compute_domains(
+            [(0, 3), (0, 3), (1, 8)],
+            [
+                0,
+                1,
+                0,
+                0,
+                2,
+                0,
+                0,
+                3,
+                0,
+                1,
+                1,
+                1,
+                1,
+                2,
+                2,
+                1,
+                3,
+                3,
+                2,
+                1,
+                2,
+                2,
+                2,
+                4,
+                2,
+                3,
+                6,
+                3,
+                1,
+                3,
+                3,
+                2,
+                6,
+                3,
+                3,
+                9,
+            ],
+        )
+        assert status == PROP_CONSISTENCY
+        assert domains == [[1, 3], [1, 3], [1, 6]]
+
+    def test_compute_domains_3(self) -> None:
+        assert compute_domains([(0, 3), (0, 3)], [4, 5])[0] == PROP_INCONSISTENCY
+
+    def test_compute_domains_4(self) -> None:
+        status, domains = compute_domains([(0, 3), (0, 3)], [1, 2])
+        assert status == PROP_ENTAILMENT
+        assert domains == [[1, 1], [2, 2]]
+
+    def test_compute_domains_empty(self) -> None:
+        assert compute_domains([(0, 3), (0, 3)], [])[0] == PROP_INCONSISTENCY
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_compute_domains_same_as_relation(self, seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        n = 3
+        tuple_nb = int(rng.integers(1, 100))
+        parameters = new_parameters_by_values(rng.integers(-3, 6, n * tuple_nb).tolist())
+        initial_parameters, _ = init_parameters_compact_table(n, parameters)
+        workspace = new_workspace(get_workspace_size(n, len(parameters)))
+        for _ in range(20):
+            compiled_parameters = initial_parameters.copy()
+            domains = [tuple(sorted(rng.integers(-4, 7, 2).tolist())) for _ in range(n)]
+            relation_domains = new_shr_domains_by_values(domains)  # type: ignore
+            compact_table_domains = new_shr_domains_by_values(domains)  # type: ignore
+            relation_status = compute_domains_relation(relation_domains, parameters, workspace)
+            compact_table_status = compute_domains_compact_table(compact_table_domains, compiled_parameters, workspace)
+            assert compact_table_status == relation_status
+            if relation_status != PROP_INCONSISTENCY:
+                assert compact_table_domains.tolist() == relation_domains.tolist()
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_compute_domains_incremental(self, seed: int) -> None:
+        rng = np.random.default_rng(seed)
+        n = 3
+        tuple_nb = int(rng.integers(1, 100))
+        parameters = new_parameters_by_values(rng.integers(-3, 6, n * tuple_nb).tolist())
+        compiled_parameters, state_size = init_parameters_compact_table(n, parameters)
+        assert state_size == (tuple_nb + 31) // 32 + 2 * n
+        workspace = new_workspace(get_workspace_size(n, len(parameters)))
+        domains = new_shr_domains_by_values([(-4, 7)] * n)
+        while True:
+            relation_domains = domains.copy()
+            relation_status = compute_domains_relation(relation_domains, parameters, workspace)
+            compact_table_status = compute_domains_compact_table(domains, compiled_parameters, workspace)
+            assert compact_table_status == relation_status
+            if relation_status != PROP_CONSISTENCY:
+                break
+            assert domains.tolist() == relation_domains.tolist()
+            # The domains are only reduced, as they are along a branch of the search.
+            var_idx = int(rng.integers(0, n))
+            if rng.integers(0, 2) == 0:
+                domains[var_idx, MIN] += 1
+            else:
+                domains[var_idx, MAX] -= 1
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_same_as_relation(self, trailing: bool) -> None:
+        rng = np.random.default_rng(0)
+        tables = [rng.integers(0, 5, 3 * 40).tolist() for _ in range(4)]
+        solutions = []
+        for algorithm in [ALG_RELATION, ALG_COMPACT_TABLE]:
+            problem = Problem([(0, 4)] * 6)
+            for table_idx, table in enumerate(tables):
+                problem.add_propagator(([table_idx, table_idx + 1, table_idx + 2], algorithm, table))
+            solutions.append(BacktrackSolver(problem, trailing=trailing).find_all())
+        assert len(solutions[0]) > 0
+        assert solutions[1] == solutions[0]
+
+    def test_solve_all_same_as_relation(self) -> None:
+        rng = np.random.default_rng(1)
+        tables = [rng.integers(0, 6, 3 * 60).tolist() for _ in range(5)]
+        solution_nbs = []
+        for algorithm in [ALG_RELATION, ALG_COMPACT_TABLE]:
+            problem = Problem([(0, 5)] * 7)
+            for table_idx, table in enumerate(tables):
+                problem.add_propagator(([table_idx, table_idx + 1, table_idx + 2], algorithm, table))
+            solver = BacktrackSolver(problem, trailing=True)
+            solution_nbs.append(solver.count_all())
+        assert solution_nbs[0] > 0
+        assert solution_nbs[1] == solution_nbs[0]
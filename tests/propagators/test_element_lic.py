@@ -13,7 +13,8 @@
 import numpy as np
 
 from nucs.constants import PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
-from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values
+from nucs.domains import has_value
+from nucs.numpy import new_bitset_domains_by_values, new_parameters_by_values, new_shr_domains_by_values, new_workspace
 from nucs.propagators.element_lic_propagator import compute_domains_element_lic
 
 
@@ -21,16 +22,23 @@ class TestElementLIC:
     def test_compute_domains_1(self) -> None:
         domains = new_shr_domains_by_values([(-1, 1), (1, 2), (0, 2)])
         data = new_parameters_by_values([1])
-        assert compute_domains_element_lic(domains, data) == PROP_CONSISTENCY
+        assert compute_domains_element_lic(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[-1, 1], [1, 2], [0, 1]]))
 
     def test_compute_domains_2(self) -> None:
         domains = new_shr_domains_by_values([(-4, -2), (1, 2), (0, 1)])
         data = new_parameters_by_values([1])
-        assert compute_domains_element_lic(domains, data) == PROP_ENTAILMENT
+        assert compute_domains_element_lic(domains, data, new_workspace(256)) == PROP_ENTAILMENT
         assert np.all(domains == np.array([[-4, -2], [1, 1], [1, 1]]))
 
     def test_compute_domains_3(self) -> None:
         domains = new_shr_domains_by_values([(-4, -2), (1, 2), (0, 1)])
         data = new_parameters_by_values([0])
-        assert compute_domains_element_lic(domains, data) == PROP_INCONSISTENCY
+        assert compute_domains_element_lic(domains, data, new_workspace(256)) == PROP_INCONSISTENCY
+
+    def test_compute_domains_bitsets(self) -> None:
+        domains = new_bitset_domains_by_values([(0, 2), 2, (0, 2), (0, 2)])
+        data = new_parameters_by_values([0])
+        assert compute_domains_element_lic(domains, data, new_workspace(256)) == PROP_CONSISTENCY
+        assert domains[:, :2].tolist() == [[0, 2], [2, 2], [0, 2], [0, 2]]
+        assert [has_value(domains, 3, value) for value in range(3)] == [True, False, True]
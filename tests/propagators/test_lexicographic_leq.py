@@ -16,7 +16,7 @@ import numpy as np
 import pytest
 
 from nucs.constants import PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
-from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values
+from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values, new_workspace
 from nucs.problems.problem import Problem
 from nucs.propagators.lexicographic_leq_propagator import compute_domains_lexicographic_leq
 from nucs.propagators.propagators import ALG_LEXICOGRAPHIC_LEQ
@@ -28,13 +28,13 @@ class TestLexicographicLEQ:
     def test_compute_domains_1(self) -> None:
         domains = new_shr_domains_by_values([(0, 1), 0, 1, 1])
         data = new_parameters_by_values([])
-        assert compute_domains_lexicographic_leq(domains, data) == PROP_ENTAILMENT
+        assert compute_domains_lexicographic_leq(domains, data, new_workspace(256)) == PROP_ENTAILMENT
         assert np.all(domains == np.array([[0, 1], [0, 0], [1, 1], [1, 1]]))
 
     def test_compute_domains_2(self) -> None:
         domains = new_shr_domains_by_values([(0, 1), (0, 1), (0, 1), (0, 1)])
         data = new_parameters_by_values([])
-        assert compute_domains_lexicographic_leq(domains, data) == PROP_CONSISTENCY
+        assert compute_domains_lexicographic_leq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[0, 1], [0, 1], [0, 1], [0, 1]]))
 
     @pytest.mark.parametrize(
@@ -61,7 +61,7 @@ class TestLexicographicLEQ:
     def test_compute_domains_values(self, values: Any, state: int) -> None:
         domains = new_shr_domains_by_values(values)
         data = new_parameters_by_values([])
-        assert compute_domains_lexicographic_leq(domains, data) == state
+        assert compute_domains_lexicographic_leq(domains, data, new_workspace(256)) == state
 
     def test_solve_1(self) -> None:
         problem = Problem(
@@ -13,7 +13,7 @@
 import numpy as np
 
 from nucs.constants import PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
-from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values
+from nucs.numpy import new_parameters_by_values, new_shr_domains_by_values, new_workspace
 from nucs.propagators.max_leq_propagator import compute_domains_max_leq
 
 
@@ -21,27 +21,27 @@ class TestMaxLEQ:
     def test_compute_domains_1(self) -> None:
         domains = new_shr_domains_by_values([(1, 4), (2, 5), (0, 2)])
         data = new_parameters_by_values([])
-        assert compute_domains_max_leq(domains, data) == PROP_CONSISTENCY
+        assert compute_domains_max_leq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[1, 2], [2, 2], [2, 2]]))
 
     def test_compute_domains_2(self) -> None:
         domains = new_shr_domains_by_values([(1, 4), (3, 5), (0, 2)])
         data = new_parameters_by_values([])
-        assert compute_domains_max_leq(domains, data) == PROP_INCONSISTENCY
+        assert compute_domains_max_leq(domains, data, new_workspace(256)) == PROP_INCONSISTENCY
 
     def test_compute_domains_3(self) -> None:
         domains = new_shr_domains_by_values([(2, 4), (2, 5), (0, 1)])
         data = new_parameters_by_values([])
-        assert compute_domains_max_leq(domains, data) == PROP_INCONSISTENCY
+        assert compute_domains_max_leq(domains, data, new_workspace(256)) == PROP_INCONSISTENCY
 
     def test_compute_domains_4(self) -> None:
         domains = new_shr_domains_by_values([(0, 1), (0, 1), (2, 3)])
         data = new_parameters_by_values([])
-        assert compute_domains_max_leq(domains, data) == PROP_ENTAILMENT
+        assert compute_domains_max_leq(domains, data, new_workspace(256)) == PROP_ENTAILMENT
         assert np.all(domains == np.array([[0, 1], [0, 1], [2, 3]]))
 
     def test_compute_domains_5(self) -> None:
         domains = new_shr_domains_by_values([(0, 1), (0, 1), (0, 0)])
         data = new_parameters_by_values([])
-        assert compute_domains_max_leq(domains, data) == PROP_CONSISTENCY
+        assert compute_domains_max_leq(domains, data, new_workspace(256)) == PROP_CONSISTENCY
         assert np.all(domains == np.array([[0, 0], [0, 0], [0, 0]]))
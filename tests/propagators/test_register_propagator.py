@@ -0,0 +1,133 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from typing import Iterator, Tuple
+
+import pytest
+from numba import njit  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import MAX, MIN, PROP_CONSISTENCY, PROP_ENTAILMENT, PROP_INCONSISTENCY
+from nucs.numpy import new_parameters_by_values, new_triggers
+from nucs.problems.problem import Problem
+from nucs.propagators.propagators import (
+    ALG_ALLDIFFERENT_MATCHING,
+    COMPUTE_DOMAINS_FCTS,
+    GET_COMPLEXITY_FCTS,
+    GET_TRIGGERS_FCTS,
+    get_compute_domains_addrs,
+    register_propagator,
+    unregister_propagator,
+)
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.statistics import STATS_SOLVER_SOLUTION_NB, get_algorithm_name
+
+
+def get_complexity_lt(n: int, parameters: NDArray) -> float:
+    return 1
+
+
+def get_triggers_lt(n: int, parameters: NDArray) -> NDArray:
+    triggers = new_triggers(n, False)
+    triggers[0, MIN] = True
+    triggers[1, MAX] = True
+    return triggers
+
+
+@njit(cache=True)
+def compute_domains_lt(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
+    if domains[0, MAX] < domains[1, MIN]:
+        return PROP_ENTAILMENT
+    domains[0, MAX] = min(domains[0, MAX], domains[1, MAX] - 1)
+    domains[1, MIN] = max(domains[1, MIN], domains[0, MIN] + 1)
+    if domains[0, MIN] > domains[0, MAX] or domains[1, MIN] > domains[1, MAX]:
+        return PROP_INCONSISTENCY
+    return PROP_CONSISTENCY
+
+
+def init_parameters_monotonic_lt(n: int, parameters: NDArray) -> Tuple[NDArray, int]:
+    return new_parameters_by_values([1000]), 1
+
+
+@njit(cache=True)
+def compute_domains_monotonic_lt(domains: NDArray, parameters: NDArray, workspace: NDArray) -> int:
+    # The state is the last maximal value of the first variable, it can only decrease along a branch.
+    if domains[0, MAX] > parameters[0]:
+        return PROP_INCONSISTENCY
+    parameters[0] = domains[0, MAX]
+    return compute_domains_lt(domains, parameters, workspace)
+
+
+@pytest.fixture
+def alg_lt() -> Iterator[int]:
+    algorithm = register_propagator(get_triggers_lt, get_complexity_lt, compute_domains_lt)
+    yield algorithm
+    unregister_propagator(algorithm)
+
+
+@pytest.fixture
+def alg_monotonic_lt() -> Iterator[int]:
+    algorithm = register_propagator(
+        get_triggers_lt, get_complexity_lt, compute_domains_monotonic_lt, init_parameters_monotonic_lt
+    )
+    yield algorithm
+    unregister_propagator(algorithm)
+
+
+class TestRegisterPropagator:
+    def test_register_propagator(self, alg_lt: int) -> None:
+        assert alg_lt == ALG_ALLDIFFERENT_MATCHING + 1
+        assert len(COMPUTE_DOMAINS_FCTS) == alg_lt + 1
+        assert get_algorithm_name(alg_lt) == "LT"
+
+    def test_unregister_propagator(self) -> None:
+        algorithm_nb = len(COMPUTE_DOMAINS_FCTS)
+        compute_domains_addrs = get_compute_domains_addrs().copy()
+        unregister_propagator(register_propagator(get_triggers_lt, get_complexity_lt, compute_domains_lt))
+        assert len(COMPUTE_DOMAINS_FCTS) == len(GET_TRIGGERS_FCTS) == len(GET_COMPLEXITY_FCTS) == algorithm_nb
+        assert (get_compute_domains_addrs() == compute_domains_addrs).all()
+
+    def test_solve(self, alg_lt: int) -> None:
+        problem = Problem([(0, 4), (0, 4), (0, 4)])
+        problem.add_propagator(([0, 1], alg_lt, []))
+        problem.add_propagator(([1, 2], alg_lt, []))
+        solver = BacktrackSolver(problem)
+        solutions = solver.find_all()
+        assert len(solutions) == 10
+        assert all(solution[0] < solution[1] < solution[2] for solution in solutions)
+
+    def test_solve_all_jit(self, alg_lt: int) -> None:
+        problem = Problem([(0, 4), (0, 4), (0, 4)])
+        problem.add_propagator(([0, 1], alg_lt, []))
+        problem.add_propagator(([1, 2], alg_lt, []))
+        solver = BacktrackSolver(problem, trailing=True)
+        assert solver.is_jit_search_possible()
+        solver.solve_all()
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 10
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_stateful(self, alg_monotonic_lt: int, trailing: bool) -> None:
+        problem = Problem([(0, 4), (0, 4), (0, 4)])
+        problem.add_propagator(([0, 1], alg_monotonic_lt, []))
+        problem.add_propagator(([1, 2], alg_monotonic_lt, []))
+        solver = BacktrackSolver(problem, trailing=trailing)
+        assert len(solver.find_all()) == 10
+        assert problem.state_bounds.tolist() == [[0, 1], [1, 2]]
+
+    def test_solve_all_jit_stateful(self, alg_monotonic_lt: int) -> None:
+        problem = Problem([(0, 4), (0, 4), (0, 4)])
+        problem.add_propagator(([0, 1], alg_monotonic_lt, []))
+        problem.add_propagator(([1, 2], alg_monotonic_lt, []))
+        solver = BacktrackSolver(problem, trailing=True)
+        assert solver.count_all() == 10
+        solver.reset()
+        assert problem.props_parameters.tolist() == [1000, 1000]
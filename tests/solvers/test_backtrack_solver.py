@@ -10,10 +10,54 @@
 #
 # Copyright 2024 - Yan Georget
 ###############################################################################
+import time
+from typing import Callable, List
+
+import numpy as np
+import pytest
+from numba import njit, objmode  # type: ignore
+from numpy.typing import NDArray
+
+from nucs.constants import (
+    OPTIMIZATION_DICHOTOMIC,
+    OPTIMIZATION_HYBRID,
+    OPTIMIZATION_LINEAR,
+    SEARCH_COMPLETE,
+    SEARCH_IN_PROGRESS,
+    SEARCH_INTERRUPTED,
+)
+from nucs.examples.golomb.golomb_problem import GolombProblem, golomb_consistency_algorithm
+from nucs.examples.knapsack.knapsack_problem import KnapsackProblem
+from nucs.examples.quasigroup.quasigroup_problem import Quasigroup5Problem
+from nucs.examples.queens.queens_problem import QueensProblem
+from nucs.numpy import new_shr_domains_by_values
 from nucs.problems.problem import Problem
-from nucs.propagators.propagators import ALG_ALLDIFFERENT
+from nucs.propagators.propagators import ALG_AFFINE_GEQ, ALG_AFFINE_LEQ, ALG_ALLDIFFERENT, ALG_EXACTLY_EQ
 from nucs.solvers.backtrack_solver import BacktrackSolver
-from nucs.statistics import STATS_SOLVER_CHOICE_DEPTH, STATS_SOLVER_SOLUTION_NB
+from nucs.solvers.consistency_algorithms import domain_consistency_algorithm
+from nucs.solvers.heuristics import (
+    ACTIVITY_DECAY,
+    IMPACT_SMOOTHING,
+    activity_var_heuristic,
+    dom_wdeg_var_heuristic,
+    first_not_instantiated_var_heuristic,
+    greatest_domain_var_heuristic,
+    impact_var_heuristic,
+    max_value_dom_heuristic,
+    min_value_dom_heuristic,
+    smallest_domain_var_heuristic,
+    split_low_dom_heuristic,
+    update_impact,
+)
+from nucs.statistics import (
+    STATS_OPTIMIZER_SOLUTION_NB,
+    STATS_PROPAGATOR_INCONSISTENCY_NB,
+    STATS_SOLVER_BACKTRACK_NB,
+    STATS_SOLVER_CHOICE_DEPTH,
+    STATS_SOLVER_CHOICE_NB,
+    STATS_SOLVER_SOLUTION_NB,
+    get_statistics,
+)
 
 
 class TestBacktrackSolver:
@@ -49,3 +93,371 @@ class TestBacktrackSolver:
         assert solutions[3] == [1, 2, 0]
         assert solutions[4] == [2, 0, 1]
         assert solutions[5] == [2, 1, 0]
+
+    def test_solve_trailing(self) -> None:
+        problem = Problem([(0, 2), (0, 2), (0, 2)])
+        problem.add_propagator(([0, 1, 2], ALG_ALLDIFFERENT, []))
+        solver = BacktrackSolver(problem, trailing=True)
+        solutions = [solution for solution in solver.solve()]
+        assert solutions == [[0, 1, 2], [0, 2, 1], [1, 0, 2], [1, 2, 0], [2, 0, 1], [2, 1, 0]]
+        assert len(problem.trail) >= 2 * 3 * solver.statistics[STATS_SOLVER_CHOICE_DEPTH]
+
+    @pytest.mark.parametrize("queen_nb,solution_nb", [(6, 4), (8, 92)])
+    def test_solve_trailing_same_as_copying(self, queen_nb: int, solution_nb: int) -> None:
+        copying_solver = BacktrackSolver(QueensProblem(queen_nb))
+        copying_solutions = copying_solver.find_all()
+        trailing_solver = BacktrackSolver(QueensProblem(queen_nb), trailing=True)
+        trailing_solutions = trailing_solver.find_all()
+        assert len(trailing_solutions) == solution_nb
+        assert trailing_solutions == copying_solutions
+        assert (
+            trailing_solver.statistics[STATS_SOLVER_BACKTRACK_NB]
+            == copying_solver.statistics[STATS_SOLVER_BACKTRACK_NB]
+        )
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    @pytest.mark.parametrize(
+        "var_heuristic,dom_heuristic",
+        [
+            (first_not_instantiated_var_heuristic, min_value_dom_heuristic),
+            (smallest_domain_var_heuristic, max_value_dom_heuristic),
+            (greatest_domain_var_heuristic, split_low_dom_heuristic),
+        ],
+    )
+    def test_solve_all_jit_same_as_python(
+        self, trailing: bool, var_heuristic: Callable, dom_heuristic: Callable
+    ) -> None:
+        python_solver = BacktrackSolver(
+            QueensProblem(8), var_heuristic=var_heuristic, dom_heuristic=dom_heuristic, trailing=True
+        )
+        python_solver.solve_all(lambda solution: None)
+        jit_solver = BacktrackSolver(
+            QueensProblem(8), var_heuristic=var_heuristic, dom_heuristic=dom_heuristic, trailing=trailing
+        )
+        assert jit_solver.is_jit_search_possible()
+        jit_solver.solve_all()
+        assert jit_solver.statistics[STATS_SOLVER_SOLUTION_NB] == 92
+        for stat in [STATS_SOLVER_CHOICE_NB, STATS_SOLVER_CHOICE_DEPTH, STATS_SOLVER_BACKTRACK_NB]:
+            assert jit_solver.statistics[stat] == python_solver.statistics[stat]
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_domain_consistency(self, trailing: bool) -> None:
+        bound_solver = BacktrackSolver(Quasigroup5Problem(8), var_heuristic=smallest_domain_var_heuristic)
+        domain_solver = BacktrackSolver(
+            Quasigroup5Problem(8),
+            consistency_algorithm=domain_consistency_algorithm,
+            var_heuristic=smallest_domain_var_heuristic,
+            trailing=trailing,
+        )
+        assert domain_solver.find_all() == bound_solver.find_all()
+        assert domain_solver.statistics[STATS_SOLVER_CHOICE_NB] < bound_solver.statistics[STATS_SOLVER_CHOICE_NB]
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_domain_consistency_holes(self, trailing: bool) -> None:
+        problem = Problem([1, (0, 2)])
+        problem.add_propagator(([0, 1], ALG_EXACTLY_EQ, [1, 1]))  # entailed once 1 is removed from the second domain
+        solver = BacktrackSolver(problem, consistency_algorithm=domain_consistency_algorithm, trailing=trailing)
+        assert solver.find_all() == [[1, 0], [1, 2]]
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_all_jit_domain_consistency(self, trailing: bool) -> None:
+        python_solver = BacktrackSolver(
+            Quasigroup5Problem(7),
+            consistency_algorithm=domain_consistency_algorithm,
+            var_heuristic=smallest_domain_var_heuristic,
+            trailing=True,
+        )
+        python_solver.solve_all(lambda solution: None)
+        jit_solver = BacktrackSolver(
+            Quasigroup5Problem(7),
+            consistency_algorithm=domain_consistency_algorithm,
+            var_heuristic=smallest_domain_var_heuristic,
+            trailing=trailing,
+        )
+        assert jit_solver.is_jit_search_possible()
+        jit_solver.solve_all()
+        assert jit_solver.statistics[STATS_SOLVER_SOLUTION_NB] == 3
+        for stat in [STATS_SOLVER_CHOICE_NB, STATS_SOLVER_CHOICE_DEPTH, STATS_SOLVER_BACKTRACK_NB]:
+            assert jit_solver.statistics[stat] == python_solver.statistics[stat]
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_count_all(self, trailing: bool) -> None:
+        solver = BacktrackSolver(QueensProblem(8), trailing=trailing)
+        assert solver.count_all() == 92
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 92
+
+    def test_count_all_python(self) -> None:
+        solver = BacktrackSolver(
+            QueensProblem(8), var_heuristic=lambda shr_domains: first_not_instantiated_var_heuristic(shr_domains)
+        )
+        assert not solver.is_jit_search_possible()
+        assert solver.count_all() == 92
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_all_njit_callback(self, trailing: bool) -> None:
+        NJIT_SOLUTIONS.clear()
+        solver = BacktrackSolver(QueensProblem(6), trailing=trailing)
+        solver.solve_all(store_solution)
+        assert NJIT_SOLUTIONS == BacktrackSolver(QueensProblem(6)).find_all()
+
+    def test_solve_stack_growth(self) -> None:
+        problem = Problem([(0, 7), (0, 7)])
+        solver = BacktrackSolver(problem, dom_heuristic=split_low_dom_heuristic)
+        solutions = [solution for solution in solver.solve()]
+        assert len(solutions) == 64
+        assert solutions[0] == [0, 0]
+        assert solutions[63] == [7, 7]
+        assert solver.statistics[STATS_SOLVER_CHOICE_DEPTH] == 6
+        assert len(solver.stack_shr_domains) >= 6
+
+    def test_solve_trailing_no_stack(self) -> None:
+        solver = BacktrackSolver(QueensProblem(8), trailing=True)
+        assert len(solver.find_all()) == 92
+        assert len(solver.stack_shr_domains) == 0
+
+    @pytest.mark.parametrize("jit", [False, True])
+    def test_solve_profiling(self, jit: bool) -> None:
+        problem = QueensProblem(8)
+        solver = BacktrackSolver(problem, profiling=True, propagator_profiling=True)
+        solver.solve_all(None if jit else lambda solution: None)
+        statistics = get_statistics(solver.statistics, problem.algorithms_profile, problem.propagators_profile)
+        assert statistics["SOLVER_SOLUTION_NB"] == 92
+        profile = statistics["ALGORITHMS_PROFILE"]["ALLDIFFERENT"]
+        assert profile["CALL_NB"] == statistics["PROPAGATOR_FILTER_NB"]
+        assert profile["NO_CHANGE_NB"] == statistics["PROPAGATOR_FILTER_NO_CHANGE_NB"]
+        assert profile["INCONSISTENCY_NB"] == statistics["PROPAGATOR_INCONSISTENCY_NB"]
+        assert profile["TIME"] > 0
+        assert sum(profile["CALL_NB"] for profile in statistics["PROPAGATORS_PROFILE"].values()) == (
+            statistics["PROPAGATOR_FILTER_NB"]
+        )
+
+    def test_solve_no_profiling(self) -> None:
+        problem = QueensProblem(6)
+        solver = BacktrackSolver(problem)
+        solver.solve_all()
+        assert problem.algorithms_profile is None
+        assert "ALGORITHMS_PROFILE" not in get_statistics(solver.statistics, problem.algorithms_profile)
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_minimize(self, trailing: bool) -> None:
+        problem = Problem([(0, 5), (0, 5), (0, 5)])
+        problem.add_propagator(([0, 1, 2], ALG_AFFINE_GEQ, [1, 1, -1, 4]))
+        solver = BacktrackSolver(problem, dom_heuristic=max_value_dom_heuristic, trailing=trailing)
+        solution = solver.minimize(0)
+        assert solution == [0, 5, 1]
+        assert solver.statistics[STATS_OPTIMIZER_SOLUTION_NB] == 6
+        assert solver.objective is None
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_maximize(self, trailing: bool) -> None:
+        problem = Problem([(0, 5), (0, 5), (0, 5)])
+        problem.add_propagator(([0, 1, 2], ALG_AFFINE_LEQ, [1, 1, -1, 0]))
+        solver = BacktrackSolver(problem, trailing=trailing)
+        solution = solver.maximize(0)
+        assert solution == [5, 0, 5]
+        assert solver.statistics[STATS_OPTIMIZER_SOLUTION_NB] == 6
+        # The search is never restarted from the root.
+        assert solver.statistics[STATS_SOLVER_BACKTRACK_NB] <= solver.statistics[STATS_SOLVER_CHOICE_NB]
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    @pytest.mark.parametrize(
+        "optimization_mode,optimization_probe_time",
+        [(OPTIMIZATION_LINEAR, 0), (OPTIMIZATION_DICHOTOMIC, 0), (OPTIMIZATION_HYBRID, 0), (OPTIMIZATION_HYBRID, 60)],
+    )
+    def test_maximize_optimization_mode(
+        self, trailing: bool, optimization_mode: int, optimization_probe_time: float
+    ) -> None:
+        weights = [40, 40, 38, 38, 36, 36, 34, 34, 32, 32, 30, 30, 28, 28, 26, 26, 24, 24, 22, 22]
+        problem = KnapsackProblem(weights, weights, 55)
+        solver = BacktrackSolver(
+            problem,
+            dom_heuristic=max_value_dom_heuristic,
+            trailing=trailing,
+            optimization_mode=optimization_mode,
+            optimization_probe_time=optimization_probe_time,
+        )
+        solution = solver.maximize(problem.weight)
+        assert solution
+        assert solution[problem.weight] == 54
+        assert solver.status == SEARCH_COMPLETE
+        assert solver.objective is None
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    @pytest.mark.parametrize(
+        "optimization_mode,optimization_probe_time",
+        [(OPTIMIZATION_LINEAR, 0), (OPTIMIZATION_DICHOTOMIC, 0), (OPTIMIZATION_HYBRID, 0), (OPTIMIZATION_HYBRID, 60)],
+    )
+    def test_minimize_optimization_mode(
+        self, trailing: bool, optimization_mode: int, optimization_probe_time: float
+    ) -> None:
+        problem = GolombProblem(7)
+        solver = BacktrackSolver(
+            problem,
+            consistency_algorithm=golomb_consistency_algorithm,
+            trailing=trailing,
+            optimization_mode=optimization_mode,
+            optimization_probe_time=optimization_probe_time,
+        )
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        assert solution[problem.length_idx] == 25
+        assert solver.status == SEARCH_COMPLETE
+        assert solver.objective is None
+
+    @pytest.mark.parametrize("optimization_mode", [OPTIMIZATION_DICHOTOMIC, OPTIMIZATION_HYBRID])
+    def test_maximize_empty_range(self, optimization_mode: int) -> None:
+        problem = Problem([(0, 1)])
+        solver = BacktrackSolver(problem, optimization_mode=optimization_mode, optimization_probe_time=0)
+        assert solver.maximize(0) == [1]
+        assert solver.status == SEARCH_COMPLETE
+        assert solver.objective is None
+
+    def test_minimize_dichotomic_choice_limit(self) -> None:
+        problem = GolombProblem(9)
+        solver = BacktrackSolver(
+            problem,
+            consistency_algorithm=golomb_consistency_algorithm,
+            optimization_mode=OPTIMIZATION_DICHOTOMIC,
+            choice_limit=100,
+        )
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        assert solution[problem.length_idx] > 44
+        assert solver.status == SEARCH_INTERRUPTED
+
+    def test_minimize_dichotomic_inconsistent(self) -> None:
+        problem = Problem([(0, 1), (0, 1), (0, 1)])
+        problem.add_propagator(([0, 1, 2], ALG_ALLDIFFERENT, []))
+        solver = BacktrackSolver(problem, optimization_mode=OPTIMIZATION_DICHOTOMIC)
+        assert solver.minimize(0) is None
+        assert solver.status == SEARCH_COMPLETE
+
+    def test_solve_status(self) -> None:
+        solver = BacktrackSolver(QueensProblem(6))
+        assert solver.solve_one() is not None
+        assert solver.status == SEARCH_IN_PROGRESS
+        solver.solve_all()
+        assert solver.status == SEARCH_COMPLETE
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_minimize_choice_limit(self, trailing: bool) -> None:
+        problem = Problem([(0, 5), (0, 5), (0, 5)])
+        problem.add_propagator(([0, 1, 2], ALG_AFFINE_GEQ, [1, 1, -1, 4]))
+        solver = BacktrackSolver(problem, dom_heuristic=max_value_dom_heuristic, trailing=trailing, choice_limit=4)
+        solution = solver.minimize(0)
+        assert solution is not None and solution[0] > 0
+        assert solver.status == SEARCH_INTERRUPTED
+        assert solver.statistics[STATS_SOLVER_CHOICE_NB] == 4
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_all_backtrack_limit_jit_same_as_python(self, trailing: bool) -> None:
+        python_solver = BacktrackSolver(QueensProblem(8), trailing=trailing, backtrack_limit=100)
+        python_solver.solve_all(lambda solution: None)
+        jit_solver = BacktrackSolver(QueensProblem(8), trailing=trailing, backtrack_limit=100)
+        jit_solver.solve_all()
+        for solver in [python_solver, jit_solver]:
+            assert solver.status == SEARCH_INTERRUPTED
+            assert solver.statistics[STATS_SOLVER_BACKTRACK_NB] == 100
+        for stat in [STATS_SOLVER_SOLUTION_NB, STATS_SOLVER_CHOICE_NB, STATS_SOLVER_CHOICE_DEPTH]:
+            assert jit_solver.statistics[stat] == python_solver.statistics[stat]
+
+    @pytest.mark.parametrize("jit", [False, True])
+    def test_solve_all_time_limit(self, jit: bool) -> None:
+        solver = BacktrackSolver(QueensProblem(8), time_limit=0)
+        solver.solve_all(None if jit else lambda solution: None)
+        assert solver.status == SEARCH_INTERRUPTED
+        assert solver.statistics[STATS_SOLVER_CHOICE_NB] == 0
+
+    @pytest.mark.parametrize("jit", [False, True])
+    def test_solve_all_time_limit_expires(self, jit: bool) -> None:
+        solver = BacktrackSolver(QueensProblem(14), time_limit=0.1)
+        start_time = time.perf_counter()
+        solver.solve_all(None if jit else lambda solution: None)
+        assert time.perf_counter() - start_time < 5
+        assert solver.status == SEARCH_INTERRUPTED
+        assert solver.statistics[STATS_SOLVER_CHOICE_NB] > 0
+
+    def test_dom_wdeg_var_heuristic(self) -> None:
+        problem = Problem([(0, 3), (0, 1), (0, 3), (2, 2)])
+        problem.add_propagator(([0, 2], ALG_AFFINE_LEQ, [1, -1, 0]))
+        problem.add_propagator(([1, 2], ALG_AFFINE_LEQ, [1, -1, 0]))
+        problem.init_problem()
+        problem.propagators_weights[:] = [10, 1]
+        dom_idx = dom_wdeg_var_heuristic(
+            problem.shr_domains_arr,
+            problem.not_entailed_propagators,
+            problem.propagators_weights,
+            problem.shr_domains_adjacent_propagators,
+            problem.shr_domains_adjacent_propagators_bounds,
+        )
+        assert dom_idx == 2
+        problem.not_entailed_propagators[0] = False
+        dom_idx = dom_wdeg_var_heuristic(
+            problem.shr_domains_arr,
+            problem.not_entailed_propagators,
+            problem.propagators_weights,
+            problem.shr_domains_adjacent_propagators,
+            problem.shr_domains_adjacent_propagators_bounds,
+        )
+        assert dom_idx == 1
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    @pytest.mark.parametrize("var_heuristic", [dom_wdeg_var_heuristic, activity_var_heuristic, impact_var_heuristic])
+    def test_solve_learning_var_heuristic(self, var_heuristic: Callable, trailing: bool) -> None:
+        problem = QueensProblem(8)
+        solver = BacktrackSolver(problem, var_heuristic=var_heuristic, trailing=trailing)
+        assert len(solver.find_all()) == 92
+        jit_problem = QueensProblem(8)
+        jit_solver = BacktrackSolver(jit_problem, var_heuristic=var_heuristic, trailing=trailing)
+        assert jit_solver.is_jit_search_possible()
+        jit_solver.solve_all()
+        assert get_statistics(jit_solver.statistics) == get_statistics(solver.statistics)
+        assert np.allclose(jit_problem.shr_domains_activities, problem.shr_domains_activities)
+        assert np.allclose(jit_problem.shr_domains_impacts, problem.shr_domains_impacts)
+
+    def test_solve_dom_wdeg(self) -> None:
+        problem = QueensProblem(8)
+        solver = BacktrackSolver(problem, var_heuristic=dom_wdeg_var_heuristic)
+        assert len(solver.find_all()) == 92
+        assert (
+            problem.propagators_weights.sum()
+            == problem.propagator_nb + solver.statistics[STATS_PROPAGATOR_INCONSISTENCY_NB]
+        )
+
+    def test_activity_var_heuristic(self) -> None:
+        shr_domains = new_shr_domains_by_values([(0, 3), (0, 1), (2, 2), (0, 3)])
+        shr_domains_activities = np.array([4.0, 1.0, 10.0, 2.0])
+        assert activity_var_heuristic(shr_domains, shr_domains_activities) == 0
+        assert np.allclose(shr_domains_activities, np.array([4.0, 1.0, 10.0, 2.0]) * ACTIVITY_DECAY)
+
+    def test_impact_var_heuristic(self) -> None:
+        shr_domains = new_shr_domains_by_values([(0, 3), (0, 1), (2, 2), (0, 2)])
+        assert impact_var_heuristic(shr_domains, np.array([0.5, 0.2, 0.9, 0.5])) == 3
+        update_impact(shr_domains, shr_domains_impacts := np.zeros(4), 0, np.log(32), False)
+        assert np.isclose(shr_domains_impacts[0], IMPACT_SMOOTHING * (1 - 24 / 32))
+
+    def test_solve_probing(self) -> None:
+        problem = QueensProblem(8)
+        solver = BacktrackSolver(problem, var_heuristic=impact_var_heuristic, probing=True)
+        assert len(solver.find_all()) == 92
+        probing_problem = QueensProblem(8)
+        BacktrackSolver(probing_problem, probing=True).init_problem()
+        assert np.all(probing_problem.shr_domains_impacts > 0)
+        assert np.all(probing_problem.shr_domains_activities > 0)
+        assert (
+            probing_problem.shr_domains_arr.tolist()
+            == new_shr_domains_by_values(probing_problem.shr_domains_lst).tolist()
+        )
+
+
+NJIT_SOLUTIONS: List[List[int]] = []
+
+
+def append_solution(solution: NDArray) -> None:
+    NJIT_SOLUTIONS.append([int(value) for value in solution])
+
+
+@njit
+def store_solution(solution: NDArray) -> None:
+    with objmode():
+        append_solution(solution)
@@ -0,0 +1,81 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from typing import List
+
+import pytest
+
+from nucs.constants import SEARCH_COMPLETE, SEARCH_INTERRUPTED
+from nucs.examples.sudoku.sudoku_problem import SudokuProblem, sudoku_shr_domains
+from nucs.numpy import new_instances_by_values
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.batch_solver import BatchSolver
+from nucs.solvers.heuristics import smallest_domain_var_heuristic
+from nucs.statistics import STATS_SOLVER_SOLUTION_NB
+
+EMPTY_GIVENS = [[0] * 9 for _ in range(9)]
+GIVENS_1 = [
+    [0, 0, 0, 0, 3, 0, 0, 0, 0],
+    [2, 8, 9, 0, 0, 0, 0, 0, 0],
+    [0, 0, 5, 7, 0, 0, 0, 9, 0],
+    [0, 0, 0, 0, 0, 0, 8, 0, 6],
+    [0, 0, 0, 3, 0, 0, 1, 0, 0],
+    [7, 1, 0, 0, 0, 6, 0, 0, 2],
+    [0, 6, 3, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 4, 0, 2, 0, 0],
+    [0, 0, 1, 0, 5, 0, 6, 0, 0],
+]
+GIVENS_2 = [
+    [6, 0, 0, 0, 1, 0, 0, 8, 0],
+    [5, 1, 7, 4, 0, 0, 0, 0, 0],
+    [0, 0, 3, 0, 0, 0, 0, 4, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0, 1],
+    [0, 0, 0, 5, 0, 0, 3, 0, 0],
+    [1, 6, 0, 0, 0, 9, 0, 5, 2],
+    [2, 5, 9, 6, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 7, 0, 0, 0, 0],
+    [0, 0, 0, 0, 5, 0, 4, 0, 0],
+]
+INCONSISTENT_GIVENS = [[1, 1, 0, 0, 0, 0, 0, 0, 0]] + [[0] * 9 for _ in range(8)]
+
+
+def solve_one(givens: List[List[int]]) -> List[int]:
+    solution = BacktrackSolver(SudokuProblem(givens), var_heuristic=smallest_domain_var_heuristic).solve_one()
+    assert solution is not None
+    return solution
+
+
+class TestBatchSolver:
+    @pytest.mark.parametrize("processes", [1, 2])
+    def test_solve_batch(self, processes: int) -> None:
+        givens_list = [GIVENS_1, INCONSISTENT_GIVENS, GIVENS_2, GIVENS_1]
+        instances = new_instances_by_values([sudoku_shr_domains(givens) for givens in givens_list])
+        solver = BatchSolver(SudokuProblem(EMPTY_GIVENS), smallest_domain_var_heuristic, processes=processes)
+        solutions, solved = solver.solve_batch(instances)
+        assert solved.tolist() == [True, False, True, True]
+        assert solutions[0].tolist() == solve_one(GIVENS_1)
+        assert solutions[2].tolist() == solve_one(GIVENS_2)
+        assert solutions[3].tolist() == solve_one(GIVENS_1)
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 3
+        assert solver.status == SEARCH_COMPLETE
+
+    def test_solve_batch_choice_limit(self) -> None:
+        instances = new_instances_by_values([sudoku_shr_domains(GIVENS_1)] * 3)
+        solver = BatchSolver(SudokuProblem(EMPTY_GIVENS), choice_limit=1)
+        solutions, solved = solver.solve_batch(instances)
+        assert solved.tolist() == [False, False, False]
+        assert solver.status == SEARCH_INTERRUPTED
+
+    def test_solve_batch_wrong_shape(self) -> None:
+        instances = new_instances_by_values([[(1, 9)] * 80])
+        with pytest.raises(ValueError):
+            BatchSolver(SudokuProblem(EMPTY_GIVENS)).solve_batch(instances)
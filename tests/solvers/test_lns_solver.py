@@ -0,0 +1,94 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import itertools
+from typing import Callable
+
+import numpy as np
+import pytest
+
+from nucs.constants import SEARCH_COMPLETE, SEARCH_INTERRUPTED
+from nucs.examples.golomb.golomb_problem import GolombProblem, golomb_consistency_algorithm, index
+from nucs.examples.knapsack.knapsack_problem import KnapsackProblem
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.heuristics import max_value_dom_heuristic
+from nucs.solvers.lns_solver import LnsSolver, random_neighborhood, sliding_neighborhood
+from nucs.statistics import STATS_OPTIMIZER_SOLUTION_NB
+
+
+class TestLnsSolver:
+    def test_random_neighborhood(self) -> None:
+        neighborhood = random_neighborhood([1, 3, 5, 7], 2, 0, np.random.default_rng(0))
+        assert len(set(neighborhood)) == 2
+        assert set(neighborhood) <= {1, 3, 5, 7}
+
+    def test_sliding_neighborhood(self) -> None:
+        rng = np.random.default_rng(0)
+        assert [sliding_neighborhood([1, 3, 5, 7], 2, iteration, rng) for iteration in range(4)] == [
+            [1, 3],
+            [3, 5],
+            [5, 7],
+            [7, 1],
+        ]
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    @pytest.mark.parametrize("neighborhood", [random_neighborhood, sliding_neighborhood])
+    def test_minimize(self, trailing: bool, neighborhood: Callable) -> None:
+        mark_nb = 8
+        problem = GolombProblem(mark_nb)
+        solver = LnsSolver(
+            problem,
+            variables=[index(mark_nb, 0, j) for j in range(1, mark_nb - 1)],
+            neighborhood=neighborhood,
+            relaxation_rate=0.5,
+            iteration_limit=20,
+            consistency_algorithm=golomb_consistency_algorithm,
+            trailing=trailing,
+        )
+        solver.init_problem()
+        shr_domains = problem.shr_domains_arr
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        # The neighborhoods are searched without reallocating the domains.
+        assert problem.shr_domains_arr is shr_domains
+        marks = [0] + [solution[index(mark_nb, 0, j)] for j in range(1, mark_nb)]
+        assert marks == sorted(marks)
+        assert len(set(j - i for i, j in itertools.combinations(marks, 2))) == problem.dist_nb
+        assert solver.statistics[STATS_OPTIMIZER_SOLUTION_NB] > 1
+        assert solver.status == SEARCH_INTERRUPTED
+        assert solver.objective is None
+
+    def test_minimize_optimality(self) -> None:
+        problem = GolombProblem(7)
+        solver = LnsSolver(
+            problem, relaxation_rate=1, fail_limit=1000000, consistency_algorithm=golomb_consistency_algorithm
+        )
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        assert solution[problem.length_idx] == 25
+        assert solver.status == SEARCH_COMPLETE
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_maximize(self, trailing: bool) -> None:
+        weights = [(i * 37) % 91 + 10 for i in range(40)]
+        volumes = [(i * 53) % 87 + 10 for i in range(40)]
+        problem = KnapsackProblem(weights, volumes, 500)
+        first_solution = BacktrackSolver(
+            KnapsackProblem(weights, volumes, 500), dom_heuristic=max_value_dom_heuristic
+        ).solve_one()
+        assert first_solution
+        solver = LnsSolver(problem, dom_heuristic=max_value_dom_heuristic, iteration_limit=50, trailing=trailing)
+        solution = solver.maximize(problem.weight)
+        assert solution
+        assert sum(volume * value for volume, value in zip(volumes, solution)) <= 500
+        assert sum(weight * value for weight, value in zip(weights, solution)) == solution[problem.weight]
+        assert solution[problem.weight] > first_solution[problem.weight]
@@ -0,0 +1,87 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from typing import Callable
+
+import pytest
+
+from nucs.examples.quasigroup.quasigroup_problem import Quasigroup5Problem
+from nucs.examples.queens.queens_problem import QueensProblem
+from nucs.problems.problem import Problem
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.consistency_algorithms import domain_consistency_algorithm
+from nucs.solvers.heuristics import (
+    max_value_dom_heuristic,
+    min_value_dom_heuristic,
+    smallest_domain_var_heuristic,
+    split_low_dom_heuristic,
+)
+from nucs.solvers.multiprocessing_solver import MultiprocessingSolver
+from nucs.statistics import STATS_SOLVER_SOLUTION_NB, get_statistics
+
+
+class TestMultiprocessingSolver:
+    def test_solve(self) -> None:
+        problem = Problem([(0, 1), (0, 1)])
+        solver = MultiprocessingSolver(problem, processes=2, deterministic=True)
+        assert solver.find_all() == [[0, 0], [0, 1], [1, 0], [1, 1]]
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 4
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_all(self, trailing: bool) -> None:
+        solver = MultiprocessingSolver(QueensProblem(8), processes=2, trailing=trailing)
+        solver.solve_all()
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 92
+
+    @pytest.mark.parametrize(
+        "dom_heuristic", [min_value_dom_heuristic, max_value_dom_heuristic, split_low_dom_heuristic]
+    )
+    def test_solve_same_as_sequential(self, dom_heuristic: Callable) -> None:
+        solver = BacktrackSolver(
+            QueensProblem(8), var_heuristic=smallest_domain_var_heuristic, dom_heuristic=dom_heuristic
+        )
+        solutions = solver.find_all()
+        multiprocessing_solver = MultiprocessingSolver(
+            QueensProblem(8),
+            processes=2,
+            cubes_per_process=4,
+            deterministic=True,
+            var_heuristic=smallest_domain_var_heuristic,
+            dom_heuristic=dom_heuristic,
+        )
+        assert multiprocessing_solver.find_all() == solutions
+        assert get_statistics(multiprocessing_solver.statistics) == get_statistics(solver.statistics)
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_domain_consistency(self, trailing: bool) -> None:
+        solver = BacktrackSolver(
+            Quasigroup5Problem(7),
+            consistency_algorithm=domain_consistency_algorithm,
+            var_heuristic=smallest_domain_var_heuristic,
+        )
+        solutions = solver.find_all()
+        multiprocessing_solver = MultiprocessingSolver(
+            Quasigroup5Problem(7),
+            processes=2,
+            cubes_per_process=4,
+            deterministic=True,
+            consistency_algorithm=domain_consistency_algorithm,
+            var_heuristic=smallest_domain_var_heuristic,
+            trailing=trailing,
+        )
+        assert multiprocessing_solver.find_all() == solutions
+        assert len(solutions) == 3
+
+    def test_solve_inconsistent(self) -> None:
+        problem = QueensProblem(3)
+        solver = MultiprocessingSolver(problem, processes=2)
+        assert solver.find_all() == []
@@ -0,0 +1,85 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import pytest
+
+from nucs.examples.golomb.golomb_problem import GolombProblem, golomb_consistency_algorithm
+from nucs.examples.queens.queens_problem import QueensProblem
+from nucs.problems.problem import Problem
+from nucs.propagators.propagators import ALG_AFFINE_LEQ
+from nucs.solvers.heuristics import first_not_instantiated_var_heuristic, max_value_dom_heuristic
+from nucs.solvers.portfolio_solver import DEFAULT_CONFIGURATIONS, PortfolioSolver
+from nucs.statistics import STATS_SOLVER_SOLUTION_NB
+
+
+class TestPortfolioSolver:
+    def test_solve_one(self) -> None:
+        problem = QueensProblem(8)
+        solver = PortfolioSolver(problem)
+        solution = solver.solve_one()
+        assert solution
+        assert len(set(solution[:8])) == 8
+        assert 0 <= solver.winner < len(DEFAULT_CONFIGURATIONS)
+        statistics = solver.get_configurations_statistics()
+        assert len(statistics) == len(DEFAULT_CONFIGURATIONS)
+        assert [configuration_statistics["WINNER"] for configuration_statistics in statistics].count(True) == 1
+        assert statistics[solver.winner]["STATISTICS"]["SOLVER_SOLUTION_NB"] == 1
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 1
+
+    def test_solve_one_inconsistent(self) -> None:
+        solver = PortfolioSolver(QueensProblem(3))
+        assert solver.solve_one() is None
+
+    def test_solve_one_failed_configuration(self) -> None:
+        solver = PortfolioSolver(QueensProblem(6), [{"var_heuristic_typo": None}, {}])
+        solution = solver.solve_one()
+        assert solution
+        assert solver.winner == 1
+
+    def test_solve_one_failed_configurations(self) -> None:
+        solver = PortfolioSolver(QueensProblem(6), [{"var_heuristic_typo": None}, {"dom_heuristic_typo": None}])
+        with pytest.raises(RuntimeError):
+            solver.solve_one()
+
+    def test_find_all(self) -> None:
+        solver = PortfolioSolver(Problem([(0, 2), (0, 2)]))
+        assert len(solver.find_all()) == 9
+
+    def test_minimize(self) -> None:
+        problem = GolombProblem(6)
+        solver = PortfolioSolver(
+            problem,
+            [
+                {"consistency_algorithm": golomb_consistency_algorithm},
+                {"consistency_algorithm": golomb_consistency_algorithm, "trailing": True},
+            ],
+        )
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        assert solution[problem.length_idx] == 17
+
+    def test_maximize(self) -> None:
+        problem = Problem([(0, 5), (0, 5)])
+        problem.add_propagator(([0, 1], ALG_AFFINE_LEQ, [1, 1, 7]))
+        solver = PortfolioSolver(
+            problem,
+            [
+                {"var_heuristic": first_not_instantiated_var_heuristic},
+                {"dom_heuristic": max_value_dom_heuristic},
+            ],
+        )
+        solution = solver.maximize(1)
+        assert solution
+        assert solution[1] == 5
+        assert solver.get_configurations_statistics()[1]["CONFIGURATION"] == {
+            "dom_heuristic": "max_value_dom_heuristic"
+        }
@@ -0,0 +1,117 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+import itertools
+
+import pytest
+
+from nucs.constants import SEARCH_COMPLETE, SEARCH_INTERRUPTED
+from nucs.examples.golomb.golomb_problem import GolombProblem, golomb_consistency_algorithm
+from nucs.examples.queens.queens_problem import QueensProblem
+from nucs.numpy import new_shr_domains_by_values
+from nucs.solvers.heuristics import (
+    random_smallest_domain_var_heuristic,
+    random_value_dom_heuristic,
+    seed_random_heuristics,
+)
+from nucs.solvers.restart_solver import RestartSolver, geometric_cutoffs, luby, luby_cutoffs
+from nucs.statistics import STATS_SOLVER_BACKTRACK_NB, STATS_SOLVER_SOLUTION_NB
+
+
+class TestRestartSolver:
+    def test_luby(self) -> None:
+        assert [luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+    def test_luby_cutoffs(self) -> None:
+        assert list(itertools.islice(luby_cutoffs(10), 7)) == [10, 10, 20, 10, 10, 20, 40]
+
+    def test_geometric_cutoffs(self) -> None:
+        assert list(itertools.islice(geometric_cutoffs(10, 2), 4)) == [10, 20, 40, 80]
+
+    def test_random_smallest_domain_var_heuristic(self) -> None:
+        seed_random_heuristics(0)
+        shr_domains = new_shr_domains_by_values([(0, 3), (0, 1), (1, 1), (2, 3), (0, 2)])
+        dom_indices = {random_smallest_domain_var_heuristic(shr_domains) for _ in range(100)}
+        assert dom_indices == {1, 3}
+
+    def test_random_value_dom_heuristic(self) -> None:
+        seed_random_heuristics(0)
+        domains = set()
+        for _ in range(100):
+            shr_domains = new_shr_domains_by_values([(0, 3), (0, 3)])
+            random_value_dom_heuristic(shr_domains[0], shr_domains[1])
+            domains.add((tuple(shr_domains[0]), tuple(shr_domains[1])))
+        assert domains == {((0, 0), (1, 3)), ((3, 3), (0, 2))}
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_solve_one(self, trailing: bool) -> None:
+        solver = RestartSolver(QueensProblem(20), cutoffs=luby_cutoffs(1), trailing=trailing)
+        solution = solver.solve_one()
+        assert solution
+        assert len(set(solution[:20])) == 20
+        assert len(solver.restarts_statistics) > 1
+        backtrack_nb = sum(statistics[STATS_SOLVER_BACKTRACK_NB] for statistics in solver.restarts_statistics)
+        assert backtrack_nb == solver.statistics[STATS_SOLVER_BACKTRACK_NB]
+
+    def test_solve_one_reproducible(self) -> None:
+        solutions = [RestartSolver(QueensProblem(20), cutoffs=luby_cutoffs(1), seed=1).solve_one() for _ in range(2)]
+        assert solutions[0] == solutions[1]
+
+    def test_count_all(self) -> None:
+        assert RestartSolver(QueensProblem(8), cutoffs=luby_cutoffs(1)).count_all() == 92
+
+    def test_find_all(self) -> None:
+        solver = RestartSolver(QueensProblem(8), cutoffs=luby_cutoffs(1))
+        solutions = solver.find_all()
+        assert len(solutions) == 92
+        assert len(set(tuple(solution) for solution in solutions)) == 92
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 92
+
+    def test_solve_all(self) -> None:
+        solver = RestartSolver(QueensProblem(8), cutoffs=luby_cutoffs(1))
+        solver.solve_all()
+        assert solver.statistics[STATS_SOLVER_SOLUTION_NB] == 92
+        assert len(solver.restarts_statistics) > 0
+        # The search is the same as the one of find_all.
+        other_solver = RestartSolver(QueensProblem(8), cutoffs=luby_cutoffs(1))
+        other_solver.find_all()
+        assert (solver.statistics == other_solver.statistics).all()
+
+    @pytest.mark.parametrize("trailing", [False, True])
+    def test_minimize(self, trailing: bool) -> None:
+        problem = GolombProblem(7)
+        solver = RestartSolver(
+            problem,
+            cutoffs=geometric_cutoffs(1),
+            consistency_algorithm=golomb_consistency_algorithm,
+            dom_heuristic=random_value_dom_heuristic,
+            trailing=trailing,
+        )
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        assert solution[problem.length_idx] == 25
+        assert len(solver.restarts_statistics) > 1
+        assert solver.status == SEARCH_COMPLETE
+
+    def test_minimize_backtrack_limit(self) -> None:
+        problem = GolombProblem(8)
+        solver = RestartSolver(
+            problem,
+            cutoffs=geometric_cutoffs(1),
+            consistency_algorithm=golomb_consistency_algorithm,
+            dom_heuristic=random_value_dom_heuristic,
+            backtrack_limit=200,
+        )
+        solution = solver.minimize(problem.length_idx)
+        assert solution
+        assert solver.status == SEARCH_INTERRUPTED
+        assert solver.statistics[STATS_SOLVER_BACKTRACK_NB] == 200
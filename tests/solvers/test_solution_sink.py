@@ -0,0 +1,53 @@
+###############################################################################
+# __   _            _____    _____
+# | \ | |          / ____|  / ____|
+# |  \| |  _   _  | |      | (___
+# | . ` | | | | | | |       \___ \
+# | |\  | | |_| | | |____   ____) |
+# |_| \_|  \__,_|  \_____| |_____/
+#
+# Fast constraint solving in Python  - https://github.com/yangeorget/nucs
+#
+# Copyright 2024 - Yan Georget
+###############################################################################
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from nucs.examples.queens.queens_problem import QueensProblem
+from nucs.problems.problem import Problem
+from nucs.solvers.backtrack_solver import BacktrackSolver
+from nucs.solvers.multiprocessing_solver import MultiprocessingSolver
+from nucs.solvers.solution_sink import SolutionSink
+
+
+class TestSolutionSink:
+    @pytest.mark.parametrize("batch_size", [1, 7, 100])
+    def test_solve_all(self, tmp_path: Path, batch_size: int) -> None:
+        path = str(tmp_path / "solutions.npy")
+        with SolutionSink(path, 24, batch_size=batch_size) as sink:
+            BacktrackSolver(QueensProblem(8)).solve_all(sink)
+        solutions = np.load(path)
+        assert solutions.shape == (92, 24)
+        assert solutions.tolist() == BacktrackSolver(QueensProblem(8)).find_all()
+
+    def test_solve_all_projection(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "solutions.npy")
+        with SolutionSink(path, 2, variables=[1], batch_size=3) as sink:
+            BacktrackSolver(Problem([(0, 3), (0, 4)])).solve_all(sink)
+        assert np.load(path, mmap_mode="r").tolist() == [[value] for _ in range(4) for value in range(5)]
+
+    def test_solve_all_no_solution(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "solutions.npy")
+        with SolutionSink(path, 9) as sink:
+            BacktrackSolver(QueensProblem(3)).solve_all(sink)
+        assert np.load(path).shape == (0, 9)
+
+    def test_solve_all_multiprocessing(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "solutions.npy")
+        problem = QueensProblem(8)
+        with SolutionSink(path, 24, variables=list(range(8))) as sink:
+            MultiprocessingSolver(problem, processes=2).solve_all(sink)
+        solutions = BacktrackSolver(QueensProblem(8)).find_all()
+        assert sorted(np.load(path).tolist()) == sorted(solution[:8] for solution in solutions)